@@ -4,11 +4,46 @@ from __future__ import annotations
 import logging
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import Platform
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+import voluptuous as vol
+
+from .const import (
+    CONF_ENGINE_MODE,
+    CONF_EVENT_LOG,
+    CONF_TICK_MODE,
+    DOMAIN,
+    ENGINE_MODE_BLUEPRINT,
+    ENGINE_MODE_NATIVE,
+    EVENT_LOG_JSONL,
+    EVENT_LOG_MEMORY,
+    SERVICE_GET_EVENTS,
+    TICK_MODE_BATCHED,
+    TICK_MODE_STAGGERED,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
-DOMAIN = "smart_climate_setup_wizard"
+PLATFORMS = [Platform.SENSOR]
+
+GET_EVENTS_SCHEMA = vol.Schema(
+    {
+        vol.Optional("room"): cv.string,
+        vol.Optional("kind"): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional("since"): cv.datetime,
+        vol.Optional("limit", default=50): vol.All(vol.Coerce(int), vol.Range(min=1, max=500)),
+        vol.Optional("formatted", default=True): cv.boolean,
+    }
+)
+
+
+def get_engine_mode(entry: ConfigEntry) -> str:
+    """Return the configured engine for an entry (options override data)."""
+    return entry.options.get(
+        CONF_ENGINE_MODE, entry.data.get(CONF_ENGINE_MODE, ENGINE_MODE_BLUEPRINT)
+    )
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -19,9 +54,79 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     room_name = entry.data.get("room_name")
 
+    from .metrics import AutomationMonitor, RoomMetrics
+
+    metrics = hass.data[DOMAIN].setdefault("metrics", {})[entry.entry_id] = RoomMetrics()
+
+    from .blueprint_inputs import automation_unique_id
+    from .event_log import EventLog
+
+    event_log = EventLog(
+        hass,
+        room_name,
+        automation_unique_id(room_name),
+        persist=entry.options.get(CONF_EVENT_LOG, EVENT_LOG_MEMORY) == EVENT_LOG_JSONL,
+    )
+    await event_log.async_start()
+    hass.data[DOMAIN].setdefault("event_logs", {})[entry.entry_id] = event_log
+    _async_register_services(hass)
+
+    # Native engine replaces the blueprint automation for this room
+    if get_engine_mode(entry) == ENGINE_MODE_NATIVE:
+        from .controller import RoomController
+        from .coordinator import HomeCoordinator
+        from .dispatcher import CommandDispatcher
+        from .scheduler import TickScheduler
+
+        scheduler = hass.data[DOMAIN].get("scheduler")
+        if scheduler is None:
+            scheduler = hass.data[DOMAIN]["scheduler"] = TickScheduler(hass)
+
+        # One dispatcher for all rooms so rate limits apply per physical device
+        dispatcher = hass.data[DOMAIN].get("dispatcher")
+        if dispatcher is None:
+            dispatcher = hass.data[DOMAIN]["dispatcher"] = CommandDispatcher(hass)
+
+        coordinator = None
+        if entry.options.get(CONF_TICK_MODE, TICK_MODE_STAGGERED) == TICK_MODE_BATCHED:
+            coordinator = hass.data[DOMAIN].get("coordinator")
+            if coordinator is None:
+                coordinator = hass.data[DOMAIN]["coordinator"] = HomeCoordinator(
+                    hass, scheduler
+                )
+
+        if entry.data.get("enable_notifications", False):
+            # Set up before the options flow refused this combination
+            _LOGGER.warning(
+                "%s: the native engine does not send notifications; switch the room "
+                "back to the blueprint automation to get them",
+                room_name,
+            )
+
+        controller = RoomController(
+            hass,
+            {**entry.data, **entry.options},
+            scheduler,
+            dispatcher,
+            coordinator,
+            metrics,
+            event_log,
+        )
+        await controller.async_start()
+        hass.data[DOMAIN].setdefault("controllers", {})[entry.entry_id] = controller
+    else:
+        monitor = AutomationMonitor(hass, room_name, metrics)
+        monitor.async_start()
+        entry.async_on_unload(monitor.async_stop)
+
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+
     _LOGGER.info(
-        "Smart Climate Control Setup Wizard loaded for room: %s",
+        "Smart Climate Control Setup Wizard loaded for room: %s (engine: %s)",
         room_name,
+        get_engine_mode(entry),
     )
 
     # Note: Notification is now created during config flow completion,
@@ -34,7 +139,18 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     # Note: This does NOT delete the helper entities
     # Users must manually delete helpers if they want to remove them
+    if not await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
+        return False
     hass.data[DOMAIN].pop(entry.entry_id)
+    hass.data[DOMAIN].get("metrics", {}).pop(entry.entry_id, None)
+
+    controller = hass.data[DOMAIN].get("controllers", {}).pop(entry.entry_id, None)
+    if controller is not None:
+        await controller.async_stop()
+
+    event_log = hass.data[DOMAIN].get("event_logs", {}).pop(entry.entry_id, None)
+    if event_log is not None:
+        await event_log.async_stop()
 
     _LOGGER.info(
         "Smart Climate Control Setup Wizard unloaded for room: %s (helpers remain)",
@@ -44,6 +160,50 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return True
 
 
+def _async_register_services(hass: HomeAssistant) -> None:
+    """Register the integration's actions (once, for all rooms)."""
+    if hass.services.has_service(DOMAIN, SERVICE_GET_EVENTS):
+        return
+
+    async def async_get_events(call: ServiceCall) -> ServiceResponse:
+        """Return recent events of one room or all rooms, oldest first."""
+        room = call.data.get("room")
+        limit = call.data["limit"]
+        since = call.data.get("since")
+        if since is not None:
+            since = dt_util.as_utc(since)
+        records = []
+        for event_log in hass.data[DOMAIN].get("event_logs", {}).values():
+            if room is not None and event_log.room_name.lower() != room.lower():
+                continue
+            records.extend(
+                event_log.query(
+                    since=since, kinds=call.data.get("kind"), limit=limit
+                )
+            )
+        records.sort(key=lambda record: record.time)
+        events = []
+        for record in records[-limit:]:
+            event = record.as_dict()
+            if call.data["formatted"]:
+                event["message"] = record.format()
+            events.append(event)
+        return {"events": events}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_EVENTS,
+        async_get_events,
+        schema=GET_EVENTS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload an entry when its options change (e.g. engine switched)."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Handle removal of an entry."""
     _LOGGER.info(
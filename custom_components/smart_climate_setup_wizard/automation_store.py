@@ -0,0 +1,196 @@
+"""Where the wizard keeps its automations.
+
+automations.yaml often holds hundreds of automations. Loading all of them and
+dumping the whole list back for every room is slow and drops comments and
+formatting, so the wizard edits the file by key instead: the file is split
+into its top-level ``- id: ...`` blocks as text, and only the blocks of the
+room's automations are replaced, appended or removed. Unrelated automations
+are never parsed or re-serialized.
+
+Alternatively each automation gets its own file in a directory that
+configuration.yaml includes with ``!include_dir_merge_list``, so adding or
+removing a room touches nothing else at all.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import re
+import shutil
+import tempfile
+from typing import Any, Iterable
+
+from . import yaml_io
+
+_LOGGER = logging.getLogger(__name__)
+
+AUTOMATIONS_FILE = "automations.yaml"
+AUTOMATIONS_DIR = "smart_climate_automations"
+# A second automation key, next to the UI's "automation: !include automations.yaml"
+INCLUDE_KEY = "automation smart_climate:"
+INCLUDE_LINE = f"{INCLUDE_KEY} !include_dir_merge_list {AUTOMATIONS_DIR}\n"
+
+# "- id: x" starts a block; "  id: x" is the id of a block that starts with another key
+_BLOCK_START = re.compile(r"^-(\s|$)")
+_BLOCK_ID = re.compile(r"^(?:- |  )id:\s*(.*?)\s*$")
+
+
+class UnsupportedLayout(ValueError):
+    """automations.yaml is not a plain top-level list that can be edited by key."""
+
+
+def _atomic_write(path: str, text: str) -> None:
+    temp_fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), text=True)
+    try:
+        with os.fdopen(temp_fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        shutil.move(temp_path, path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+def _read(path: str) -> str:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return ""
+
+
+def dump_automations(automation_configs: list[dict[str, Any]]) -> str:
+    """Return automations as the YAML of a top-level list."""
+    return yaml_io.dump(automation_configs, label="automations")
+
+
+def _block_id(lines: list[str]) -> str | None:
+    for line in lines:
+        if match := _BLOCK_ID.match(line):
+            value = match.group(1)
+            if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+                value = value[1:-1]
+            return value
+    return None
+
+
+def split_blocks(text: str) -> tuple[list[str], list[tuple[str | None, list[str]]]]:
+    """Split a top-level YAML list into its header and ``(id, lines)`` blocks.
+
+    Comment lines directly above a block (no blank line in between) belong to
+    that block, so they go with it when it is replaced or removed.
+    """
+    header: list[str] = []
+    blocks: list[list[str]] = []
+    for line in text.splitlines(keepends=True):
+        if _BLOCK_START.match(line):
+            previous = blocks[-1] if blocks else header
+            start = len(previous)
+            while start > 0 and previous[start - 1].startswith("#"):
+                start -= 1
+            blocks.append(previous[start:] + [line])
+            del previous[start:]
+        elif blocks:
+            blocks[-1].append(line)
+        elif not line.strip() or line.lstrip().startswith("#"):
+            header.append(line)
+        elif line.strip() == "[]":
+            # The UI writes an empty list as "[]"
+            continue
+        else:
+            raise UnsupportedLayout(f"unexpected line before the first automation: {line.strip()!r}")
+    return header, [(_block_id(block), block) for block in blocks]
+
+
+def upsert_automations(path: str, automation_configs: list[dict[str, Any]]) -> None:
+    """Add or replace automations in a YAML list file, by id, in one write."""
+    text = _read(path)
+    try:
+        header, blocks = split_blocks(text)
+    except UnsupportedLayout as err:
+        _LOGGER.warning("Rewriting %s as a whole: %s", path, err)
+        _rewrite_automations(path, automation_configs, ())
+        return
+
+    new_blocks = {
+        automation["id"]: dump_automations([automation]).splitlines(keepends=True)
+        for automation in automation_configs
+    }
+    result = list(header)
+    for automation_id, block in blocks:
+        if automation_id in new_blocks:
+            _LOGGER.info("Automation ID %s already exists - replacing it", automation_id)
+            result.extend(new_blocks.pop(automation_id))
+        else:
+            result.extend(block)
+    if result and not result[-1].endswith("\n"):
+        result[-1] += "\n"
+    for block in new_blocks.values():
+        result.extend(block)
+    _atomic_write(path, "".join(result))
+
+
+def remove_automations(path: str, automation_ids: Iterable[str]) -> int:
+    """Remove automations from a YAML list file by id; return how many."""
+    ids = set(automation_ids)
+    text = _read(path)
+    try:
+        header, blocks = split_blocks(text)
+    except UnsupportedLayout as err:
+        _LOGGER.warning("Rewriting %s as a whole: %s", path, err)
+        return _rewrite_automations(path, [], ids)
+
+    kept = [block for automation_id, block in blocks if automation_id not in ids]
+    removed = len(blocks) - len(kept)
+    if removed:
+        lines = header + [line for block in kept for line in block]
+        _atomic_write(path, "".join(lines) if kept else "".join(header) + "[]\n")
+    return removed
+
+
+def _rewrite_automations(
+    path: str, automation_configs: list[dict[str, Any]], remove_ids: Iterable[str]
+) -> int:
+    """Fallback for files that cannot be split: load, filter and dump everything."""
+    automations = yaml_io.load(_read(path), label=path) or []
+    drop = set(remove_ids) | {automation["id"] for automation in automation_configs}
+    kept = [a for a in automations if not (isinstance(a, dict) and a.get("id") in drop)]
+    removed = len(automations) - len(kept)
+    _atomic_write(path, dump_automations(kept + automation_configs))
+    return removed
+
+
+def automation_file(directory: str, automation_id: str) -> str:
+    """Return the file of one automation in the include directory."""
+    return os.path.join(directory, f"{automation_id}.yaml")
+
+
+def write_automation_files(directory: str, automation_configs: list[dict[str, Any]]) -> None:
+    """Write each automation to its own file in the include directory."""
+    os.makedirs(directory, exist_ok=True)
+    for automation in automation_configs:
+        _atomic_write(automation_file(directory, automation["id"]), dump_automations([automation]))
+
+
+def remove_automation_files(directory: str, automation_ids: Iterable[str]) -> int:
+    """Delete the files of automations in the include directory; return how many."""
+    removed = 0
+    for automation_id in automation_ids:
+        try:
+            os.unlink(automation_file(directory, automation_id))
+            removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def ensure_directory_include(config_path: str) -> bool:
+    """Add the include directory to configuration.yaml; True if it was added."""
+    text = _read(config_path)
+    if any(line.startswith(INCLUDE_KEY) for line in text.splitlines()):
+        return False
+    if text and not text.endswith("\n"):
+        text += "\n"
+    _atomic_write(config_path, text + INCLUDE_LINE)
+    _LOGGER.info("Added %s to configuration.yaml", INCLUDE_LINE.strip())
+    return True
@@ -0,0 +1,270 @@
+"""Blueprint input builder shared by the setup wizard and the native engine."""
+from __future__ import annotations
+
+from typing import Any
+
+BLUEPRINT_PATH = "Chris971991/ultimate_climate_control.yaml"
+
+
+def sanitize_room_name(room_name: str) -> str:
+    """Convert room name to valid entity ID format."""
+    return room_name.lower().replace(" ", "_").replace("-", "_")
+
+
+def automation_unique_id(room_name: str) -> str:
+    """Return the automations.yaml id used for a room's climate automation."""
+    return f"climate_control_{sanitize_room_name(room_name)}"
+
+
+def build_helper_entity_ids(config: dict[str, Any]) -> dict[str, str]:
+    """Build the helper_* blueprint inputs for the enabled feature groups."""
+    sanitized_name = sanitize_room_name(config["room_name"])
+
+    helpers = {
+        "helper_last_mode": f"input_text.climate_last_mode_{sanitized_name}",
+        "helper_last_change": f"input_datetime.climate_last_change_{sanitized_name}",
+    }
+
+    # Add optional helpers based on enabled features
+    if config.get("enable_control_mode", True):
+        helpers["helper_control_mode"] = f"input_select.climate_control_mode_{sanitized_name}"
+
+    if config.get("enable_smart_mode", True):
+        helpers["helper_presence_detected"] = f"input_datetime.climate_presence_detected_{sanitized_name}"
+        helpers["helper_presence_validation_active"] = f"input_boolean.climate_presence_validation_active_{sanitized_name}"
+        helpers["helper_proximity_override"] = f"input_boolean.climate_proximity_override_{sanitized_name}"
+
+    if config.get("enable_dynamic_adaptation", True):
+        helpers["helper_temp_history"] = f"input_number.climate_temp_history_{sanitized_name}"
+        helpers["helper_trend_direction"] = f"input_text.climate_trend_direction_{sanitized_name}"
+        helpers["helper_mode_start_time"] = f"input_datetime.climate_mode_start_time_{sanitized_name}"
+        helpers["helper_effectiveness_score"] = f"input_number.climate_effectiveness_score_{sanitized_name}"
+        helpers["helper_temp_stable_since"] = f"input_datetime.climate_temp_stable_since_{sanitized_name}"
+        helpers["helper_last_transition"] = f"input_text.climate_last_transition_{sanitized_name}"
+
+    if config.get("enable_manual_override", True):
+        if "helper_proximity_override" not in helpers:
+            helpers["helper_proximity_override"] = f"input_boolean.climate_proximity_override_{sanitized_name}"
+        helpers["helper_override_active"] = f"input_boolean.climate_manual_override_{sanitized_name}"
+        helpers["helper_mode_before_override"] = f"input_text.climate_mode_before_override_{sanitized_name}"
+        helpers["helper_override_time"] = f"input_datetime.climate_override_time_{sanitized_name}"
+        helpers["helper_override_timeout"] = f"input_number.climate_override_timeout_{sanitized_name}"
+        helpers["helper_expected_temp"] = f"input_number.climate_expected_temp_{sanitized_name}"
+        helpers["helper_expected_fan"] = f"input_text.climate_expected_fan_{sanitized_name}"
+        helpers["helper_expected_swing"] = f"input_text.climate_expected_swing_{sanitized_name}"
+        helpers["helper_expected_hvac"] = f"input_text.climate_expected_hvac_{sanitized_name}"
+        helpers["helper_expected_ceiling_fan"] = f"input_text.climate_expected_ceiling_fan_{sanitized_name}"
+        helpers["helper_override_source"] = f"input_text.climate_override_source_{sanitized_name}"
+        # v5.0.0: Add new state machine helpers
+        helpers["helper_state_machine"] = f"input_select.climate_state_machine_{sanitized_name}"
+        helpers["helper_state_start"] = f"input_datetime.climate_state_start_{sanitized_name}"
+        helpers["helper_last_command"] = f"input_text.climate_last_command_{sanitized_name}"
+        helpers["helper_state_checksum"] = f"input_number.climate_state_checksum_{sanitized_name}"
+
+    return helpers
+
+
+def build_blueprint_inputs(config: dict[str, Any]) -> dict[str, Any]:
+    """Build the full blueprint input mapping for a room configuration."""
+    room_name = config["room_name"]
+    helpers = build_helper_entity_ids(config)
+
+    # Build automation config with ALL blueprint inputs explicitly written
+    # This ensures transparency and prevents blueprint version changes from altering behavior
+    comfort_width = config.get("comfort_zone_width", 1.0)
+
+    inputs = {
+        # ========================================
+        # CORE SETTINGS
+        # ========================================
+        "room_name": room_name,
+        "climate_entities": config["climate_entities"],
+        **helpers,
+
+        # ========================================
+        # TEMPERATURE SETTINGS
+        # ========================================
+        "target_temperature": config.get("target_temperature", 22),
+        "comfort_zone_width": comfort_width,
+        "target_overshoot_strategy": config.get("target_overshoot_strategy", "moderate"),
+        "enable_heating_mode": config.get("enable_heating", True),
+        "enable_cooling_mode": config.get("enable_cooling", True),
+
+        # Advanced temperature control (disabled by default)
+        "enable_advanced_temp": False,
+        "comfort_min_temp": 21.0,  # Only used if enable_advanced_temp=true
+        "comfort_max_temp": 25.0,  # Only used if enable_advanced_temp=true
+        "cooling_target_temp": 22.0,  # Only used if enable_advanced_temp=true
+        "heating_target_temp": 22.0,  # Only used if enable_advanced_temp=true
+        "use_average_temperature": False,
+        "comfort_zone_action": "off",  # What to do when in comfort zone
+        "hysteresis_tolerance": 0.3,  # Prevent rapid mode switching
+
+        # ========================================
+        # DYNAMIC ADAPTATION & ESCALATION (CRITICAL!)
+        # ========================================
+        "enable_dynamic_adaptation": True,  # MUST be enabled for escalation to work!
+        "effectiveness_check_minutes": 5,  # How often to check temperature progress
+        "temperature_aggressiveness": 3,  # Escalation sensitivity (1=gentle, 5=aggressive)
+        "escalation_temp_tolerance": comfort_width,  # Distance from target before escalating
+        "minimum_progress_rate": 0.01,  # Minimum °C/min progress required
+        "stall_escalation_time": 15,  # Minutes before escalating if stalled
+        "extended_stall_multiplier": 30,  # Emergency escalation multiplier
+        "deescalation_approach_threshold": 0.8,  # Start reducing power within this distance
+        "enable_dynamic_target_adjustment": config.get("enable_dynamic_target_adjustment", False),
+        "escalation_target_offset": config.get("escalation_target_offset", 1.0),
+        "enable_wrong_direction_escalation": config.get("enable_wrong_direction_escalation", True),
+        "wrong_direction_escalation_per_check": config.get("wrong_direction_escalation_per_check", 1),
+        "wrong_direction_min_rate": config.get("wrong_direction_min_rate", 0.05),
+
+        # ========================================
+        # TIMING & COMPRESSOR PROTECTION
+        # ========================================
+        "check_interval_minutes": 5,  # FIX: Correct input name!
+        "min_runtime_minutes": config.get("min_runtime_minutes", 15),
+        "min_off_time_minutes": config.get("min_off_time_minutes", 10),
+        "enforce_off_time_protection": config.get("enforce_off_time_protection", True),
+
+        # ========================================
+        # FAN SPEED SETTINGS
+        # ========================================
+        "fan_speed_max": "Level 5",  # Maximum escalation fan speed
+        "fan_speed_medium": "Level 3",  # Medium escalation fan speed
+        "fan_speed_eco": config.get("fan_speed_eco", "Level 1"),  # ECO mode fan speed
+        "fan_only_fan_speed": "Auto",  # Fan-only mode fan speed
+        "swing_mode_active": True,  # Enable swing mode control
+
+        # ========================================
+        # PRESENCE DETECTION & SMART MODE
+        # ========================================
+        "presence_timeout_minutes": 30,  # How long to wait before turning off
+        "presence_confirmation_delay": config.get("presence_confirmation_delay", 0),
+        "presence_validation_mode": "any",  # Will be overridden below based on sensors
+        "adjacent_room_names": [],  # Adjacent room detection (disabled by default)
+
+        # Temperature stability detection
+        "temp_stability_enabled": False,
+        "stability_tolerance": 0.2,
+        "stability_duration": 10,
+        "stability_behavior": config.get("stability_behavior", "off"),
+        "smart_mode_behavior": config.get("smart_mode_behavior", "eco"),
+
+        # ========================================
+        # AWAY MODE & PRE-CONDITIONING
+        # ========================================
+        "enable_away_mode": True,
+        "away_mode_action": config.get("away_mode_action", "eco"),
+        "enable_pre_conditioning": False,  # Disabled by default
+        "eco_mode_setpoint_offset": 2,  # °C offset for ECO mode
+
+        # ========================================
+        # BED COMFORT MODE
+        # ========================================
+        "bed_comfort_mode": config.get("bed_comfort_mode", "off"),
+        "bed_sensor_manual": config.get("bed_sensor_manual", None) if config.get("bed_sensor_manual") else None,
+        "bed_absence_grace_period": 30,  # Minutes grace after leaving bed
+        "bed_eco_fan_only_mode": False,  # Use fan-only in bed ECO
+        "bed_eco_stability_minutes": 15,  # Stability time for bed ECO
+        "bed_eco_stability_rate": 0.02,  # °C/min threshold
+        "bed_eco_return_threshold": 1.0,  # °C distance to exit bed ECO
+        "bed_eco_max_overshoot": 0.5,  # Max °C overshoot allowed
+        "bed_eco_near_target_threshold": 0.3,  # °C threshold for escalation suppression in bed ECO
+
+        # ========================================
+        # EXTREME TEMPERATURE OVERRIDE
+        # ========================================
+        "extreme_temp_override": True,  # Enable extreme temp bypass
+        "extreme_high_temp": 32,  # °C threshold for extreme heat
+        "extreme_low_temp": 10,  # °C threshold for extreme cold
+
+        # ========================================
+        # SCHEDULING (Disabled by default)
+        # ========================================
+        "enable_scheduling": False,
+        "morning_temp": 22,
+        "day_temp": 24,
+        "evening_temp": 23,
+        "night_temp": 20,
+        "enable_weekend_schedule": False,
+        "weekend_morning_temp": 22,
+        "weekend_day_temp": 24,
+        "weekend_night_temp": 20,
+
+        # ========================================
+        # WINDOW DETECTION (Disabled by default)
+        # ========================================
+        "enable_window_detection": False,
+        "window_sensors": [],
+        "window_open_delay": 120,  # Seconds before turning off
+        "window_close_delay": 60,  # Seconds before turning back on
+
+        # ========================================
+        # OUTSIDE TEMPERATURE COMPENSATION (Disabled by default)
+        # ========================================
+        "enable_outside_temp_compensation": False,
+        "weather_entity": None,
+        "outdoor_temp_sensor": None,
+        "outside_compensation_factor": 0.2,  # Mild compensation
+        "max_outside_compensation": 2,  # Conservative max
+        "outside_compensation_base_temp": 25,  # Neutral baseline
+
+        # ========================================
+        # MANUAL OVERRIDE DETECTION
+        # ========================================
+        "enable_manual_override_detection": True,
+        "override_timeout": 2,  # Hours before auto-resuming
+        "manual_mode_timeout": 24,  # Hours before manual mode expires
+
+        # ========================================
+        # AC TEMPERATURE LIMITS
+        # ========================================
+        "ac_minimum_temp": config.get("ac_minimum_temp", 0),  # 0 = use AC's own limits
+        "ac_maximum_temp": config.get("ac_maximum_temp", 0),  # 0 = use AC's own limits
+
+        # ========================================
+        # NOTIFICATIONS
+        # ========================================
+        "enable_notifications": config.get("enable_notifications", False),
+        "notification_service": "notify.notify",  # Default notification service
+
+        # ========================================
+        # DEBUGGING & LOGGING
+        # ========================================
+        "enable_full_debug_logging": True,  # CRITICAL: Always enable for new setups!
+        "enable_event_logging": False,  # Detailed event logs (optional)
+        "event_log_output": "event",  # Structured records in the integration's event log
+
+        # ========================================
+        # SENSORS (Conditionally set below)
+        # ========================================
+        "temperature_sensor": config.get("temperature_sensor", []) if config.get("temperature_sensor") else [],
+        "temp_trigger_deadband": config.get("temp_trigger_deadband", 0),
+        "temp_trigger_min_interval": config.get("temp_trigger_min_interval", 0),
+        "temp_sensor_max_age": config.get("temp_sensor_max_age", 0),
+        "room_presence_sensors": config.get("room_presence_sensors", []),
+        "presence_persons": config.get("presence_persons", []),
+        "presence_devices": config.get("presence_devices", []),
+        "proximity_sensor": config.get("proximity_sensor", None) if config.get("proximity_sensor") else None,
+        "direction_sensor": config.get("direction_sensor", None) if config.get("direction_sensor") else None,
+        "home_zone_distance": config.get("home_zone_distance", 10000),
+    }
+
+    # Override presence validation mode based on sensor configuration (v3.4.0 enhanced modes)
+    # Intelligently choose best mode based on available sensors
+    has_bed_sensor = config.get("is_bedroom_with_bed_sensor", False)
+    has_room_sensors = bool(config.get("room_presence_sensors"))
+
+    if has_bed_sensor and has_room_sensors:
+        # Has both BLE/motion and bed sensor -> use BLE_SMART for intelligent detection
+        inputs["presence_validation_mode"] = "ble_smart"
+    elif has_bed_sensor:
+        # Only has bed sensor -> use BED_ONLY mode
+        inputs["presence_validation_mode"] = "bed_only"
+    elif has_room_sensors:
+        # Only has BLE/motion -> use BLE_MOTION for best accuracy
+        inputs["presence_validation_mode"] = "ble_motion"
+    else:
+        # No sensors configured -> fallback to ANY mode (already set as default above)
+        pass
+
+    return inputs
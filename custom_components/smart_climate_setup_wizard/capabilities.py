@@ -0,0 +1,160 @@
+"""Per-device capability maps for fan, swing and hvac mode resolution.
+
+The blueprint resolves vendor spellings ('Level 3', '3', 'medium', 'Medium',
+'silence', 'Quiet', '3D', ...) by walking if/elif chains over the entity's
+``fan_modes``/``swing_modes``/``hvac_modes`` on every run. Those lists only
+change when the integration reloads, so the native engine resolves every
+choice once per list and keeps the result in a Capabilities map; lookups
+on the hot path are dict lookups.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Mapping, Sequence
+
+FAN_LEVELS = (1, 2, 3, 4, 5)
+
+# Vendor spellings tried for each level when neither 'Level N' nor 'N' exist
+FAN_LEVEL_ALIASES = {
+    1: ("Silence", "silence", "Quiet", "quiet", "low", "Low"),
+    2: ("medium-low",),
+    3: ("medium", "Medium"),
+    4: ("medium-high",),
+    5: ("high", "High"),
+}
+
+# fan_only_fan_speed input value -> spellings in order of preference
+FAN_ONLY_PREFERENCES = {
+    "silence": ("silence", "Silence", "quiet", "Quiet", "1", "Level 1"),
+    "quiet": ("quiet", "Quiet", "silence", "Silence", "1", "Level 1"),
+    "1": ("1", "Level 1", "silence", "Silence", "quiet", "Quiet"),
+    "2": ("2", "Level 2"),
+    "3": ("3", "Level 3"),
+    "4": ("4", "Level 4"),
+    "5": ("5", "Level 5"),
+}
+
+# swing_mode_active input value (lower case) -> vendor spellings
+SWING_ALIASES = {
+    "vertical": ("Vertical",),
+    "horizontal": ("Horizontal",),
+    "both": ("3D", "Both"),
+    "off": ("Off",),
+}
+
+HVAC_MODES = ("off", "cool", "heat", "auto", "dry", "fan_only", "heat_cool")
+
+
+def _first(candidates: Sequence[str], available: Sequence[str]) -> str | None:
+    for candidate in candidates:
+        if candidate in available:
+            return candidate
+    return None
+
+
+@dataclass(frozen=True)
+class Capabilities:
+    """Resolved mode choices for one climate entity."""
+
+    fan_modes: tuple[str, ...]
+    swing_modes: tuple[str, ...]
+    hvac_modes: tuple[str, ...]
+    fan_for_level: Mapping[int, str]
+    fan_only_fan: Mapping[str, str]
+    swing: Mapping[str, str]
+    hvac: Mapping[str, str]
+
+    @classmethod
+    def build(
+        cls, fan_modes: Sequence[str], swing_modes: Sequence[str], hvac_modes: Sequence[str]
+    ) -> Capabilities:
+        """Resolve every choice for the given mode lists."""
+        fans, swings, hvacs = tuple(fan_modes), tuple(swing_modes), tuple(hvac_modes)
+
+        fan_fallback = _first(("Auto", "auto"), fans) or (fans[0] if fans else "Auto")
+        fan_for_level = {
+            level: _first((f"Level {level}", str(level), *FAN_LEVEL_ALIASES[level]), fans)
+            or fan_fallback
+            for level in FAN_LEVELS
+        }
+        fan_only_fan = {
+            choice: _first(candidates, fans) or (fans[0] if fans else choice)
+            for choice, candidates in FAN_ONLY_PREFERENCES.items()
+        }
+        swing_fallback = _first(("off", "Off"), swings) or (swings[0] if swings else "Off")
+        swing = {
+            desired: (desired if desired in swings else _first(aliases, swings)) or swing_fallback
+            for desired, aliases in SWING_ALIASES.items()
+        }
+        hvac = {
+            wanted: _first((wanted, wanted.capitalize()), hvacs)
+            or (hvacs[0] if hvacs else wanted)
+            for wanted in HVAC_MODES
+        }
+        return cls(fans, swings, hvacs, fan_for_level, fan_only_fan, swing, hvac)
+
+    def fan_mode(self, level: int) -> str:
+        """Return the fan mode for a 1-5 fan level (new_fan_mode)."""
+        try:
+            return self.fan_for_level[level]
+        except KeyError:
+            return _first((f"Level {level}", str(level), "Auto", "auto"), self.fan_modes) or (
+                self.fan_modes[0] if self.fan_modes else "Auto"
+            )
+
+    def fan_only_mode(self, choice: str) -> str:
+        """Return the fan mode for fan-only operation (selected_fan_only_fan_mode)."""
+        try:
+            return self.fan_only_fan[choice]
+        except KeyError:
+            return self.fan_modes[0] if self.fan_modes else "silence"
+
+    def swing_mode(self, desired: str) -> str:
+        """Return the vendor spelling of a swing setting (validated_swing_mode)."""
+        try:
+            return self.swing[desired]
+        except KeyError:
+            if desired in self.swing_modes:
+                return desired
+            return self.swing["off"]
+
+    def hvac_mode(self, wanted: str) -> str:
+        """Return the vendor spelling of an hvac mode (selected_hvac_mode)."""
+        try:
+            return self.hvac[wanted]
+        except KeyError:
+            return (
+                _first((wanted, wanted.capitalize()), self.hvac_modes)
+                or (self.hvac_modes[0] if self.hvac_modes else wanted)
+            )
+
+
+class CapabilityCache:
+    """Capabilities per climate entity, rebuilt only when its mode lists change."""
+
+    def __init__(self) -> None:
+        """Initialize an empty cache."""
+        self._entries: dict[str, tuple[tuple[tuple[str, ...], ...], Capabilities]] = {}
+        self.builds = 0
+
+    def get(self, entity_id: str | None, state: Any) -> Capabilities:
+        """Return the capabilities of an entity from its current state."""
+        attributes = state.attributes if state is not None else {}
+        # Every state write gets a new attributes mapping, so compare the
+        # lists themselves; they are short and almost never change
+        key = tuple(
+            tuple(attributes.get(name) or ())
+            for name in ("fan_modes", "swing_modes", "hvac_modes")
+        )
+        entry = self._entries.get(entity_id) if entity_id else None
+        if entry is not None and entry[0] == key:
+            return entry[1]
+        capabilities = Capabilities.build(*key)
+        self.builds += 1
+        if entity_id:
+            self._entries[entity_id] = (key, capabilities)
+        return capabilities
+
+
+# Shared by every room: the lists belong to the device, not the room
+CAPABILITIES = CapabilityCache()
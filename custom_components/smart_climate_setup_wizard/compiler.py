@@ -0,0 +1,397 @@
+"""Specialize the Ultimate Climate Control blueprint for one room.
+
+The "compiled" automation output writes a plain automation instead of a
+``use_blueprint`` reference. At creation time the wizard:
+
+1. substitutes every ``!input`` with the room's value (or the input default),
+2. folds top-level variables that only depend on inputs and other folded
+   variables into literals (e.g. ``manual_timeout_hours``,
+   ``target_overshoot``, ``ceiling_fan_entities``, ``notify_services_all``),
+3. prunes ``choose`` options and ``if`` blocks whose template condition has a
+   conjunct that is false for every run (e.g. ``ceiling_fan_configured`` for a
+   room without a ceiling fan).
+
+Anything that reads entity states, the clock or the trigger is left as a
+template, so the compiled automation behaves exactly like the blueprint.
+"""
+from __future__ import annotations
+
+from ast import literal_eval
+from dataclasses import dataclass, field
+import re
+from typing import Any, Mapping
+
+from jinja2 import meta, nodes
+from jinja2.exceptions import TemplateError
+from jinja2.sandbox import ImmutableSandboxedEnvironment
+
+from . import yaml_io
+
+# Jinja globals that are safe to evaluate at compile time
+_STATIC_GLOBALS = frozenset({"namespace", "range", "dict", "true", "false", "none"})
+_TEMPLATE_MARKERS = ("{{", "{%", "{#")
+# Same check Home Assistant uses before turning a numeric render into a number
+_IS_NUMERIC = re.compile(r"^[+-]?(?!0\d)\d*(?:\.\d*)?$")
+_UNSET = object()
+
+
+class Input(str):
+    """Marker for a ``!input`` reference in the blueprint."""
+
+
+class _BlueprintLoader(yaml_io.SafeLoader):
+    """SafeLoader that understands the blueprint ``!input`` tag."""
+
+
+_BlueprintLoader.add_constructor(
+    "!input", lambda loader, node: Input(loader.construct_scalar(node))
+)
+
+
+def load_blueprint(path: str) -> dict[str, Any]:
+    """Load a blueprint file (blocking)."""
+    return yaml_io.load_file(path, _BlueprintLoader)
+
+
+def parse_blueprint(text: str) -> dict[str, Any]:
+    """Parse blueprint YAML, e.g. a downloaded copy (blocking)."""
+    return yaml_io.load(text, _BlueprintLoader, "blueprint")
+
+
+def blueprint_defaults(blueprint: Mapping[str, Any]) -> dict[str, Any]:
+    """Return the default of every input, including inputs inside sections."""
+    defaults: dict[str, Any] = {}
+
+    def collect(inputs: Mapping[str, Any]) -> None:
+        for name, spec in inputs.items():
+            if not isinstance(spec, dict):
+                continue
+            if "input" in spec and "selector" not in spec:
+                collect(spec["input"] or {})
+            elif "default" in spec:
+                defaults[name] = spec["default"]
+
+    collect(blueprint.get("blueprint", {}).get("input", {}))
+    return defaults
+
+
+def _substitute(value: Any, inputs: Mapping[str, Any]) -> Any:
+    """Replace ``!input`` markers with their values."""
+    if isinstance(value, Input):
+        return inputs.get(str(value))
+    if isinstance(value, dict):
+        return {key: _substitute(item, inputs) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_substitute(item, inputs) for item in value]
+    return value
+
+
+def _is_template(value: Any) -> bool:
+    return isinstance(value, str) and any(marker in value for marker in _TEMPLATE_MARKERS)
+
+
+def _parse_result(render_result: str) -> Any:
+    """Convert a render result to a native type like Home Assistant does."""
+    render_result = render_result.strip()
+    try:
+        result = literal_eval(render_result)
+    except (ValueError, TypeError, SyntaxError, MemoryError):
+        return render_result
+    if isinstance(result, (str, complex)):
+        return render_result
+    if (
+        isinstance(result, (int, float))
+        and not isinstance(result, bool)
+        and _IS_NUMERIC.match(render_result) is None
+    ):
+        return render_result
+    return result
+
+
+def _forgiving_float(value: Any, default: Any = _UNSET) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        if default is _UNSET:
+            raise
+        return default
+
+
+def _forgiving_int(value: Any, default: Any = _UNSET, base: int = 10) -> int:
+    try:
+        if isinstance(value, str) and base != 10:
+            return int(value, base)
+        return int(float(value))
+    except (TypeError, ValueError):
+        if default is _UNSET:
+            raise
+        return default
+
+
+def _forgiving_boolean(value: Any, default: Any = _UNSET) -> bool:
+    """Match Home Assistant's ``bool`` filter (cv.boolean semantics)."""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        lowered = value.lower().strip()
+        if lowered in ("1", "true", "yes", "on", "enable"):
+            return True
+        if lowered in ("0", "false", "no", "off", "disable"):
+            return False
+    elif isinstance(value, (int, float)):
+        return value != 0
+    if default is _UNSET:
+        raise ValueError(f"invalid boolean value {value}")
+    return default
+
+
+def _environment() -> ImmutableSandboxedEnvironment:
+    """Return a Jinja environment with the Home Assistant filters folding needs."""
+    env = ImmutableSandboxedEnvironment()
+    env.filters["float"] = _forgiving_float
+    env.filters["int"] = _forgiving_int
+    env.filters["bool"] = _forgiving_boolean
+    return env
+
+
+@dataclass
+class CompileStats:
+    """What the compiler changed, for logging."""
+
+    folded: list[str] = field(default_factory=list)
+    pruned: int = 0
+
+
+class _Compiler:
+    """Constant folding and branch pruning for one blueprint instance."""
+
+    def __init__(self, shadowed: set[str]) -> None:
+        self.env = _environment()
+        self.static: dict[str, Any] = {}
+        # Names redefined by action-level variables can't be trusted for pruning
+        self.shadowed = shadowed
+        self.stats = CompileStats()
+
+    def _names_are_static(self, names: set[str], context: Mapping[str, Any]) -> bool:
+        return all(name in context or name in _STATIC_GLOBALS for name in names)
+
+    def fold(self, name: str, value: Any) -> Any:
+        """Fold one top-level variable if it only depends on static values."""
+        if not isinstance(value, str):
+            self.static[name] = value
+            return value
+        if not _is_template(value):
+            self.static[name] = _parse_result(value)
+            return value
+        try:
+            ast = self.env.parse(value)
+            if not self._names_are_static(meta.find_undeclared_variables(ast), self.static):
+                return value
+            rendered = self.env.from_string(value).render(self.static)
+        except (TemplateError, TypeError, ValueError, ArithmeticError):
+            return value
+        if any(marker in rendered for marker in _TEMPLATE_MARKERS):
+            return value
+        result = _parse_result(rendered)
+        self.static[name] = result
+        self.stats.folded.append(name)
+        return result
+
+    def is_static_false(self, template: Any) -> bool:
+        """Return True if a template condition can never pass."""
+        if isinstance(template, bool):
+            return template is False
+        if not _is_template(template):
+            return False
+        context = {
+            name: value for name, value in self.static.items() if name not in self.shadowed
+        }
+        try:
+            ast = self.env.parse(template)
+        except TemplateError:
+            return False
+        if any(not isinstance(node, nodes.Output) for node in ast.body):
+            return False
+        expressions = [
+            child
+            for output in ast.body
+            for child in output.nodes
+            if not isinstance(child, nodes.TemplateData) or child.data.strip()
+        ]
+        if len(expressions) != 1 or isinstance(expressions[0], nodes.TemplateData):
+            return False
+        for conjunct in _conjuncts(expressions[0]):
+            names = {
+                name.name
+                for name in (conjunct, *conjunct.find_all(nodes.Name))
+                if isinstance(name, nodes.Name) and name.ctx == "load"
+            }
+            if not self._names_are_static(names, context):
+                continue
+            # Render Jinja truthiness of the operand: a falsy operand makes the
+            # whole `and` chain falsy, which fails the condition
+            truth = nodes.CondExpr(conjunct, nodes.Const(1), nodes.Const(0))
+            probe = nodes.Template([nodes.Output([truth])], lineno=1)
+            probe.set_environment(self.env)
+            try:
+                code = self.env.compile(probe)
+                result = self.env.template_class.from_code(
+                    self.env, code, self.env.make_globals(None)
+                ).render(context)
+            except (TemplateError, TypeError, ValueError, ArithmeticError):
+                continue
+            if result == "0":
+                return True
+        return False
+
+    def condition_is_static_false(self, condition: Any) -> bool:
+        """Return True if a condition (or list of conditions) can never pass."""
+        if isinstance(condition, list):
+            return any(self.condition_is_static_false(item) for item in condition)
+        if isinstance(condition, str):
+            return self.is_static_false(condition)
+        if not isinstance(condition, dict) or condition.get("enabled") is False:
+            return False
+        kind = condition.get("condition")
+        if kind == "template":
+            return self.is_static_false(condition.get("value_template"))
+        if kind == "and":
+            return self.condition_is_static_false(condition.get("conditions", []))
+        if kind == "or":
+            items = condition.get("conditions", [])
+            items = items if isinstance(items, list) else [items]
+            return bool(items) and all(self.condition_is_static_false(item) for item in items)
+        return False
+
+    def prune(self, value: Any) -> Any:
+        """Drop choose options and if blocks that can never run."""
+        if isinstance(value, list):
+            result: list[Any] = []
+            for item in value:
+                replacement = self._prune_action(item)
+                if replacement is None:
+                    continue
+                if isinstance(replacement, _Splice):
+                    result.extend(replacement.actions)
+                else:
+                    result.append(replacement)
+            return result
+        if isinstance(value, dict):
+            return {key: self.prune(item) for key, item in value.items()}
+        return value
+
+    def _prune_action(self, action: Any) -> Any:
+        if not isinstance(action, dict):
+            return self.prune(action)
+        if "choose" in action and isinstance(action["choose"], list):
+            options = []
+            for option in action["choose"]:
+                if isinstance(option, dict) and self.condition_is_static_false(
+                    option.get("conditions", [])
+                ):
+                    self.stats.pruned += 1
+                    continue
+                options.append(self.prune(option))
+            if not options:
+                default = action.get("default")
+                return _Splice(self.prune(_as_list(default))) if default else None
+            return {**self.prune(action), "choose": options}
+        if "if" in action and self.condition_is_static_false(action["if"]):
+            self.stats.pruned += 1
+            otherwise = action.get("else")
+            return _Splice(self.prune(_as_list(otherwise))) if otherwise else None
+        return self.prune(action)
+
+
+@dataclass
+class _Splice:
+    """Actions that replace a pruned action in its parent sequence."""
+
+    actions: list[Any]
+
+
+def _as_list(value: Any) -> list[Any]:
+    return value if isinstance(value, list) else [value]
+
+
+def _conjuncts(node: nodes.Node) -> list[nodes.Node]:
+    """Flatten ``a and b and c`` into its operands."""
+    if isinstance(node, nodes.And):
+        return [*_conjuncts(node.left), *_conjuncts(node.right)]
+    return [node]
+
+
+def _variable_names(value: Any) -> set[str]:
+    """Return every name defined by a nested ``variables`` block."""
+    names: set[str] = set()
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key == "variables" and isinstance(item, dict):
+                names.update(item)
+            names |= _variable_names(item)
+    elif isinstance(value, list):
+        for item in value:
+            names |= _variable_names(item)
+    return names
+
+
+def _schedule_periodic_check(
+    triggers: Any, check_interval: int, offset_seconds: int
+) -> None:
+    """Fire periodic_check only on check-interval minutes, at the room's offset.
+
+    The blueprint polls every minute and discards the runs where
+    ``now().minute % check_interval != 0`` in ``should_proceed``; firing on
+    ``/check_interval`` keeps exactly the runs that would have proceeded.
+    """
+    for trigger in triggers if isinstance(triggers, list) else []:
+        if (
+            isinstance(trigger, dict)
+            and trigger.get("id") == "periodic_check"
+            and trigger.get("platform", trigger.get("trigger")) == "time_pattern"
+        ):
+            # time_pattern "/N" matches minute % N == 0, the same minutes
+            # should_proceed lets through
+            if 1 < check_interval < 60:
+                trigger["minutes"] = f"/{check_interval}"
+            trigger["seconds"] = offset_seconds % 60
+
+
+def substitute_inputs(blueprint: Mapping[str, Any], inputs: Mapping[str, Any]) -> dict[str, Any]:
+    """Return the blueprint body with every ``!input`` replaced (no folding)."""
+    values = {**blueprint_defaults(blueprint), **inputs}
+    return {
+        key: _substitute(value, values)
+        for key, value in blueprint.items()
+        if key != "blueprint"
+    }
+
+
+def compile_automation(
+    blueprint: Mapping[str, Any],
+    inputs: Mapping[str, Any],
+    periodic_offset: int = 0,
+) -> tuple[dict[str, Any], CompileStats]:
+    """Return a plain automation config specialized for the given inputs.
+
+    ``periodic_offset`` is the second within the minute at which this room's
+    periodic check fires, so rooms don't all run at :00.
+    """
+    values = {**blueprint_defaults(blueprint), **inputs}
+    body = substitute_inputs(blueprint, inputs)
+    try:
+        check_interval = int(values.get("check_interval_minutes") or 1)
+    except (TypeError, ValueError):
+        check_interval = 1
+    _schedule_periodic_check(body.get("trigger"), check_interval, periodic_offset)
+
+    compiler = _Compiler(
+        _variable_names(body.get("action")) | set(body.get("trigger_variables") or {})
+    )
+    if isinstance(body.get("variables"), dict):
+        body["variables"] = {
+            name: compiler.fold(name, value) for name, value in body["variables"].items()
+        }
+    if "action" in body:
+        body["action"] = compiler.prune(body["action"])
+    return body, compiler.stats
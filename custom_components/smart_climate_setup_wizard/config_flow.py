@@ -3,10 +3,8 @@ from __future__ import annotations
 
 import logging
 from typing import Any
-import yaml
 import json
 import os
-import asyncio
 import aiohttp
 import tempfile
 import shutil
@@ -20,9 +18,68 @@ from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers import entity_registry as er, selector
 import homeassistant.helpers.config_validation as cv
 
+from . import yaml_io
+from .automation_store import (
+    AUTOMATIONS_DIR,
+    AUTOMATIONS_FILE,
+    automation_file,
+    ensure_directory_include,
+    remove_automation_files,
+    remove_automations,
+    upsert_automations,
+    write_automation_files,
+)
+from .blueprint_inputs import (
+    BLUEPRINT_PATH,
+    automation_unique_id,
+    build_blueprint_inputs,
+    sanitize_room_name,
+)
+from .compiler import compile_automation, load_blueprint, parse_blueprint
+from .const import (
+    AUTOMATION_OUTPUT_BLUEPRINT,
+    AUTOMATION_OUTPUT_COMPILED,
+    AUTOMATION_STORAGE_DIRECTORY,
+    AUTOMATION_STORAGE_FILE,
+    CONF_AUTOMATION_OUTPUT,
+    CONF_AUTOMATION_STORAGE,
+    CONF_ENGINE_MODE,
+    CONF_EVENT_LOG,
+    CONF_STATE_STORAGE,
+    CONF_TICK_MODE,
+    DOMAIN,
+    ENGINE_MODE_BLUEPRINT,
+    ENGINE_MODE_NATIVE,
+    EVENT_LOG_JSONL,
+    EVENT_LOG_MEMORY,
+    STATE_STORAGE_HELPERS,
+    STATE_STORAGE_MEMORY,
+    TICK_MODE_BATCHED,
+    TICK_MODE_STAGGERED,
+)
+from .entity_wait import (
+    AUTOMATION_WAIT_TIMEOUT,
+    HELPER_WAIT_TIMEOUT,
+    async_reload_domains,
+    async_wait_for_entities,
+)
+from .scheduler import stagger_offset
+from .wizard_io import LoopLagMonitor, async_path_exists, async_run
+
 _LOGGER = logging.getLogger(__name__)
 
-DOMAIN = "smart_climate_setup_wizard"
+# Integrations that load the helpers of a package file
+HELPER_DOMAINS = ["input_text", "input_datetime", "input_number", "input_boolean", "input_select"]
+
+# Settings that belong to one room and are never copied by a bulk import
+ROOM_SPECIFIC_KEYS = (
+    "room_name",
+    "climate_entities",
+    "temperature_sensor",
+    "room_presence_sensors",
+    "is_bedroom_with_bed_sensor",
+    "bed_sensor_manual",
+)
 
 # Helper definitions matching the blueprint requirements
 HELPER_DEFINITIONS = {
@@ -289,9 +346,321 @@ FEATURE_HELPERS = {
 }
 
 
-def sanitize_room_name(room_name: str) -> str:
-    """Convert room name to valid entity ID format."""
-    return room_name.lower().replace(" ", "_").replace("-", "_")
+def build_helpers_package(config: dict[str, Any]) -> tuple[dict[str, Any], list[str]]:
+    """Return a room's helpers package and the entity_ids it creates."""
+    room_name = config["room_name"]
+    sanitized_name = sanitize_room_name(room_name)
+
+    # Always create base helpers
+    base_helpers = ["last_mode", "last_change"]
+    helpers_to_create = base_helpers.copy()
+
+    # Add optional helpers based on features
+    if config.get("enable_dynamic_adaptation", True):
+        helpers_to_create.extend(FEATURE_HELPERS["dynamic_adaptation"])
+
+    if config.get("enable_manual_override", True):
+        helpers_to_create.extend(FEATURE_HELPERS["manual_override"])
+
+    if config.get("enable_control_mode", True):
+        helpers_to_create.extend(FEATURE_HELPERS["control_mode"])
+
+    if config.get("enable_smart_mode", True):
+        helpers_to_create.extend(FEATURE_HELPERS["smart_mode"])
+
+    # Build YAML configuration for all helpers
+    helpers_config = {}
+    created_helpers = []
+
+    for helper_key in helpers_to_create:
+        helper_def = HELPER_DEFINITIONS[helper_key]
+        entity_id = f"{helper_def['domain']}.climate_{helper_key}_{sanitized_name}"
+        domain = helper_def["domain"]
+        object_id = f"climate_{helper_key}_{sanitized_name}"
+
+        # Initialize domain dict if needed
+        if domain not in helpers_config:
+            helpers_config[domain] = {}
+
+        # Build helper configuration
+        helper_config = {
+            "name": helper_def["name"].format(room=room_name),
+        }
+
+        if helper_def.get("icon"):
+            helper_config["icon"] = helper_def["icon"]
+
+        if domain == "input_text":
+            helper_config["initial"] = helper_def.get("initial", "")
+            helper_config["max"] = helper_def.get("max_length", 255)
+
+        elif domain == "input_datetime":
+            helper_config["has_date"] = helper_def.get("has_date", True)
+            helper_config["has_time"] = helper_def.get("has_time", True)
+
+        elif domain == "input_number":
+            helper_config["min"] = helper_def.get("min", 0)
+            helper_config["max"] = helper_def.get("max", 100)
+            helper_config["step"] = helper_def.get("step", 1)
+            helper_config["initial"] = helper_def.get("initial", 0)
+            helper_config["mode"] = helper_def.get("mode", "box")
+            if "unit_of_measurement" in helper_def:
+                helper_config["unit_of_measurement"] = helper_def["unit_of_measurement"]
+
+        elif domain == "input_boolean":
+            helper_config["initial"] = helper_def.get("initial", False)
+
+        elif domain == "input_select":
+            helper_config["options"] = helper_def.get("options", [])
+            # Use dynamic default for control_mode, otherwise use template default
+            if helper_key == "control_mode" and config.get("default_control_mode"):
+                helper_config["initial"] = config["default_control_mode"]
+            elif helper_def.get("initial"):
+                helper_config["initial"] = helper_def["initial"]
+
+        helpers_config[domain][object_id] = helper_config
+        created_helpers.append(entity_id)
+
+    # Add scripts for Override mode control (v3.13.1 + v5.0.0 fix)
+    if config.get("enable_control_mode", True):
+        helpers_config["script"] = {
+            f"climate_clear_override_{sanitized_name}": {
+                "alias": f"Clear Override - {room_name}",
+                "description": f"Clear manual override mode and return to Smart mode for {room_name}",
+                "sequence": [
+                    {
+                        "service": "input_boolean.turn_off",
+                        "target": {
+                            "entity_id": f"input_boolean.climate_manual_override_{sanitized_name}"
+                        }
+                    },
+                    {
+                        "service": "input_select.select_option",
+                        "data": {
+                            "entity_id": f"input_select.climate_control_mode_{sanitized_name}",
+                            "option": "Smart"
+                        }
+                    }
+                ]
+            },
+            f"climate_clear_ac_override_{sanitized_name}": {
+                "alias": f"Clear AC Override - {room_name}",
+                "description": f"Clear only the AC override, leave fan override intact for {room_name}",
+                "sequence": [
+                    {
+                        "service": "input_boolean.turn_off",
+                        "target": {
+                            "entity_id": f"input_boolean.climate_manual_override_{sanitized_name}"
+                        }
+                    },
+                    {
+                        "service": "input_select.select_option",
+                        "data": {
+                            "entity_id": f"input_select.climate_control_mode_{sanitized_name}",
+                            "option": "Smart"
+                        }
+                    },
+                    {
+                        "service": "input_text.set_value",
+                        "data": {
+                            "entity_id": f"input_text.climate_override_source_{sanitized_name}",
+                            "value": "{{% if states('input_text.climate_override_source_{sn}') == 'both' %}}fan{{% else %}}none{{% endif %}}".format(sn=sanitized_name)
+                        }
+                    }
+                ]
+            },
+            f"climate_clear_fan_override_{sanitized_name}": {
+                "alias": f"Clear Fan Override - {room_name}",
+                "description": f"Clear only the ceiling fan override, leave AC override intact for {room_name}",
+                "sequence": [
+                    {
+                        "service": "input_text.set_value",
+                        "data": {
+                            "entity_id": f"input_text.climate_override_source_{sanitized_name}",
+                            "value": "{{% if states('input_text.climate_override_source_{sn}') == 'both' %}}ac{{% else %}}none{{% endif %}}".format(sn=sanitized_name)
+                        }
+                    },
+                    {
+                        "service": "input_text.set_value",
+                        "data": {
+                            "entity_id": f"input_text.climate_expected_ceiling_fan_{sanitized_name}",
+                            "value": "{{{{ states('fan.{sn}_ceiling_fan') }}}}".format(sn=sanitized_name)
+                        }
+                    }
+                ]
+            },
+            f"climate_set_override_{sanitized_name}": {
+                "alias": f"Set Override - {room_name}",
+                "description": f"Activate manual override mode for {room_name}",
+                "sequence": [
+                    {
+                        "service": "input_select.select_option",
+                        "data": {
+                            "entity_id": f"input_select.climate_control_mode_{sanitized_name}",
+                            "option": "Override"
+                        }
+                    }
+                ]
+            }
+        }
+
+    return helpers_config, created_helpers
+
+
+def _write_package_file(packages_dir: str, sanitized_name: str, helpers_config: dict[str, Any]) -> str:
+    """Atomically write a room's helpers package; return its path."""
+    os.makedirs(packages_dir, exist_ok=True)
+    package_file = os.path.join(packages_dir, f"climate_control_{sanitized_name}.yaml")
+    temp_fd, temp_path = tempfile.mkstemp(dir=packages_dir, text=True)
+    try:
+        with os.fdopen(temp_fd, 'w', encoding='utf-8') as f:
+            try:
+                yaml_io.dump(helpers_config, f, label=package_file)
+            except yaml_io.YAMLError as err:
+                _LOGGER.error("Failed to serialize helpers YAML: %s", err)
+                raise
+            except Exception as err:
+                _LOGGER.error("Unexpected error writing helpers YAML: %s", err)
+                raise
+        shutil.move(temp_path, package_file)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+    return package_file
+
+
+async def async_build_automation(hass: HomeAssistant, config: dict[str, Any]) -> dict[str, Any]:
+    """Return the automations.yaml entry for a room (compiled if configured)."""
+    room_name = config["room_name"]
+    inputs = build_blueprint_inputs(config)
+
+    automation_config = {
+        "id": automation_unique_id(room_name),
+        "alias": f"{room_name} Climate Control",
+        "description": f"Smart climate control for {room_name} - Created by Smart Climate Control Setup Wizard",
+    }
+
+    compiled = None
+    if config.get(CONF_AUTOMATION_OUTPUT) == AUTOMATION_OUTPUT_COMPILED:
+        blueprint_path = hass.config.path("blueprints/automation", BLUEPRINT_PATH)
+
+        periodic_offset = stagger_offset(automation_config["id"], 60)
+
+        def compile_blueprint():
+            return compile_automation(
+                load_blueprint(blueprint_path), inputs, periodic_offset
+            )
+
+        try:
+            compiled, stats = await async_run(hass, compile_blueprint)
+            _LOGGER.info(
+                "Compiled automation for %s: %d variables folded, %d branches pruned",
+                room_name,
+                len(stats.folded),
+                stats.pruned,
+            )
+        except Exception as err:
+            _LOGGER.warning(
+                "Failed to compile blueprint for %s, using blueprint automation instead: %s",
+                room_name,
+                err,
+            )
+
+    if compiled is not None:
+        automation_config.update(compiled)
+    else:
+        automation_config["use_blueprint"] = {
+            "path": BLUEPRINT_PATH,
+            "input": inputs,
+        }
+
+    return automation_config
+
+
+def _store_automations(config_dir: str, storage: str | None, automation_configs: list[dict[str, Any]]) -> None:
+    """Add or replace automations, only touching their own entries.
+
+    The same ids are removed from the other location first, so changing the
+    storage option of a room moves its automations instead of duplicating them.
+    """
+    automation_ids = [automation["id"] for automation in automation_configs]
+    automations_dir = os.path.join(config_dir, AUTOMATIONS_DIR)
+    automations_file = os.path.join(config_dir, AUTOMATIONS_FILE)
+    if storage == AUTOMATION_STORAGE_DIRECTORY:
+        remove_automations(automations_file, automation_ids)
+        ensure_directory_include(os.path.join(config_dir, "configuration.yaml"))
+        write_automation_files(automations_dir, automation_configs)
+    else:
+        remove_automation_files(automations_dir, automation_ids)
+        upsert_automations(automations_file, automation_configs)
+
+
+def _remove_stored_automations(config_dir: str, automation_ids: list[str]) -> int:
+    """Remove automations from both places the wizard may have stored them; return how many."""
+    return remove_automation_files(
+        os.path.join(config_dir, AUTOMATIONS_DIR), automation_ids
+    ) + remove_automations(os.path.join(config_dir, AUTOMATIONS_FILE), automation_ids)
+
+
+def _automation_path(config_dir: str, storage: str | None, automation_id: str) -> str:
+    """Return the file an automation is stored in."""
+    if storage == AUTOMATION_STORAGE_DIRECTORY:
+        return automation_file(os.path.join(config_dir, AUTOMATIONS_DIR), automation_id)
+    return os.path.join(config_dir, AUTOMATIONS_FILE)
+
+
+def _automation_entity_id(automation_config: dict[str, Any]) -> str:
+    """Return the entity_id HA gives an automation (from its alias, not its id)."""
+    return "automation." + automation_config["alias"].lower().replace(" ", "_").replace("-", "_")
+
+
+def parse_room_list(text: str, base: dict[str, Any] | None = None) -> list[dict[str, Any]]:
+    """Parse a YAML/JSON list of room configurations for a bulk import.
+
+    Each room is laid over ``base`` (the settings of a room being cloned,
+    without its room-specific keys). Raises ValueError with a message for
+    the user if the list is not usable.
+    """
+    try:
+        rooms = yaml_io.load(text, label="room list")
+    except yaml_io.YAMLError as err:
+        raise ValueError(f"not valid YAML/JSON ({err})") from err
+    if isinstance(rooms, dict) and "rooms" in rooms:
+        rooms = rooms["rooms"]
+    if not isinstance(rooms, list) or not rooms:
+        raise ValueError("expected a list of rooms")
+
+    base = {key: value for key, value in (base or {}).items() if key not in ROOM_SPECIFIC_KEYS}
+    result = []
+    seen_names = set()
+    seen_entities = set()
+    for index, room in enumerate(rooms, 1):
+        if not isinstance(room, dict):
+            raise ValueError(f"room {index} is not a mapping")
+        room_name = str(room.get("room_name") or "").strip()
+        if not room_name:
+            raise ValueError(f"room {index} has no room_name")
+        climate_entities = room.get("climate_entities")
+        if isinstance(climate_entities, str):
+            climate_entities = [climate_entities]
+        if (
+            not isinstance(climate_entities, list)
+            or not climate_entities
+            or any(not isinstance(e, str) or not e.startswith("climate.") for e in climate_entities)
+        ):
+            raise ValueError(f"{room_name}: climate_entities must list climate entities")
+
+        sanitized_name = sanitize_room_name(room_name)
+        if sanitized_name in seen_names:
+            raise ValueError(f"{room_name} is listed twice")
+        if seen_entities.intersection(climate_entities):
+            raise ValueError(f"{room_name}: A/C units used by more than one room")
+        seen_names.add(sanitized_name)
+        seen_entities.update(climate_entities)
+
+        result.append({**base, **room, "room_name": room_name, "climate_entities": climate_entities})
+    return result
 
 
 class SmartClimateHelperCreatorConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -334,7 +703,8 @@ class SmartClimateHelperCreatorConfigFlow(config_entries.ConfigFlow, domain=DOMA
         if not blueprint_exists:
             # Try to download and install blueprint automatically
             _LOGGER.info("Blueprint not found, attempting automatic installation...")
-            blueprint_installed = await self._download_blueprint_from_github()
+            async with LoopLagMonitor(self.hass, "Blueprint download"):
+                blueprint_installed = await self._download_blueprint_from_github()
 
             if blueprint_installed:
                 # Success! Show confirmation and proceed
@@ -353,7 +723,7 @@ class SmartClimateHelperCreatorConfigFlow(config_entries.ConfigFlow, domain=DOMA
                 )
 
         # Both packages and blueprint ready, proceed to room setup
-        return await self.async_step_room_name()
+        return await self.async_step_setup_mode()
 
     async def async_step_packages_added(
         self, user_input: dict[str, Any] | None = None
@@ -371,7 +741,112 @@ class SmartClimateHelperCreatorConfigFlow(config_entries.ConfigFlow, domain=DOMA
     ) -> FlowResult:
         """Show success message that blueprint was installed."""
         # User clicked Submit/Continue - proceed to room setup
-        return await self.async_step_room_name()
+        return await self.async_step_setup_mode()
+
+    async def async_step_setup_mode(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Choose between setting up one room and importing several."""
+        return self.async_show_menu(
+            step_id="setup_mode",
+            menu_options=["room_name", "bulk_import"],
+        )
+
+    async def async_step_bulk_import(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Set up several rooms at once from a YAML/JSON list."""
+        errors = {}
+        placeholders = {"details": ""}
+        entries = {
+            entry.entry_id: entry
+            for entry in self.hass.config_entries.async_entries(DOMAIN)
+        }
+
+        if user_input is not None:
+            source = entries.get(user_input.get("copy_from", ""))
+            try:
+                rooms = await async_run(
+                    self.hass,
+                    parse_room_list,
+                    user_input["rooms"],
+                    dict(source.data) if source else None,
+                )
+            except ValueError as err:
+                errors["base"] = "invalid_room_list"
+                placeholders["details"] = str(err)
+            else:
+                configured = {entry.unique_id for entry in entries.values()}
+                existing = [
+                    room["room_name"]
+                    for room in rooms
+                    if f"climate_helpers_{sanitize_room_name(room['room_name'])}" in configured
+                ]
+                conflicts = await self._check_climate_entity_conflicts(
+                    [entity for room in rooms for entity in room["climate_entities"]]
+                )
+                if existing:
+                    errors["base"] = "rooms_already_configured"
+                    placeholders["details"] = ", ".join(existing)
+                elif conflicts:
+                    errors["base"] = "climate_entities_in_use"
+                    placeholders["conflicting_rooms"] = ", ".join(conflicts)
+
+            if not errors:
+                try:
+                    async with LoopLagMonitor(self.hass, f"Bulk import of {len(rooms)} rooms"):
+                        await self._create_rooms(self.hass, rooms)
+                except Exception as err:
+                    _LOGGER.error("Bulk import failed: %s", err)
+                    errors["base"] = "create_failed"
+                else:
+                    for room in rooms:
+                        await self.hass.config_entries.flow.async_init(
+                            DOMAIN,
+                            context={"source": config_entries.SOURCE_IMPORT},
+                            data=room,
+                        )
+                    return self.async_abort(
+                        reason="bulk_import_complete",
+                        description_placeholders={
+                            "count": str(len(rooms)),
+                            "rooms": ", ".join(room["room_name"] for room in rooms),
+                        },
+                    )
+
+        schema = {
+            vol.Required(
+                "rooms", default=(user_input or {}).get("rooms", vol.UNDEFINED)
+            ): selector.TextSelector(selector.TextSelectorConfig(multiline=True)),
+        }
+        if entries:
+            schema[vol.Optional("copy_from")] = selector.SelectSelector(
+                selector.SelectSelectorConfig(
+                    options=[
+                        {"label": entry.data.get("room_name", entry.title), "value": entry_id}
+                        for entry_id, entry in entries.items()
+                    ],
+                    mode=selector.SelectSelectorMode.DROPDOWN,
+                )
+            )
+
+        return self.async_show_form(
+            step_id="bulk_import",
+            data_schema=vol.Schema(schema),
+            errors=errors,
+            description_placeholders={"conflicting_rooms": "", **placeholders},
+        )
+
+    async def async_step_import(self, import_data: dict[str, Any]) -> FlowResult:
+        """Create the entry of a room whose helpers and automation already exist."""
+        await self.async_set_unique_id(
+            f"climate_helpers_{sanitize_room_name(import_data['room_name'])}"
+        )
+        self._abort_if_unique_id_configured()
+        return self.async_create_entry(
+            title=f"{import_data['room_name']} Climate Control",
+            data=import_data,
+        )
 
     async def async_step_room_name(
         self, user_input: dict[str, Any] | None = None
@@ -422,6 +897,28 @@ class SmartClimateHelperCreatorConfigFlow(config_entries.ConfigFlow, domain=DOMA
                 vol.Optional("enable_manual_override", default=True): cv.boolean,
                 vol.Optional("enable_control_mode", default=True): cv.boolean,
                 vol.Optional("enable_smart_mode", default=True): cv.boolean,
+                vol.Optional(
+                    CONF_AUTOMATION_OUTPUT, default=AUTOMATION_OUTPUT_BLUEPRINT
+                ): selector.SelectSelector(
+                    selector.SelectSelectorConfig(
+                        options=[
+                            {"label": "Blueprint automation (updates with the blueprint) ⭐ Recommended", "value": AUTOMATION_OUTPUT_BLUEPRINT},
+                            {"label": "Compiled automation (specialized for this room, faster)", "value": AUTOMATION_OUTPUT_COMPILED},
+                        ],
+                        mode=selector.SelectSelectorMode.DROPDOWN,
+                    )
+                ),
+                vol.Optional(
+                    CONF_AUTOMATION_STORAGE, default=AUTOMATION_STORAGE_FILE
+                ): selector.SelectSelector(
+                    selector.SelectSelectorConfig(
+                        options=[
+                            {"label": "automations.yaml (editable in the UI) ⭐ Recommended", "value": AUTOMATION_STORAGE_FILE},
+                            {"label": f"Own file per automation in {AUTOMATIONS_DIR}/", "value": AUTOMATION_STORAGE_DIRECTORY},
+                        ],
+                        mode=selector.SelectSelectorMode.DROPDOWN,
+                    )
+                ),
             }
         )
 
@@ -590,6 +1087,44 @@ class SmartClimateHelperCreatorConfigFlow(config_entries.ConfigFlow, domain=DOMA
             )
         )
 
+        # Gate chatty temperature sensors (0 = every update starts a run);
+        # the deadband stays below the usual 0.1°C sensor resolution
+        data_schema_dict[
+            vol.Optional("temp_trigger_deadband", default=0)
+        ] = selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=0,
+                max=0.09,
+                step=0.01,
+                unit_of_measurement="°C",
+                mode="slider",
+            )
+        )
+        data_schema_dict[
+            vol.Optional("temp_trigger_min_interval", default=0)
+        ] = selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=0,
+                max=300,
+                step=5,
+                unit_of_measurement="seconds",
+                mode="slider",
+            )
+        )
+
+        # Leave out sensors that stopped reporting (0 = trust the last value)
+        data_schema_dict[
+            vol.Optional("temp_sensor_max_age", default=0)
+        ] = selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=0,
+                max=240,
+                step=5,
+                unit_of_measurement="minutes",
+                mode="slider",
+            )
+        )
+
         # Presence sensors (optional, only if smart mode enabled)
         if self._room_data.get("enable_smart_mode", True):
             data_schema_dict[vol.Optional("room_presence_sensors")] = selector.EntitySelector(
@@ -1118,17 +1653,18 @@ class SmartClimateHelperCreatorConfigFlow(config_entries.ConfigFlow, domain=DOMA
 
     async def async_step_create(self, user_input=None):
         """Final step: Create helpers, automation, and config entry."""
-        # Create all helper entities via package file
-        await self._create_helpers(self.hass, self._room_data)
+        room_name = self._room_data["room_name"]
+        async with LoopLagMonitor(self.hass, f"Setup of {room_name}"):
+            # Create all helper entities via package file
+            await self._create_helpers(self.hass, self._room_data)
 
-        # Create main blueprint automation
-        automation_id = await self._create_automation(self.hass, self._room_data)
-        _LOGGER.info("Created main automation: %s", automation_id)
+            # Create main blueprint automation
+            automation_id = await self._create_automation(self.hass, self._room_data)
+            _LOGGER.info("Created main automation: %s", automation_id)
 
         # Note: Turn-off automations are no longer needed - blueprint handles this internally
 
         # Generate and send dashboard card notification
-        room_name = self._room_data["room_name"]
         dashboard_card = self._generate_dashboard_card(self._room_data)
 
         if dashboard_card:
@@ -1241,7 +1777,7 @@ You can dismiss this notification once you've copied the card YAML (if desired).
                 _LOGGER.info("Packages configuration not found in configuration.yaml")
                 return False
 
-            return await self.hass.async_add_executor_job(check_config)
+            return await async_run(self.hass, check_config)
 
         except Exception as err:
             _LOGGER.error("Failed to check packages configuration: %s", err)
@@ -1311,14 +1847,14 @@ You can dismiss this notification once you've copied the card YAML (if desired).
             _LOGGER.info("Added packages configuration to configuration.yaml")
             return True  # Successfully added
 
-        return await self.hass.async_add_executor_job(modify_config)
+        return await async_run(self.hass, modify_config)
 
     async def _check_blueprint_exists(self) -> bool:
         """Check if Ultimate Climate Control blueprint exists."""
         blueprint_path = self.hass.config.path(
             "blueprints/automation/Chris971991/ultimate_climate_control.yaml"
         )
-        exists = os.path.exists(blueprint_path)
+        exists = await async_path_exists(self.hass, blueprint_path)
         if exists:
             _LOGGER.info("Blueprint found at: %s", blueprint_path)
         else:
@@ -1356,11 +1892,12 @@ You can dismiss this notification once you've copied the card YAML (if desired).
                 _LOGGER.error("Downloaded content doesn't appear to be a valid blueprint (doesn't start with 'blueprint:')")
                 return False
 
-            # Validate YAML syntax to catch corrupted downloads
+            # Validate YAML syntax to catch corrupted downloads (the
+            # blueprint loader knows the !input tag, safe_load does not)
             try:
-                yaml.safe_load(blueprint_content)
+                await async_run(self.hass, parse_blueprint, blueprint_content)
                 _LOGGER.info("Blueprint YAML validation passed")
-            except yaml.YAMLError as err:
+            except yaml_io.YAMLError as err:
                 _LOGGER.error("Downloaded content is not valid YAML: %s", err)
                 return False
 
@@ -1388,7 +1925,7 @@ You can dismiss this notification once you've copied the card YAML (if desired).
 
                 _LOGGER.info("Blueprint saved to: %s", blueprint_path)
 
-            await self.hass.async_add_executor_job(prepare_and_write)
+            await async_run(self.hass, prepare_and_write)
 
             # Reload automations to make blueprint appear in UI
             _LOGGER.info("Reloading automations to register blueprint...")
@@ -1428,250 +1965,43 @@ You can dismiss this notification once you've copied the card YAML (if desired).
                     os.unlink(old_package_file)
                     _LOGGER.info("Deleted old package file: %s", old_package_file)
 
-            await hass.async_add_executor_job(delete_old_package)
-
-            # Reload helpers to remove old entities from registry
-            for domain in ["input_text", "input_datetime", "input_number", "input_boolean", "input_select"]:
-                await hass.services.async_call(domain, "reload", blocking=True)
-
-            await asyncio.sleep(1)  # Brief pause for cleanup
-
-        # Always create base helpers
-        base_helpers = ["last_mode", "last_change"]
-        helpers_to_create = base_helpers.copy()
+            await async_run(hass, delete_old_package)
 
-        # Add optional helpers based on features
-        if config.get("enable_dynamic_adaptation", True):
-            helpers_to_create.extend(FEATURE_HELPERS["dynamic_adaptation"])
+            # Reload helpers to remove old entities from registry (blocking, so
+            # the old entities are gone when this returns)
+            await async_reload_domains(hass, HELPER_DOMAINS)
 
-        if config.get("enable_manual_override", True):
-            helpers_to_create.extend(FEATURE_HELPERS["manual_override"])
-
-        if config.get("enable_control_mode", True):
-            helpers_to_create.extend(FEATURE_HELPERS["control_mode"])
-
-        if config.get("enable_smart_mode", True):
-            helpers_to_create.extend(FEATURE_HELPERS["smart_mode"])
-
-        # Build YAML configuration for all helpers
-        helpers_config = {}
-        created_helpers = []
-
-        for helper_key in helpers_to_create:
-            helper_def = HELPER_DEFINITIONS[helper_key]
-            entity_id = f"{helper_def['domain']}.climate_{helper_key}_{sanitized_name}"
-            domain = helper_def["domain"]
-            object_id = f"climate_{helper_key}_{sanitized_name}"
-
-            # Initialize domain dict if needed
-            if domain not in helpers_config:
-                helpers_config[domain] = {}
-
-            # Build helper configuration
-            helper_config = {
-                "name": helper_def["name"].format(room=room_name),
-            }
-
-            if helper_def.get("icon"):
-                helper_config["icon"] = helper_def["icon"]
-
-            if domain == "input_text":
-                helper_config["initial"] = helper_def.get("initial", "")
-                helper_config["max"] = helper_def.get("max_length", 255)
-
-            elif domain == "input_datetime":
-                helper_config["has_date"] = helper_def.get("has_date", True)
-                helper_config["has_time"] = helper_def.get("has_time", True)
-
-            elif domain == "input_number":
-                helper_config["min"] = helper_def.get("min", 0)
-                helper_config["max"] = helper_def.get("max", 100)
-                helper_config["step"] = helper_def.get("step", 1)
-                helper_config["initial"] = helper_def.get("initial", 0)
-                helper_config["mode"] = helper_def.get("mode", "box")
-                if "unit_of_measurement" in helper_def:
-                    helper_config["unit_of_measurement"] = helper_def["unit_of_measurement"]
-
-            elif domain == "input_boolean":
-                helper_config["initial"] = helper_def.get("initial", False)
-
-            elif domain == "input_select":
-                helper_config["options"] = helper_def.get("options", [])
-                # Use dynamic default for control_mode, otherwise use template default
-                if helper_key == "control_mode" and config.get("default_control_mode"):
-                    helper_config["initial"] = config["default_control_mode"]
-                elif helper_def.get("initial"):
-                    helper_config["initial"] = helper_def["initial"]
-
-            helpers_config[domain][object_id] = helper_config
-            created_helpers.append(entity_id)
-
-        # Add scripts for Override mode control (v3.13.1 + v5.0.0 fix)
-        if config.get("enable_control_mode", True):
-            helpers_config["script"] = {
-                f"climate_clear_override_{sanitized_name}": {
-                    "alias": f"Clear Override - {room_name}",
-                    "description": f"Clear manual override mode and return to Smart mode for {room_name}",
-                    "sequence": [
-                        {
-                            "service": "input_boolean.turn_off",
-                            "target": {
-                                "entity_id": f"input_boolean.climate_manual_override_{sanitized_name}"
-                            }
-                        },
-                        {
-                            "service": "input_select.select_option",
-                            "data": {
-                                "entity_id": f"input_select.climate_control_mode_{sanitized_name}",
-                                "option": "Smart"
-                            }
-                        }
-                    ]
-                },
-                f"climate_clear_ac_override_{sanitized_name}": {
-                    "alias": f"Clear AC Override - {room_name}",
-                    "description": f"Clear only the AC override, leave fan override intact for {room_name}",
-                    "sequence": [
-                        {
-                            "service": "input_boolean.turn_off",
-                            "target": {
-                                "entity_id": f"input_boolean.climate_manual_override_{sanitized_name}"
-                            }
-                        },
-                        {
-                            "service": "input_select.select_option",
-                            "data": {
-                                "entity_id": f"input_select.climate_control_mode_{sanitized_name}",
-                                "option": "Smart"
-                            }
-                        },
-                        {
-                            "service": "input_text.set_value",
-                            "data": {
-                                "entity_id": f"input_text.climate_override_source_{sanitized_name}",
-                                "value": "{{% if states('input_text.climate_override_source_{sn}') == 'both' %}}fan{{% else %}}none{{% endif %}}".format(sn=sanitized_name)
-                            }
-                        }
-                    ]
-                },
-                f"climate_clear_fan_override_{sanitized_name}": {
-                    "alias": f"Clear Fan Override - {room_name}",
-                    "description": f"Clear only the ceiling fan override, leave AC override intact for {room_name}",
-                    "sequence": [
-                        {
-                            "service": "input_text.set_value",
-                            "data": {
-                                "entity_id": f"input_text.climate_override_source_{sanitized_name}",
-                                "value": "{{% if states('input_text.climate_override_source_{sn}') == 'both' %}}ac{{% else %}}none{{% endif %}}".format(sn=sanitized_name)
-                            }
-                        },
-                        {
-                            "service": "input_text.set_value",
-                            "data": {
-                                "entity_id": f"input_text.climate_expected_ceiling_fan_{sanitized_name}",
-                                "value": "{{{{ states('fan.{sn}_ceiling_fan') }}}}".format(sn=sanitized_name)
-                            }
-                        }
-                    ]
-                },
-                f"climate_set_override_{sanitized_name}": {
-                    "alias": f"Set Override - {room_name}",
-                    "description": f"Activate manual override mode for {room_name}",
-                    "sequence": [
-                        {
-                            "service": "input_select.select_option",
-                            "data": {
-                                "entity_id": f"input_select.climate_control_mode_{sanitized_name}",
-                                "option": "Override"
-                            }
-                        }
-                    ]
-                }
-            }
+        helpers_config, created_helpers = build_helpers_package(config)
 
         # Write YAML package file
         try:
             packages_dir = os.path.join(hass.config.config_dir, "packages")
-            try:
-                os.makedirs(packages_dir, exist_ok=True)
-            except OSError as err:
-                if err.errno != errno.EEXIST:
-                    raise
-
             package_file = os.path.join(packages_dir, f"climate_control_{sanitized_name}.yaml")
-
-            def write_package():
-                # Atomic write
-                temp_fd, temp_path = tempfile.mkstemp(dir=packages_dir, text=True)
-                try:
-                    with os.fdopen(temp_fd, 'w', encoding='utf-8') as f:
-                        try:
-                            yaml.dump(helpers_config, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
-                        except yaml.YAMLError as err:
-                            _LOGGER.error("Failed to serialize helpers YAML: %s", err)
-                            raise
-                        except Exception as err:
-                            _LOGGER.error("Unexpected error writing helpers YAML: %s", err)
-                            raise
-                    shutil.move(temp_path, package_file)
-                except Exception:
-                    if os.path.exists(temp_path):
-                        os.unlink(temp_path)
-                    raise
-
-            await hass.async_add_executor_job(write_package)
+            await async_run(
+                hass, _write_package_file, packages_dir, sanitized_name, helpers_config
+            )
             _LOGGER.info("Created package file: %s", package_file)
 
             # Reload helper domains and scripts to load entities from new package file
             # v5.0.0 FIX: Use individual domain reloads (reload_core_config doesn't load helpers/scripts)
             _LOGGER.info("Reloading helper domains and scripts to load new package file...")
-            for domain in ["input_text", "input_datetime", "input_number", "input_boolean", "input_select", "script"]:
-                await hass.services.async_call(domain, "reload", blocking=True)
-
-            # Add delay to ensure entities are fully registered in state machine
-            # Package files need more time to load than service-created helpers
-            # v5.0.0: Increased wait time for state machine helpers (input_select with 8 options)
-            _LOGGER.info("Waiting for helper entities to register in state machine...")
-            await asyncio.sleep(8)
-
-            # Verify all helpers were successfully created with multiple retry attempts
-            # v5.0.0: Enhanced retry logic - state machine helpers need more time to register
-            _LOGGER.info("Verifying %d helpers were created...", len(created_helpers))
-            max_retries = 4
-            retry_delay = 5  # seconds between retries
-
-            for retry in range(max_retries):
-                failed_helpers = []
-                for helper_id in created_helpers:
-                    if hass.states.get(helper_id) is None:
-                        failed_helpers.append(helper_id)
-
-                if not failed_helpers:
-                    _LOGGER.info("✅ All helpers verified successfully%s", f" (after {retry} retries)" if retry > 0 else "")
-                    break
+            await async_reload_domains(hass, [*HELPER_DOMAINS, "script"])
 
-                if retry < max_retries - 1:
-                    _LOGGER.warning(
-                        "⏳ Retry %d/%d: %d helpers not yet available: %s. Waiting %ds...",
-                        retry + 1,
-                        max_retries,
-                        len(failed_helpers),
-                        failed_helpers,
-                        retry_delay
-                    )
-                    await asyncio.sleep(retry_delay)
-                else:
-                    # Final retry failed
-                    total_wait = 8 + (retry_delay * max_retries)
-                    _LOGGER.error(
-                        "❌ Helpers failed to register after %ds (%d retries): %s",
-                        total_wait,
-                        max_retries,
-                        failed_helpers
-                    )
-                    raise Exception(
-                        f"Helper creation failed - {len(failed_helpers)} helpers not registered after {total_wait}s: {', '.join(failed_helpers)}"
-                    )
+            # Continue as soon as every helper is in the state machine
+            _LOGGER.info("Waiting for %d helpers to register...", len(created_helpers))
+            failed_helpers = await async_wait_for_entities(
+                hass, created_helpers, HELPER_WAIT_TIMEOUT
+            )
+            if failed_helpers:
+                _LOGGER.error(
+                    "❌ Helpers failed to register after %ds: %s",
+                    HELPER_WAIT_TIMEOUT,
+                    sorted(failed_helpers),
+                )
+                raise Exception(
+                    f"Helper creation failed - {len(failed_helpers)} helpers not registered after {HELPER_WAIT_TIMEOUT}s: {', '.join(sorted(failed_helpers))}"
+                )
+            _LOGGER.info("✅ All helpers verified successfully")
 
             self._created_helpers = created_helpers
             _LOGGER.info(
@@ -1684,335 +2014,138 @@ You can dismiss this notification once you've copied the card YAML (if desired).
             _LOGGER.error("Failed to create helpers package: %s", err)
             # CRITICAL FIX: Clean up package file on failure to prevent orphaned files
             try:
-                if 'package_file' in locals() and os.path.exists(package_file):
+                if 'package_file' in locals() and await async_path_exists(hass, package_file):
                     _LOGGER.warning("Cleaning up package file due to failure: %s", package_file)
-                    await hass.async_add_executor_job(os.unlink, package_file)
+                    await async_run(hass, os.unlink, package_file)
             except Exception as cleanup_err:
                 _LOGGER.error("Failed to cleanup package file: %s", cleanup_err)
             raise
 
-    async def _create_automation(
-        self, hass: HomeAssistant, config: dict[str, Any]
-    ) -> str:
-        """Create automation with blueprint."""
-        room_name = config["room_name"]
-        sanitized_name = sanitize_room_name(room_name)
+    async def _create_rooms(
+        self, hass: HomeAssistant, rooms: list[dict[str, Any]]
+    ) -> None:
+        """Create helpers and automations for several rooms in one pass.
 
-        # Build helper entity IDs
-        helpers = {
-            "helper_last_mode": f"input_text.climate_last_mode_{sanitized_name}",
-            "helper_last_change": f"input_datetime.climate_last_change_{sanitized_name}",
-        }
+        All package files and automations.yaml are written together, then
+        every integration is reloaded once, however many rooms there are. If
+        anything fails, every package and automation of the import is removed
+        again and the integrations are reloaded, so nothing is left half set up.
+        """
+        packages_dir = os.path.join(hass.config.config_dir, "packages")
 
-        # Add optional helpers based on enabled features
-        if config.get("enable_control_mode", True):
-            helpers["helper_control_mode"] = f"input_select.climate_control_mode_{sanitized_name}"
-
-        if config.get("enable_smart_mode", True):
-            helpers["helper_presence_detected"] = f"input_datetime.climate_presence_detected_{sanitized_name}"
-            helpers["helper_presence_validation_active"] = f"input_boolean.climate_presence_validation_active_{sanitized_name}"
-            helpers["helper_proximity_override"] = f"input_boolean.climate_proximity_override_{sanitized_name}"
-
-        if config.get("enable_dynamic_adaptation", True):
-            helpers["helper_temp_history"] = f"input_number.climate_temp_history_{sanitized_name}"
-            helpers["helper_trend_direction"] = f"input_text.climate_trend_direction_{sanitized_name}"
-            helpers["helper_mode_start_time"] = f"input_datetime.climate_mode_start_time_{sanitized_name}"
-            helpers["helper_effectiveness_score"] = f"input_number.climate_effectiveness_score_{sanitized_name}"
-            helpers["helper_temp_stable_since"] = f"input_datetime.climate_temp_stable_since_{sanitized_name}"
-            helpers["helper_last_transition"] = f"input_text.climate_last_transition_{sanitized_name}"
-
-        if config.get("enable_manual_override", True):
-            if "helper_proximity_override" not in helpers:
-                helpers["helper_proximity_override"] = f"input_boolean.climate_proximity_override_{sanitized_name}"
-            helpers["helper_override_active"] = f"input_boolean.climate_manual_override_{sanitized_name}"
-            helpers["helper_mode_before_override"] = f"input_text.climate_mode_before_override_{sanitized_name}"
-            helpers["helper_override_time"] = f"input_datetime.climate_override_time_{sanitized_name}"
-            helpers["helper_override_timeout"] = f"input_number.climate_override_timeout_{sanitized_name}"
-            helpers["helper_expected_temp"] = f"input_number.climate_expected_temp_{sanitized_name}"
-            helpers["helper_expected_fan"] = f"input_text.climate_expected_fan_{sanitized_name}"
-            helpers["helper_expected_swing"] = f"input_text.climate_expected_swing_{sanitized_name}"
-            helpers["helper_expected_hvac"] = f"input_text.climate_expected_hvac_{sanitized_name}"
-            helpers["helper_expected_ceiling_fan"] = f"input_text.climate_expected_ceiling_fan_{sanitized_name}"
-            helpers["helper_override_source"] = f"input_text.climate_override_source_{sanitized_name}"
-            # v5.0.0: Add new state machine helpers
-            helpers["helper_state_machine"] = f"input_select.climate_state_machine_{sanitized_name}"
-            helpers["helper_state_start"] = f"input_datetime.climate_state_start_{sanitized_name}"
-            helpers["helper_last_command"] = f"input_text.climate_last_command_{sanitized_name}"
-            helpers["helper_state_checksum"] = f"input_number.climate_state_checksum_{sanitized_name}"
-
-        # Build automation config with ALL blueprint inputs explicitly written
-        # This ensures transparency and prevents blueprint version changes from altering behavior
-        comfort_width = config.get("comfort_zone_width", 1.0)
+        packages = {}
+        created_helpers = []
+        for room in rooms:
+            helpers_config, room_helpers = build_helpers_package(room)
+            packages[sanitize_room_name(room["room_name"])] = helpers_config
+            created_helpers.extend(room_helpers)
+        package_files = [
+            os.path.join(packages_dir, f"climate_control_{sanitized_name}.yaml")
+            for sanitized_name in packages
+        ]
+        automation_configs = [await async_build_automation(hass, room) for room in rooms]
+        automation_ids = [automation_config["id"] for automation_config in automation_configs]
+        by_storage: dict[str | None, list[dict[str, Any]]] = {}
+        for room, automation_config in zip(rooms, automation_configs):
+            by_storage.setdefault(room.get(CONF_AUTOMATION_STORAGE), []).append(automation_config)
+
+        # Helpers left over from a removed room: delete their old package
+        # first to avoid duplicate IDs, as _create_helpers does
+        stale = [
+            sanitized_name
+            for sanitized_name in packages
+            if await self._check_helper_exists(f"input_text.climate_last_mode_{sanitized_name}")
+        ]
+        if stale:
+            _LOGGER.info(
+                "Helpers for %s already exist - deleting old package files to avoid conflicts.",
+                ", ".join(stale),
+            )
 
-        automation_config = {
-            "id": f"climate_control_{sanitized_name}",
-            "alias": f"{room_name} Climate Control",
-            "description": f"Smart climate control for {room_name} - Created by Smart Climate Control Setup Wizard",
-            "use_blueprint": {
-                "path": "Chris971991/ultimate_climate_control.yaml",
-                "input": {
-                    # ========================================
-                    # CORE SETTINGS
-                    # ========================================
-                    "room_name": room_name,
-                    "climate_entities": config["climate_entities"],
-                    **helpers,
-
-                    # ========================================
-                    # TEMPERATURE SETTINGS
-                    # ========================================
-                    "target_temperature": config.get("target_temperature", 22),
-                    "comfort_zone_width": comfort_width,
-                    "target_overshoot_strategy": config.get("target_overshoot_strategy", "moderate"),
-                    "enable_heating_mode": config.get("enable_heating", True),
-                    "enable_cooling_mode": config.get("enable_cooling", True),
-
-                    # Advanced temperature control (disabled by default)
-                    "enable_advanced_temp": False,
-                    "comfort_min_temp": 21.0,  # Only used if enable_advanced_temp=true
-                    "comfort_max_temp": 25.0,  # Only used if enable_advanced_temp=true
-                    "cooling_target_temp": 22.0,  # Only used if enable_advanced_temp=true
-                    "heating_target_temp": 22.0,  # Only used if enable_advanced_temp=true
-                    "use_average_temperature": False,
-                    "comfort_zone_action": "off",  # What to do when in comfort zone
-                    "hysteresis_tolerance": 0.3,  # Prevent rapid mode switching
-
-                    # ========================================
-                    # DYNAMIC ADAPTATION & ESCALATION (CRITICAL!)
-                    # ========================================
-                    "enable_dynamic_adaptation": True,  # MUST be enabled for escalation to work!
-                    "effectiveness_check_minutes": 5,  # How often to check temperature progress
-                    "temperature_aggressiveness": 3,  # Escalation sensitivity (1=gentle, 5=aggressive)
-                    "escalation_temp_tolerance": comfort_width,  # Distance from target before escalating
-                    "minimum_progress_rate": 0.01,  # Minimum °C/min progress required
-                    "stall_escalation_time": 15,  # Minutes before escalating if stalled
-                    "extended_stall_multiplier": 30,  # Emergency escalation multiplier
-                    "deescalation_approach_threshold": 0.8,  # Start reducing power within this distance
-                    "enable_dynamic_target_adjustment": config.get("enable_dynamic_target_adjustment", False),
-                    "escalation_target_offset": config.get("escalation_target_offset", 1.0),
-                    "enable_wrong_direction_escalation": config.get("enable_wrong_direction_escalation", True),
-                    "wrong_direction_escalation_per_check": config.get("wrong_direction_escalation_per_check", 1),
-                    "wrong_direction_min_rate": config.get("wrong_direction_min_rate", 0.05),
-
-                    # ========================================
-                    # TIMING & COMPRESSOR PROTECTION
-                    # ========================================
-                    "check_interval_minutes": 5,  # FIX: Correct input name!
-                    "min_runtime_minutes": config.get("min_runtime_minutes", 15),
-                    "min_off_time_minutes": config.get("min_off_time_minutes", 10),
-                    "enforce_off_time_protection": config.get("enforce_off_time_protection", True),
-
-                    # ========================================
-                    # FAN SPEED SETTINGS
-                    # ========================================
-                    "fan_speed_max": "Level 5",  # Maximum escalation fan speed
-                    "fan_speed_medium": "Level 3",  # Medium escalation fan speed
-                    "fan_speed_eco": config.get("fan_speed_eco", "Level 1"),  # ECO mode fan speed
-                    "fan_only_fan_speed": "Auto",  # Fan-only mode fan speed
-                    "swing_mode_active": True,  # Enable swing mode control
-
-                    # ========================================
-                    # PRESENCE DETECTION & SMART MODE
-                    # ========================================
-                    "presence_timeout_minutes": 30,  # How long to wait before turning off
-                    "presence_confirmation_delay": config.get("presence_confirmation_delay", 0),
-                    "presence_validation_mode": "any",  # Will be overridden below based on sensors
-                    "adjacent_room_names": [],  # Adjacent room detection (disabled by default)
-
-                    # Temperature stability detection
-                    "temp_stability_enabled": False,
-                    "stability_tolerance": 0.2,
-                    "stability_duration": 10,
-                    "stability_behavior": config.get("stability_behavior", "off"),
-                    "smart_mode_behavior": config.get("smart_mode_behavior", "eco"),
-
-                    # ========================================
-                    # AWAY MODE & PRE-CONDITIONING
-                    # ========================================
-                    "enable_away_mode": True,
-                    "away_mode_action": config.get("away_mode_action", "eco"),
-                    "enable_pre_conditioning": False,  # Disabled by default
-                    "eco_mode_setpoint_offset": 2,  # °C offset for ECO mode
-
-                    # ========================================
-                    # BED COMFORT MODE
-                    # ========================================
-                    "bed_comfort_mode": config.get("bed_comfort_mode", "off"),
-                    "bed_sensor_manual": config.get("bed_sensor_manual", None) if config.get("bed_sensor_manual") else None,
-                    "bed_absence_grace_period": 30,  # Minutes grace after leaving bed
-                    "bed_eco_fan_only_mode": False,  # Use fan-only in bed ECO
-                    "bed_eco_stability_minutes": 15,  # Stability time for bed ECO
-                    "bed_eco_stability_rate": 0.02,  # °C/min threshold
-                    "bed_eco_return_threshold": 1.0,  # °C distance to exit bed ECO
-                    "bed_eco_max_overshoot": 0.5,  # Max °C overshoot allowed
-                    "bed_eco_near_target_threshold": 0.3,  # °C threshold for escalation suppression in bed ECO
-
-                    # ========================================
-                    # EXTREME TEMPERATURE OVERRIDE
-                    # ========================================
-                    "extreme_temp_override": True,  # Enable extreme temp bypass
-                    "extreme_high_temp": 32,  # °C threshold for extreme heat
-                    "extreme_low_temp": 10,  # °C threshold for extreme cold
-
-                    # ========================================
-                    # SCHEDULING (Disabled by default)
-                    # ========================================
-                    "enable_scheduling": False,
-                    "morning_temp": 22,
-                    "day_temp": 24,
-                    "evening_temp": 23,
-                    "night_temp": 20,
-                    "enable_weekend_schedule": False,
-                    "weekend_morning_temp": 22,
-                    "weekend_day_temp": 24,
-                    "weekend_night_temp": 20,
-
-                    # ========================================
-                    # WINDOW DETECTION (Disabled by default)
-                    # ========================================
-                    "enable_window_detection": False,
-                    "window_sensors": [],
-                    "window_open_delay": 120,  # Seconds before turning off
-                    "window_close_delay": 60,  # Seconds before turning back on
-
-                    # ========================================
-                    # OUTSIDE TEMPERATURE COMPENSATION (Disabled by default)
-                    # ========================================
-                    "enable_outside_temp_compensation": False,
-                    "weather_entity": None,
-                    "outdoor_temp_sensor": None,
-                    "outside_compensation_factor": 0.2,  # Mild compensation
-                    "max_outside_compensation": 2,  # Conservative max
-                    "outside_compensation_base_temp": 25,  # Neutral baseline
-
-                    # ========================================
-                    # MANUAL OVERRIDE DETECTION
-                    # ========================================
-                    "enable_manual_override_detection": True,
-                    "override_timeout": 2,  # Hours before auto-resuming
-                    "manual_mode_timeout": 24,  # Hours before manual mode expires
-
-                    # ========================================
-                    # AC TEMPERATURE LIMITS
-                    # ========================================
-                    "ac_minimum_temp": config.get("ac_minimum_temp", 0),  # 0 = use AC's own limits
-                    "ac_maximum_temp": config.get("ac_maximum_temp", 0),  # 0 = use AC's own limits
-
-                    # ========================================
-                    # NOTIFICATIONS
-                    # ========================================
-                    "enable_notifications": config.get("enable_notifications", False),
-                    "notification_service": "notify.notify",  # Default notification service
-
-                    # ========================================
-                    # DEBUGGING & LOGGING
-                    # ========================================
-                    "enable_full_debug_logging": True,  # CRITICAL: Always enable for new setups!
-                    "enable_event_logging": False,  # Detailed event logs (optional)
-
-                    # ========================================
-                    # SENSORS (Conditionally set below)
-                    # ========================================
-                    "temperature_sensor": config.get("temperature_sensor", []) if config.get("temperature_sensor") else [],
-                    "room_presence_sensors": config.get("room_presence_sensors", []),
-                    "presence_persons": config.get("presence_persons", []),
-                    "presence_devices": config.get("presence_devices", []),
-                    "proximity_sensor": config.get("proximity_sensor", None) if config.get("proximity_sensor") else None,
-                    "direction_sensor": config.get("direction_sensor", None) if config.get("direction_sensor") else None,
-                    "home_zone_distance": config.get("home_zone_distance", 10000),
-                },
-            },
-        }
+            def delete_old_packages():
+                for sanitized_name in stale:
+                    old_package_file = os.path.join(
+                        packages_dir, f"climate_control_{sanitized_name}.yaml"
+                    )
+                    if os.path.exists(old_package_file):
+                        os.unlink(old_package_file)
+                        _LOGGER.info("Deleted old package file: %s", old_package_file)
 
-        # Override presence validation mode based on sensor configuration (v3.4.0 enhanced modes)
-        # Intelligently choose best mode based on available sensors
-        has_bed_sensor = config.get("is_bedroom_with_bed_sensor", False)
-        has_room_sensors = bool(config.get("room_presence_sensors"))
-
-        if has_bed_sensor and has_room_sensors:
-            # Has both BLE/motion and bed sensor -> use BLE_SMART for intelligent detection
-            automation_config["use_blueprint"]["input"]["presence_validation_mode"] = "ble_smart"
-        elif has_bed_sensor:
-            # Only has bed sensor -> use BED_ONLY mode
-            automation_config["use_blueprint"]["input"]["presence_validation_mode"] = "bed_only"
-        elif has_room_sensors:
-            # Only has BLE/motion -> use BLE_MOTION for best accuracy
-            automation_config["use_blueprint"]["input"]["presence_validation_mode"] = "ble_motion"
-        else:
-            # No sensors configured -> fallback to ANY mode (already set as default above)
-            pass
+            await async_run(hass, delete_old_packages)
+            await async_reload_domains(hass, HELPER_DOMAINS)
 
-        # Read existing automations
-        automations_file = hass.config.path("automations.yaml")
+        def write_all():
+            for sanitized_name, helpers_config in packages.items():
+                _write_package_file(packages_dir, sanitized_name, helpers_config)
+            for storage, configs in by_storage.items():
+                _store_automations(hass.config.config_dir, storage, configs)
 
-        def read_automations():
-            try:
-                if os.path.exists(automations_file):
-                    with open(automations_file, "r", encoding="utf-8") as f:
-                        return yaml.safe_load(f) or []
-                else:
-                    return []
-            except Exception as err:
-                _LOGGER.error("Failed to read automations.yaml: %s", err)
-                return []
+        def remove_all():
+            for package_file in package_files:
+                if os.path.exists(package_file):
+                    _LOGGER.warning("Cleaning up package file due to failure: %s", package_file)
+                    os.unlink(package_file)
+            _remove_stored_automations(hass.config.config_dir, automation_ids)
 
-        automations = await hass.async_add_executor_job(read_automations)
+        try:
+            await async_run(hass, write_all)
+            _LOGGER.info(
+                "Wrote %d package files and %d automations", len(packages), len(automation_configs)
+            )
 
-        # Check for automation ID conflict - if exists, replace it
-        automation_id = automation_config["id"]
-        existing_ids = [auto.get("id") for auto in automations if auto.get("id")]
+            await async_reload_domains(hass, [*HELPER_DOMAINS, "script"])
+            failed_helpers = await async_wait_for_entities(hass, created_helpers, HELPER_WAIT_TIMEOUT)
+            if failed_helpers:
+                raise Exception(
+                    f"Helper creation failed - {len(failed_helpers)} helpers not registered after {HELPER_WAIT_TIMEOUT}s: {', '.join(sorted(failed_helpers))}"
+                )
 
-        if automation_id in existing_ids:
-            # Automation with this ID already exists - remove old one
-            _LOGGER.info(
-                "Automation ID '%s' already exists - replacing with updated configuration", automation_id
+            await hass.services.async_call("automation", "reload", blocking=True)
+            failed_automations = await async_wait_for_entities(
+                hass,
+                [_automation_entity_id(config) for config in automation_configs],
+                AUTOMATION_WAIT_TIMEOUT,
             )
-            automations = [auto for auto in automations if auto.get("id") != automation_id]
+            if failed_automations:
+                raise Exception(f"Automations failed to load: {', '.join(sorted(failed_automations))}")
+        except Exception:
+            # Roll the whole import back; orphaned automations would run on
+            # the next reload without a config entry behind them
+            try:
+                await async_run(hass, remove_all)
+                await async_reload_domains(hass, [*HELPER_DOMAINS, "script", "automation"])
+            except Exception as cleanup_err:
+                _LOGGER.error("Failed to clean up after the bulk import: %s", cleanup_err)
+            raise
+        _LOGGER.info("Bulk import created %d rooms", len(rooms))
 
-        # Add new automation
-        automations.append(automation_config)
+    async def _create_automation(
+        self, hass: HomeAssistant, config: dict[str, Any]
+    ) -> str:
+        """Create automation with blueprint."""
+        automation_config = await async_build_automation(hass, config)
+        storage = config.get(CONF_AUTOMATION_STORAGE)
+        automations_file = _automation_path(hass.config.config_dir, storage, automation_config["id"])
 
-        # Write back
         def write_automations():
             try:
-                # Atomic write
-                automations_dir = os.path.dirname(automations_file)
-                temp_fd, temp_path = tempfile.mkstemp(dir=automations_dir, text=True)
-                try:
-                    with os.fdopen(temp_fd, 'w', encoding='utf-8') as f:
-                        try:
-                            yaml.dump(automations, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
-                        except yaml.YAMLError as err:
-                            _LOGGER.error("Failed to serialize automations YAML: %s", err)
-                            raise
-                        except Exception as err:
-                            _LOGGER.error("Unexpected error writing automations YAML: %s", err)
-                            raise
-                    shutil.move(temp_path, automations_file)
-                except Exception:
-                    if os.path.exists(temp_path):
-                        os.unlink(temp_path)
-                    raise
-                _LOGGER.info("Added automation to automations.yaml: %s", automation_config["id"])
+                _store_automations(hass.config.config_dir, storage, [automation_config])
+                _LOGGER.info("Added automation to %s: %s", automations_file, automation_config["id"])
             except Exception as err:
                 _LOGGER.error("Failed to write automations.yaml: %s", err)
                 raise
 
-        await hass.async_add_executor_job(write_automations)
+        await async_run(hass, write_automations)
 
         # Reload automations
         try:
             await hass.services.async_call("automation", "reload", blocking=True)
             _LOGGER.info("Reloaded automations successfully")
 
-            # Add delay to ensure automation is registered (increased from 1s to 3s)
-            await asyncio.sleep(3)
-
-            # Verify automation was loaded by checking if entity exists
+            # Verify automation was loaded by waiting for its entity
             # Note: HA creates entity_id from alias, not id (e.g., "Office Climate Control" -> "automation.office_climate_control")
-            slugified_alias = automation_config['alias'].lower().replace(' ', '_').replace('-', '_')
-            automation_entity_id = f"automation.{slugified_alias}"
-            if hass.states.get(automation_entity_id) is None:
+            automation_entity_id = _automation_entity_id(automation_config)
+            if await async_wait_for_entities(hass, [automation_entity_id], AUTOMATION_WAIT_TIMEOUT):
                 _LOGGER.error("Automation entity not found after reload: %s", automation_entity_id)
                 raise Exception(f"Automation failed to load: {automation_entity_id}")
 
@@ -2024,13 +2157,12 @@ You can dismiss this notification once you've copied the card YAML (if desired).
             # Try to validate automations.yaml to provide helpful error (non-blocking)
             def validate_yaml():
                 try:
-                    with open(automations_file, "r", encoding="utf-8") as f:
-                        yaml.safe_load(f)
-                except yaml.YAMLError as yaml_err:
-                    _LOGGER.error("automations.yaml has invalid YAML: %s", yaml_err)
+                    yaml_io.load_file(automations_file)
+                except yaml_io.YAMLError as yaml_err:
+                    _LOGGER.error("%s has invalid YAML: %s", automations_file, yaml_err)
                     raise Exception(f"Automation file corrupted - YAML error: {yaml_err}")
 
-            await hass.async_add_executor_job(validate_yaml)
+            await async_run(hass, validate_yaml)
             raise
 
         return automation_config["id"]
@@ -2168,75 +2300,29 @@ You can dismiss this notification once you've copied the card YAML (if desired).
             ],
         }
 
-        # Write automation to automations.yaml
-        automations_path = hass.config.path("automations.yaml")
-
-        # Read existing automations (non-blocking)
-        def read_automations():
-            try:
-                if os.path.exists(automations_path):
-                    with open(automations_path, "r", encoding="utf-8") as f:
-                        return yaml.safe_load(f) or []
-                else:
-                    return []
-            except Exception as err:
-                _LOGGER.error("Failed to read automations.yaml: %s", err)
-                return []
+        # Write automation next to the room's main automation
+        storage = config.get(CONF_AUTOMATION_STORAGE)
+        automations_path = _automation_path(hass.config.config_dir, storage, turnoff_automation["id"])
 
-        existing = await hass.async_add_executor_job(read_automations)
-
-        # Check if automation already exists - if so, replace it
-        existing_ids = [auto.get("id") for auto in existing if isinstance(auto, dict)]
-        if turnoff_automation["id"] in existing_ids:
-            _LOGGER.info(
-                "Turn-off automation ID '%s' already exists - replacing with updated configuration", turnoff_automation["id"]
-            )
-            existing = [auto for auto in existing if isinstance(auto, dict) and auto.get("id") != turnoff_automation["id"]]
-
-        # Add new automation
-        existing.append(turnoff_automation)
-
-        # Write back (non-blocking)
         def write_automations():
             try:
-                # Atomic write
-                automations_dir = os.path.dirname(automations_path)
-                temp_fd, temp_path = tempfile.mkstemp(dir=automations_dir, text=True)
-                try:
-                    with os.fdopen(temp_fd, 'w', encoding='utf-8') as f:
-                        try:
-                            yaml.dump(existing, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
-                        except yaml.YAMLError as err:
-                            _LOGGER.error("Failed to serialize turn-off automation YAML: %s", err)
-                            raise
-                        except Exception as err:
-                            _LOGGER.error("Unexpected error writing turn-off automation YAML: %s", err)
-                            raise
-                    shutil.move(temp_path, automations_path)
-                except Exception:
-                    if os.path.exists(temp_path):
-                        os.unlink(temp_path)
-                    raise
+                _store_automations(hass.config.config_dir, storage, [turnoff_automation])
                 _LOGGER.info("Created turn-off automation: %s", turnoff_automation["id"])
             except Exception as err:
-                _LOGGER.error("Failed to write automations.yaml: %s", err)
+                _LOGGER.error("Failed to write %s: %s", automations_path, err)
                 raise
 
-        await hass.async_add_executor_job(write_automations)
+        await async_run(hass, write_automations)
 
         # Reload automations
         try:
             await hass.services.async_call("automation", "reload", blocking=True)
             _LOGGER.info("Reloaded automations successfully")
 
-            # Add delay to ensure automation is registered (increased from 1s to 3s)
-            await asyncio.sleep(3)
-
-            # Verify automation was loaded by checking if entity exists
+            # Verify automation was loaded by waiting for its entity
             # Note: HA creates entity_id from alias, not id
-            slugified_alias = turnoff_automation['alias'].lower().replace(' ', '_').replace('-', '_')
-            automation_entity_id = f"automation.{slugified_alias}"
-            if hass.states.get(automation_entity_id) is None:
+            automation_entity_id = _automation_entity_id(turnoff_automation)
+            if await async_wait_for_entities(hass, [automation_entity_id], AUTOMATION_WAIT_TIMEOUT):
                 _LOGGER.error("Turn-off automation entity not found after reload: %s", automation_entity_id)
                 raise Exception(f"Turn-off automation failed to load: {automation_entity_id}")
 
@@ -2248,13 +2334,12 @@ You can dismiss this notification once you've copied the card YAML (if desired).
             # Try to validate automations.yaml to provide helpful error (non-blocking)
             def validate_yaml():
                 try:
-                    with open(automations_path, "r", encoding="utf-8") as f:
-                        yaml.safe_load(f)
-                except yaml.YAMLError as yaml_err:
-                    _LOGGER.error("automations.yaml has invalid YAML: %s", yaml_err)
+                    yaml_io.load_file(automations_path)
+                except yaml_io.YAMLError as yaml_err:
+                    _LOGGER.error("%s has invalid YAML: %s", automations_path, yaml_err)
                     raise Exception(f"Automation file corrupted - YAML error: {yaml_err}")
 
-            await hass.async_add_executor_job(validate_yaml)
+            await async_run(hass, validate_yaml)
             raise
 
         return turnoff_automation["id"]
@@ -2607,7 +2692,17 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Manage the options."""
+        errors: dict[str, str] = {}
         if user_input is not None:
+            # The native engine has no notification path yet; switching would
+            # silently stop the notifications the blueprint sends
+            if (
+                user_input.get(CONF_ENGINE_MODE) == ENGINE_MODE_NATIVE
+                and self.config_entry.data.get("enable_notifications", False)
+            ):
+                errors[CONF_ENGINE_MODE] = "native_engine_notifications"
+
+        if user_input is not None and not errors:
             # Check if user wants to show dashboard card
             if user_input.get("show_dashboard_card", False):
                 return await self.async_step_show_card()
@@ -2648,6 +2743,57 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                     "enable_smart_mode", True
                 ),
             ): cv.boolean,
+            vol.Optional(
+                CONF_ENGINE_MODE,
+                default=self.config_entry.options.get(
+                    CONF_ENGINE_MODE,
+                    self.config_entry.data.get(CONF_ENGINE_MODE, ENGINE_MODE_BLUEPRINT),
+                ),
+            ): selector.SelectSelector(
+                selector.SelectSelectorConfig(
+                    options=[
+                        {"label": "Blueprint automation (default)", "value": ENGINE_MODE_BLUEPRINT},
+                        {"label": "Native Python engine (faster, replaces the automation)", "value": ENGINE_MODE_NATIVE},
+                    ],
+                    mode=selector.SelectSelectorMode.DROPDOWN,
+                )
+            ),
+            vol.Optional(
+                CONF_TICK_MODE,
+                default=self.config_entry.options.get(CONF_TICK_MODE, TICK_MODE_STAGGERED),
+            ): selector.SelectSelector(
+                selector.SelectSelectorConfig(
+                    options=[
+                        {"label": "Staggered - own timer per room (default)", "value": TICK_MODE_STAGGERED},
+                        {"label": "Batched - evaluate with other batched rooms in one pass", "value": TICK_MODE_BATCHED},
+                    ],
+                    mode=selector.SelectSelectorMode.DROPDOWN,
+                )
+            ),
+            vol.Optional(
+                CONF_STATE_STORAGE,
+                default=self.config_entry.options.get(CONF_STATE_STORAGE, STATE_STORAGE_HELPERS),
+            ): selector.SelectSelector(
+                selector.SelectSelectorConfig(
+                    options=[
+                        {"label": "Helpers - write internal values to input_* helpers (default)", "value": STATE_STORAGE_HELPERS},
+                        {"label": "Integration storage - keep internal values in memory, save to .storage", "value": STATE_STORAGE_MEMORY},
+                    ],
+                    mode=selector.SelectSelectorMode.DROPDOWN,
+                )
+            ),
+            vol.Optional(
+                CONF_EVENT_LOG,
+                default=self.config_entry.options.get(CONF_EVENT_LOG, EVENT_LOG_MEMORY),
+            ): selector.SelectSelector(
+                selector.SelectSelectorConfig(
+                    options=[
+                        {"label": "Memory - keep the last 500 events per room (default)", "value": EVENT_LOG_MEMORY},
+                        {"label": "Memory + file - also append to smart_climate_events/<room>.jsonl", "value": EVENT_LOG_JSONL},
+                    ],
+                    mode=selector.SelectSelectorMode.DROPDOWN,
+                )
+            ),
         }
 
         # Add option to show dashboard card if it exists
@@ -2661,6 +2807,7 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         return self.async_show_form(
             step_id="init",
             data_schema=vol.Schema(schema_dict),
+            errors=errors,
         )
 
     async def async_step_show_card(
@@ -3150,51 +3297,25 @@ card_mod:
             except Exception as err:
                 _LOGGER.warning("Failed to delete helper %s: %s", helper_id, err)
 
-        # Step 2: Delete automations from automations.yaml
-        automations_file = hass.config.path("automations.yaml")
-
-        # Automation IDs to delete
+        # Step 2: Delete the room's automations (only their own entries)
         main_automation_id = f"climate_control_{sanitized_name}"
         turnoff_automation_id = f"climate_turnoff_{sanitized_name}"
 
         def delete_automations():
             try:
-                if os.path.exists(automations_file):
-                    with open(automations_file, "r", encoding="utf-8") as f:
-                        automations = yaml.safe_load(f) or []
-
-                    # Filter out automations for this room
-                    original_count = len(automations)
-                    automations = [
-                        a for a in automations
-                        if a.get("id") not in [main_automation_id, turnoff_automation_id]
-                    ]
-                    deleted_count = original_count - len(automations)
-
-                    if deleted_count > 0:
-                        # Write back to file atomically
-                        fd, temp_file = tempfile.mkstemp(
-                            dir=os.path.dirname(automations_file),
-                            prefix=".automations_",
-                            suffix=".yaml",
-                            text=True
-                        )
-                        try:
-                            with os.fdopen(fd, "w", encoding="utf-8") as f:
-                                yaml.dump(automations, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
-                            shutil.move(temp_file, automations_file)
-                            _LOGGER.info("Deleted %d automation(s) for room: %s", deleted_count, room_name)
-                        except Exception:
-                            if os.path.exists(temp_file):
-                                os.unlink(temp_file)
-                            raise
-                    else:
-                        _LOGGER.warning("No automations found to delete for room: %s", room_name)
+                deleted_count = _remove_stored_automations(
+                    hass.config.config_dir,
+                    [main_automation_id, turnoff_automation_id],
+                )
+                if deleted_count > 0:
+                    _LOGGER.info("Deleted %d automation(s) for room: %s", deleted_count, room_name)
+                else:
+                    _LOGGER.warning("No automations found to delete for room: %s", room_name)
             except Exception as err:
                 _LOGGER.error("Failed to delete automations: %s", err)
                 raise
 
-        await hass.async_add_executor_job(delete_automations)
+        await async_run(hass, delete_automations)
 
         # Step 3: Reload automation integration
         await hass.services.async_call("automation", "reload", blocking=True)
@@ -3213,7 +3334,7 @@ card_mod:
             except Exception as err:
                 _LOGGER.warning("Failed to delete package file: %s", err)
 
-        await hass.async_add_executor_job(delete_package)
+        await async_run(hass, delete_package)
 
         # Step 5: Remove config entry
         await hass.config_entries.async_remove(config_entry.entry_id)
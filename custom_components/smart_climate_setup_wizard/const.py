@@ -0,0 +1,37 @@
+"""Constants for the Smart Climate Control Setup Wizard integration."""
+from __future__ import annotations
+
+DOMAIN = "smart_climate_setup_wizard"
+
+# Engine selection (stored in entry.options, falls back to entry.data)
+CONF_ENGINE_MODE = "engine_mode"
+ENGINE_MODE_BLUEPRINT = "blueprint"
+ENGINE_MODE_NATIVE = "native"
+ENGINE_MODES = [ENGINE_MODE_BLUEPRINT, ENGINE_MODE_NATIVE]
+
+# Automation output written by the wizard
+CONF_AUTOMATION_OUTPUT = "automation_output"
+AUTOMATION_OUTPUT_BLUEPRINT = "blueprint"
+AUTOMATION_OUTPUT_COMPILED = "compiled"
+
+# Where the wizard writes its automations
+CONF_AUTOMATION_STORAGE = "automation_storage"
+AUTOMATION_STORAGE_FILE = "automations_yaml"
+AUTOMATION_STORAGE_DIRECTORY = "directory"
+
+# Periodic tick scheduling for native-engine rooms
+CONF_TICK_MODE = "tick_mode"
+TICK_MODE_STAGGERED = "staggered"
+TICK_MODE_BATCHED = "batched"
+
+# Where native-engine rooms keep their internal bookkeeping values
+CONF_STATE_STORAGE = "state_storage"
+STATE_STORAGE_HELPERS = "helpers"
+STATE_STORAGE_MEMORY = "memory"
+
+# Event log persistence (records are always kept in memory)
+CONF_EVENT_LOG = "event_log"
+EVENT_LOG_MEMORY = "memory"
+EVENT_LOG_JSONL = "jsonl"
+
+SERVICE_GET_EVENTS = "get_events"
@@ -0,0 +1,474 @@
+"""Native room controller that runs the engine inside Home Assistant.
+
+When a room is switched to the native engine, this controller replaces the
+blueprint automation: it subscribes to the same triggers, evaluates the
+pipeline in Python and issues climate commands and helper writes itself. The
+blueprint automation is turned off while the controller runs so the two never
+fight over the same climate entities.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from datetime import timedelta
+import logging
+import time
+from typing import Any, Callable
+
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import Context, Event, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .blueprint_inputs import automation_unique_id, build_blueprint_inputs
+from .engine import (
+    Decision,
+    Evaluation,
+    RoomConfig,
+    StateSource,
+    Trigger,
+    VariableCache,
+    PAUSED_MODE_VARIABLES,
+    evaluate,
+    helper_updates,
+    merge_triggers,
+    plan_commands,
+)
+from .const import CONF_STATE_STORAGE, DOMAIN, STATE_STORAGE_MEMORY
+from .coordinator import HomeCoordinator
+from .dispatcher import CommandDispatcher
+from .event_log import EventLog, EventRecord, should_log_status
+from .gatekeeper import ExpectedState, Gatekeeper
+from .history import TemperatureHistory
+from .metrics import RoomMetrics
+from .presence import PresenceTracker
+from .profiler import TemplateProfile
+from .scheduler import TickScheduler
+from .store import RoomState
+from .writer import HelperWriter
+
+_LOGGER = logging.getLogger(__name__)
+
+HISTORY_STORAGE_VERSION = 1
+# Batch history writes; losing the last few samples on a crash is harmless
+HISTORY_SAVE_DELAY = 60
+# State changes within this window are evaluated together in one run
+TRIGGER_DEBOUNCE_SECONDS = 2.0
+
+
+class RoomController:
+    """Run the native control engine for one room."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        config: dict[str, Any],
+        scheduler: TickScheduler,
+        dispatcher: CommandDispatcher,
+        coordinator: HomeCoordinator | None = None,
+        metrics: RoomMetrics | None = None,
+        event_log: EventLog | None = None,
+    ) -> None:
+        """Initialize the controller from the wizard configuration."""
+        self.hass = hass
+        self.config = RoomConfig(build_blueprint_inputs(config))
+        self.room_name = self.config.room_name
+        self.key = automation_unique_id(self.room_name)
+        self._scheduler = scheduler
+        self._dispatcher = dispatcher
+        self._coordinator = coordinator
+        self.metrics = metrics or RoomMetrics()
+        self.event_log = event_log
+        self._lock = asyncio.Lock()
+        self._cache = VariableCache()
+        self.history = TemperatureHistory()
+        self.gatekeeper = Gatekeeper()
+        self.helper_writer = HelperWriter(hass)
+        self.profile = TemplateProfile()
+        self.presence = PresenceTracker(self.config.presence_sensors)
+        self.temperature = self.config.temperature_aggregator()
+        self._history_store: Store = Store(
+            hass, HISTORY_STORAGE_VERSION, f"{DOMAIN}.history.{self.key}"
+        )
+        # Storage mode keeps the internal helper values out of the state machine
+        self.room_state: RoomState | None = None
+        if config.get(CONF_STATE_STORAGE) == STATE_STORAGE_MEMORY:
+            self.room_state = RoomState(hass, self.key, self.config.helper_inputs)
+        self._unsubs: list[Callable[[], None]] = []
+        # Bursts (e.g. attribute updates from two ACs and a sensor) become one
+        # run; a run that is already sending commands is never interrupted
+        self._pending_triggers: list[Trigger] = []
+        # Time of the last run, for temperature gating
+        self._last_run: float | None = None
+        self._debouncer = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=TRIGGER_DEBOUNCE_SECONDS,
+            immediate=False,
+            function=self._async_run_pending,
+        )
+        # Only recent contexts can still show up in state change events
+        self._own_context_ids: deque[str] = deque(maxlen=50)
+        self._disabled_automation: str | None = None
+        self.last_decision: Decision | None = None
+
+    async def async_start(self) -> None:
+        """Subscribe to triggers and take over from the blueprint automation."""
+        stored = await self._history_store.async_load()
+        if stored:
+            self.history.load(stored.get("samples", []))
+        if self.room_state is not None:
+            await self.room_state.async_load()
+
+        # Seed expectations from the blueprint's last command snapshot (parsed once)
+        last_command = self.config.helper("helper_last_command")
+        state = self._states().get(last_command) if last_command else None
+        expected = ExpectedState.from_snapshot(state.state if state else None)
+        if expected is not None:
+            for entity_id in self.config.climate_entities:
+                self.gatekeeper.record(entity_id, expected, None)
+
+        await self._async_disable_blueprint_automation()
+
+        if self._coordinator is not None:
+            self._unsubs.append(self._coordinator.async_add(self))
+        else:
+            interval = timedelta(minutes=max(self.config.check_interval, 1))
+            self._unsubs.append(
+                self._scheduler.async_register(self.key, interval, self._async_periodic)
+            )
+
+        tracked = self._tracked_entities()
+        if tracked:
+            self._unsubs.append(
+                async_track_state_change_event(self.hass, tracked, self._async_state_changed)
+            )
+        # Read after subscribing so no sensor change falls in between
+        self.presence.sync(self.hass.states)
+        self.temperature.sync(self.hass.states)
+
+        _LOGGER.info(
+            "Native climate engine started for %s (%d entities tracked)",
+            self.room_name,
+            len(tracked),
+        )
+
+    async def async_stop(self) -> None:
+        """Unsubscribe and hand control back to the blueprint automation."""
+        while self._unsubs:
+            self._unsubs.pop()()
+        self._debouncer.async_cancel()
+        self._pending_triggers.clear()
+
+        await self._history_store.async_save(self._history_data())
+
+        if self.room_state is not None:
+            if self.hass.is_stopping:
+                await self.room_state.async_save()
+            else:
+                # Reload or unload (e.g. switching engine or storage mode):
+                # hand the values to the helpers so whoever runs next sees
+                # them, and drop the saved copy so it cannot go stale
+                await self._async_write_helpers(self.room_state.values(), Context())
+                await self.room_state.async_remove()
+
+        if self._disabled_automation:
+            await self.hass.services.async_call(
+                "automation",
+                "turn_on",
+                {ATTR_ENTITY_ID: self._disabled_automation},
+                blocking=True,
+            )
+            self._disabled_automation = None
+
+        _LOGGER.info("Native climate engine stopped for %s", self.room_name)
+
+    def _tracked_entities(self) -> list[str]:
+        """Return the entities whose changes trigger an evaluation."""
+        cfg = self.config
+        entities = [
+            *cfg.climate_entities,
+            *cfg.temperature_sensors,
+            *cfg.room_sensors,
+            *cfg.persons,
+            *cfg.devices,
+        ]
+        for entity_id in (cfg.proximity_sensor, cfg.bed_sensor, cfg.helper("helper_control_mode")):
+            if entity_id:
+                entities.append(entity_id)
+        return list(dict.fromkeys(entities))
+
+    async def _async_disable_blueprint_automation(self) -> None:
+        """Turn off the room's blueprint automation if it is running."""
+        registry = er.async_get(self.hass)
+        entity_id = registry.async_get_entity_id(
+            "automation", "automation", automation_unique_id(self.room_name)
+        )
+        if entity_id is None:
+            return
+        state = self.hass.states.get(entity_id)
+        if state is None or state.state != "on":
+            return
+        await self.hass.services.async_call(
+            "automation", "turn_off", {ATTR_ENTITY_ID: entity_id}, blocking=True
+        )
+        self._disabled_automation = entity_id
+        _LOGGER.info("Turned off %s while the native engine is active", entity_id)
+
+    def _states(self) -> StateSource:
+        """Return the state source the engine reads from."""
+        if self.room_state is None:
+            return self.hass.states
+        return self.room_state.overlay(self.hass.states)
+
+    async def _async_periodic(self) -> None:
+        """Handle the periodic check."""
+        await self.async_run(Trigger("periodic_check"))
+
+    @callback
+    def _async_state_changed(self, event: Event) -> None:
+        """Map a state change onto the matching blueprint trigger id."""
+        entity_id = event.data["entity_id"]
+        old_state = event.data.get("old_state")
+        new_state = event.data.get("new_state")
+        if entity_id in self.presence:
+            self.presence.update(entity_id, None if new_state is None else new_state.state)
+        if entity_id in self.temperature:
+            self.temperature.update(entity_id, new_state)
+        if new_state is None:
+            return
+
+        cfg = self.config
+        if entity_id in cfg.climate_entities:
+            if old_state is None or old_state.state != new_state.state:
+                trigger_id = "climate_state_change"
+            else:
+                # The blueprint's temp_change trigger: the AC's own reading
+                previous = old_state.attributes.get("current_temperature")
+                current = new_state.attributes.get("current_temperature")
+                if current is None or current == previous:
+                    return
+                if self._temperature_update_gated(previous, current):
+                    self.metrics.gated_triggers += 1
+                    return
+                trigger_id = "temp_change"
+        elif entity_id in cfg.temperature_sensors:
+            if old_state is not None and old_state.state == new_state.state:
+                return
+            if self._temperature_update_gated(
+                None if old_state is None else old_state.state, new_state.state
+            ):
+                self.metrics.gated_triggers += 1
+                return
+            trigger_id = "temp_change"
+        elif entity_id == cfg.helper("helper_control_mode"):
+            # Leaving Override/Manual: run a full periodic check right away
+            # instead of waiting up to check_interval for the next tick
+            if (
+                self._coordinator is None
+                and old_state is not None
+                and old_state.state in PAUSED_MODE_VARIABLES
+                and new_state.state not in PAUSED_MODE_VARIABLES
+            ):
+                self._scheduler.async_wake(self.key)
+                return
+            trigger_id = "control_mode_change"
+        elif entity_id == cfg.bed_sensor:
+            trigger_id = "bed_sensor_change"
+        elif entity_id in cfg.room_sensors:
+            trigger_id = "room_presence_change"
+        else:
+            trigger_id = "presence_change"
+
+        context = new_state.context
+        trigger = Trigger(
+            trigger_id,
+            entity_id=entity_id,
+            from_state=old_state,
+            to_state=new_state,
+            from_engine=(
+                context.id in self._own_context_ids
+                or (context.parent_id is not None and context.parent_id in self._own_context_ids)
+            ),
+            from_user=context.user_id is not None,
+        )
+        self._pending_triggers.append(trigger)
+        self._debouncer.async_schedule_call()
+
+    def _temperature_update_gated(self, previous: Any, value: Any) -> bool:
+        """Return True if a temperature update is too small or too soon to run for.
+
+        Like the blueprint's condition, the deadband is measured against the
+        previous reading; it is capped below sensor resolution, so a step of
+        a whole 0.1°C always passes.
+        """
+        cfg = self.config
+        try:
+            value = float(value)
+            previous = float(previous) if previous is not None else None
+        except (TypeError, ValueError):
+            return False
+        if previous is not None and abs(value - previous) < cfg.temp_trigger_deadband:
+            return True
+        return (
+            self._last_run is not None
+            and time.monotonic() - self._last_run < cfg.temp_trigger_min_interval
+        )
+
+    async def _async_run_pending(self) -> None:
+        """Run one evaluation for every trigger collected in the debounce window."""
+        triggers, self._pending_triggers = self._pending_triggers, []
+        if not triggers:
+            return
+        self.metrics.coalesced_triggers += len(triggers) - 1
+        await self.async_run(merge_triggers(triggers))
+
+    async def async_run(
+        self, trigger: Trigger, shared: dict[tuple[Any, ...], Any] | None = None
+    ) -> Decision:
+        """Evaluate the pipeline for a trigger and apply the result.
+
+        ``shared`` is passed by the HomeCoordinator for batched ticks.
+        """
+        async with self._lock:
+            started = time.perf_counter()
+            ev, decision = evaluate(
+                self.config,
+                self._states(),
+                dt_util.now(),
+                trigger,
+                self._cache,
+                lazy=True,
+                shared=shared,
+                history=self.history,
+                gatekeeper=self.gatekeeper,
+                profile=self.profile,
+                presence=self.presence,
+                temperature=self.temperature,
+            )
+            self.last_decision = decision
+
+            context = Context()
+            self._own_context_ids.append(context.id)
+
+            commands = plan_commands(ev, decision, self.gatekeeper)
+            await self._dispatcher.async_dispatch(commands, context)
+            metrics = self.metrics
+            metrics.climate_commands += len(commands)
+            if decision.commands_climate:
+                commanded = {command.entity_id for command in commands}
+                metrics.suppressed_commands += len(self.config.climate_entities) - len(commanded)
+                for entity_id in self.config.climate_entities:
+                    self.gatekeeper.record(
+                        entity_id,
+                        decision.expected_state,
+                        ev.now if entity_id in commanded else None,
+                    )
+            updates = helper_updates(ev, decision)
+            if self.room_state is not None:
+                updates = self.room_state.update(updates)
+            written = self.helper_writer.written
+            await self._async_write_helpers(updates, context)
+            metrics.helper_writes += self.helper_writer.written - written
+
+            if self.event_log is not None:
+                self._record_event(trigger, ev, decision, len(commands))
+
+            if trigger.id == "periodic_check":
+                self.history.add(ev.now, ev["current_temp"])
+                self._history_store.async_delay_save(self._history_data, HISTORY_SAVE_DELAY)
+
+            metrics.record_run(time.perf_counter() - started)
+            self._last_run = time.monotonic()
+            _LOGGER.debug(
+                "%s: trigger=%s branch=%s reason=%s (cache hits=%d misses=%d, "
+                "helper writes sent=%d skipped=%d)",
+                self.room_name,
+                trigger.id,
+                decision.branch,
+                decision.reason,
+                self._cache.hits,
+                self._cache.misses,
+                self.helper_writer.written,
+                self.helper_writer.skipped,
+            )
+            return decision
+
+    def diagnostics(self, profile_limit: int | None = None) -> dict[str, Any]:
+        """Return runtime statistics for the diagnostics download."""
+        decision = self.last_decision
+        return {
+            "last_decision": None
+            if decision is None
+            else {"branch": decision.branch, "reason": decision.reason},
+            "variable_cache": {"hits": self._cache.hits, "misses": self._cache.misses},
+            "helper_writes": {
+                "written": self.helper_writer.written,
+                "skipped": self.helper_writer.skipped,
+            },
+            "temperature": self.temperature.as_dict(dt_util.now(), self.hass.states),
+            "variable_profile": self.profile.report(profile_limit),
+        }
+
+    def _record_event(
+        self, trigger: Trigger, ev: Evaluation, decision: Decision, commands: int
+    ) -> None:
+        """Log the run's status (same rule as the blueprint's periodic event)."""
+        values = ev.values
+        previous = values.get("last_mode")
+        mode = decision.last_mode or previous
+        changed = mode != previous
+        if not changed and trigger.id not in ("periodic_check", "climate_state_change"):
+            return
+        if not should_log_status(mode, previous):
+            return
+        # Only what this run computed anyway; nothing is evaluated for the log
+        data = {
+            "mode": mode,
+            "previous_mode": previous,
+            "changed": changed,
+            "current_temp": values.get("current_temp"),
+            "rate": values.get("temp_change_rate"),
+            "target_temp": values.get("target_temp"),
+            "distance": values.get("distance_from_target"),
+            "escalation_level": values.get("final_escalation_level"),
+            "adjusted_target": values.get("adjusted_target"),
+            "hvac": decision.hvac_mode or ev.state(ev.primary),
+            "setpoint": decision.temperature or ev.attr(ev.primary, "temperature"),
+            "fan": decision.fan_mode or ev.attr(ev.primary, "fan_mode"),
+            "effectiveness": values.get("current_effectiveness"),
+            "stalling": values.get("is_stalling"),
+            "control_mode": decision.control_mode or values.get("control_mode"),
+            "presence": values.get("room_presence_detected"),
+            "should_activate": values.get("should_activate"),
+            "bed": values.get("bed_occupied"),
+            "override": values.get("manual_override_detection"),
+            "branch": decision.branch,
+            "reason": decision.reason,
+            "commands": commands,
+        }
+        self.event_log.async_add(
+            EventRecord(
+                ev.now,
+                self.room_name,
+                "decision",
+                trigger.id,
+                {key: value for key, value in data.items() if value is not None},
+            )
+        )
+
+    def _history_data(self) -> dict[str, Any]:
+        """Return the temperature history for storage."""
+        return {"samples": self.history.as_list()}
+
+    async def _async_write_helpers(self, updates: dict[str, Any], context: Context) -> None:
+        """Write helper values keyed by helper input name."""
+        values = {
+            entity_id: value
+            for input_name, value in updates.items()
+            if (entity_id := self.config.helper(input_name))
+        }
+        await self.helper_writer.async_write(values, context)
@@ -0,0 +1,95 @@
+"""Whole-home coordinator that evaluates batched rooms in one pass.
+
+Rooms often share the same outdoor sensor, weather entity, persons and
+proximity sensor. Rooms set to the batched tick mode are grouped by check
+interval; on each group tick the coordinator evaluates every room with one
+shared value store, so each SHARED_VARIABLES value (outdoor temperature,
+anyone_home, approaching_home, proximity_zone) is computed once per distinct
+input set instead of once per room, and then lets the rooms' commands go out
+concurrently.
+"""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+import logging
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .engine import Trigger
+from .scheduler import TickScheduler
+
+if TYPE_CHECKING:
+    from .controller import RoomController
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class HomeCoordinator:
+    """Run the periodic check for all batched rooms together."""
+
+    def __init__(self, hass: HomeAssistant, scheduler: TickScheduler) -> None:
+        """Initialize the coordinator."""
+        self.hass = hass
+        self._scheduler = scheduler
+        self._groups: dict[int, dict[str, RoomController]] = {}
+
+    @callback
+    def async_add(self, controller: RoomController) -> CALLBACK_TYPE:
+        """Add a room to the batch for its check interval."""
+        minutes = max(controller.config.check_interval, 1)
+        group = self._groups.setdefault(minutes, {})
+        if not group:
+            self._scheduler.async_register(
+                self._group_key(minutes),
+                timedelta(minutes=minutes),
+                lambda: self._async_tick(minutes),
+            )
+        group[controller.key] = controller
+
+        @callback
+        def remove() -> None:
+            self.async_remove(controller)
+
+        return remove
+
+    @callback
+    def async_remove(self, controller: RoomController) -> None:
+        """Remove a room; the group timer stops when its last room leaves."""
+        minutes = max(controller.config.check_interval, 1)
+        group = self._groups.get(minutes)
+        if group is None or group.pop(controller.key, None) is None:
+            return
+        if not group:
+            del self._groups[minutes]
+            self._scheduler.async_unregister(self._group_key(minutes))
+
+    @staticmethod
+    def _group_key(minutes: int) -> str:
+        return f"batch_{minutes}min"
+
+    async def _async_tick(self, minutes: int) -> None:
+        """Evaluate every room in a group with one shared value store."""
+        rooms = list(self._groups.get(minutes, {}).values())
+        shared: dict[tuple[Any, ...], Any] = {}
+        # Each run evaluates synchronously up to its first service call, so
+        # all rooms are evaluated first and their commands then go out
+        # concurrently instead of one room's round trips after another's
+        results = await asyncio.gather(
+            *(
+                controller.async_run(Trigger("periodic_check"), shared=shared)
+                for controller in rooms
+            ),
+            return_exceptions=True,
+        )
+        for controller, result in zip(rooms, results):
+            if isinstance(result, Exception):
+                # One failing room must not stop the rest of the batch
+                _LOGGER.error("Periodic check failed for %s: %s", controller.room_name, result)
+        _LOGGER.debug(
+            "Batched tick (%s min): %d rooms, %d shared values",
+            minutes,
+            len(rooms),
+            len(shared),
+        )
@@ -0,0 +1,130 @@
+"""Diagnostics for Smart Climate Control Setup Wizard.
+
+Besides the room configuration, the download contains a render-time
+profile of the room's automation: every template in the blueprint (or the
+compiled automation) is rendered once against the current states and the
+sites are listed hottest first. This is a synthetic single pass, not a
+measurement of real runs: every branch is rendered, under a made-up
+periodic_check trigger. Native-engine rooms also include the
+per-variable compute times recorded since the engine started.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import TemplateError
+from homeassistant.helpers.template import Template
+
+from . import get_engine_mode, wizard_io, yaml_io
+from .blueprint_inputs import BLUEPRINT_PATH, build_blueprint_inputs
+from .compiler import compile_automation, load_blueprint, substitute_inputs
+from .const import (
+    AUTOMATION_OUTPUT_BLUEPRINT,
+    AUTOMATION_OUTPUT_COMPILED,
+    CONF_AUTOMATION_OUTPUT,
+    DOMAIN,
+)
+from .profiler import TemplateProfile, is_template, template_sites
+
+# Sites listed in the download, hottest first
+PROFILE_LIMIT = 50
+# The profile renders on the event loop; hand it back this often
+PROFILE_CHUNK_SECONDS = 0.02
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    config = {**entry.data, **entry.options}
+    # The dashboard card is large and already shown in the options flow
+    config.pop("dashboard_card_yaml", None)
+
+    diagnostics: dict[str, Any] = {
+        "config": config,
+        "engine_mode": get_engine_mode(entry),
+        "automation_output": entry.data.get(CONF_AUTOMATION_OUTPUT, AUTOMATION_OUTPUT_BLUEPRINT),
+        "blueprint_profile": await _async_profile_blueprint(hass, entry),
+        "yaml_io": yaml_io.stats(),
+        "setup_loop_lag": wizard_io.lag_stats(),
+    }
+
+    metrics = hass.data.get(DOMAIN, {}).get("metrics", {}).get(entry.entry_id)
+    if metrics is not None:
+        diagnostics["metrics"] = metrics.as_dict()
+
+    controller = hass.data.get(DOMAIN, {}).get("controllers", {}).get(entry.entry_id)
+    if controller is not None:
+        diagnostics["native_engine"] = controller.diagnostics(PROFILE_LIMIT)
+    dispatcher = hass.data.get(DOMAIN, {}).get("dispatcher")
+    if dispatcher is not None:
+        diagnostics["dispatcher"] = {"sent": dispatcher.sent}
+    return diagnostics
+
+
+async def _async_profile_blueprint(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Render every template of the room's automation once and time it.
+
+    Variables are rendered in document order and added to the context of
+    the templates after them, as if every branch ran; templates that need
+    a value only a real run provides (``repeat``, ``wait``) are counted as
+    errors. Rendering must happen on the event loop, so it yields between
+    chunks of PROFILE_CHUNK_SECONDS; the time spent yielded is not counted.
+    """
+    blueprint_path = hass.config.path("blueprints/automation", BLUEPRINT_PATH)
+    inputs = build_blueprint_inputs(dict(entry.data))
+    compiled = entry.data.get(CONF_AUTOMATION_OUTPUT) == AUTOMATION_OUTPUT_COMPILED
+
+    def load() -> dict[str, Any]:
+        blueprint = load_blueprint(blueprint_path)
+        if compiled:
+            return compile_automation(blueprint, inputs)[0]
+        return substitute_inputs(blueprint, inputs)
+
+    try:
+        body = await hass.async_add_executor_job(load)
+    except (OSError, ValueError, yaml_io.YAMLError) as err:
+        return {"error": f"Could not load {blueprint_path}: {err}"}
+
+    profile = TemplateProfile()
+    context: dict[str, Any] = {"trigger": {"id": "periodic_check", "platform": "time_pattern"}}
+    rendered = errors = 0
+    total = 0.0
+    chunk_start = time.perf_counter()
+    for label, value, name in template_sites(body):
+        if not is_template(value):
+            if name is not None:
+                context[name] = value
+            continue
+        rendered += 1
+        site_start = time.perf_counter()
+        try:
+            result = Template(value, hass).async_render(context)
+        except TemplateError:
+            errors += 1
+            result = None
+        site_end = time.perf_counter()
+        profile.record(label, site_end - site_start)
+        total += site_end - site_start
+        if name is not None:
+            context[name] = result
+        if site_end - chunk_start >= PROFILE_CHUNK_SECONDS:
+            await asyncio.sleep(0)
+            chunk_start = time.perf_counter()
+
+    return {
+        "kind": "synthetic_single_pass",
+        "note": "Every template rendered once, all branches, with trigger "
+        "periodic_check; not timings of real runs",
+        "source": "compiled" if compiled else "blueprint",
+        "templates_rendered": rendered,
+        "render_errors": errors,
+        "total_ms": round(total * 1000, 1),
+        "hottest": profile.report(PROFILE_LIMIT),
+    }
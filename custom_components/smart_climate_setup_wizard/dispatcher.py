@@ -0,0 +1,120 @@
+"""Rate-limited climate command dispatcher.
+
+The blueprint sends ``set_hvac_mode``/``set_temperature``/``set_fan_mode``/
+``set_swing_mode`` back to back with fixed ``delay:`` steps between them,
+which cloud-connected units (e.g. Daikin) throttle when several rooms act at
+once. The dispatcher sends the minimal command list produced by the engine
+through a token bucket per physical device. A room's runs hold its lock
+while dispatching, so commands for one entity never overlap.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict
+import logging
+import time
+
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import Context, HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from .engine import Command
+
+_LOGGER = logging.getLogger(__name__)
+
+# Sustained commands per second per device, and the burst allowed on top
+COMMAND_RATE = 0.5
+COMMAND_BURST = 3
+
+
+class TokenBucket:
+    """Classic token bucket: ``capacity`` burst, refilled at ``rate`` per second."""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        """Initialize a full bucket."""
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self) -> float:
+        """Return seconds until a token is available."""
+        now = time.monotonic()
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        """Consume one token."""
+        self._refill(time.monotonic())
+        self.tokens -= 1
+
+
+class CommandDispatcher:
+    """Send climate commands with per-device rate limiting."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        rate: float = COMMAND_RATE,
+        burst: int = COMMAND_BURST,
+    ) -> None:
+        """Initialize the dispatcher."""
+        self.hass = hass
+        self._rate = rate
+        self._burst = burst
+        self._buckets: dict[str, TokenBucket] = {}
+        self._device_locks: dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self.sent = 0
+
+    def _device_key(self, entity_id: str) -> str:
+        """Return the device an entity belongs to (or the entity itself)."""
+        entry = er.async_get(self.hass).async_get(entity_id)
+        if entry is not None and entry.device_id:
+            return entry.device_id
+        return entity_id
+
+    async def async_dispatch(self, commands: list[Command], context: Context) -> None:
+        """Send commands; devices run in parallel, commands per device in order."""
+        if not commands:
+            return
+        by_device: dict[str, list[Command]] = defaultdict(list)
+        for command in commands:
+            by_device[self._device_key(command.entity_id)].append(command)
+        await asyncio.gather(
+            *(
+                self._async_send_device(device, queued, context)
+                for device, queued in by_device.items()
+            )
+        )
+
+    async def _async_send_device(
+        self, device: str, queued: list[Command], context: Context
+    ) -> None:
+        bucket = self._buckets.get(device)
+        if bucket is None:
+            bucket = self._buckets[device] = TokenBucket(self._rate, self._burst)
+        async with self._device_locks[device]:
+            for command in queued:
+                while (delay := bucket.delay()) > 0:
+                    await asyncio.sleep(delay)
+                bucket.take()
+                self.sent += 1
+                try:
+                    await self.hass.services.async_call(
+                        "climate",
+                        command.service,
+                        {ATTR_ENTITY_ID: command.entity_id, **command.data},
+                        blocking=True,
+                        context=context,
+                    )
+                except Exception as err:  # noqa: BLE001
+                    # Same as the blueprint's continue_on_error on climate calls
+                    _LOGGER.warning(
+                        "climate.%s failed for %s: %s", command.service, command.entity_id, err
+                    )
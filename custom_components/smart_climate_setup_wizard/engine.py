@@ -0,0 +1,1994 @@
+"""Native decision engine for the Ultimate Climate Control blueprint.
+
+This module is a Python port of the blueprint's decision pipeline
+(current_temp -> escalation_level -> final_fan_level_int -> should_activate ->
+gatekeeper -> dispatch). It has no Home Assistant imports: states are read
+through any object with a ``get(entity_id)`` method returning something with
+``state``, ``attributes``, ``last_changed`` and ``last_updated`` (``hass.states``
+and ``homeassistant.core.State`` satisfy this), so the same code runs inside
+Home Assistant and in offline tooling.
+
+Variable names and thresholds intentionally match the blueprint templates so
+the two implementations can be compared line by line.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime
+import time
+from typing import Any, Callable, Mapping, Protocol
+
+from .capabilities import CAPABILITIES, Capabilities
+from .gatekeeper import ExpectedState, Gatekeeper
+from .history import TemperatureHistory
+from .presence import PresenceCounts, PresenceSensors, PresenceTracker
+from .profiler import TemplateProfile
+from .temperature import TemperatureAggregator, strategy_for
+
+UNAVAILABLE_STATES = ("unknown", "unavailable", "")
+ACTIVE_HVAC_MODES = ("cool", "heat", "auto", "heat_cool", "dry", "fan_only")
+OFF_LIKE_MODES = ("off", "smart_off", "away_off", "auto_off_off")
+COOLING_MODES = ("cooling", "bed_comfort_eco", "bed_comfort_quiet")
+BED_MODES = ("bed_comfort_eco", "bed_comfort_quiet", "bed_eco_fan_only")
+# Below the 0.1°C resolution of most sensors, so only noise is filtered and
+# every real step still starts a run (the blueprint caps it the same way)
+TEMP_TRIGGER_DEADBAND_MAX = 0.09
+
+# Blueprint input defaults for every input the engine reads. Inputs written by
+# the wizard (see blueprint_inputs.build_blueprint_inputs) take precedence.
+BLUEPRINT_DEFAULTS: dict[str, Any] = {
+    "temperature_sensor": None,
+    "temp_trigger_deadband": 0,
+    "temp_trigger_min_interval": 0,
+    "temp_sensor_max_age": 0,
+    "use_average_temperature": True,
+    "multi_sensor_strategy": "auto",
+    "target_temperature": 23,
+    "comfort_zone_width": 2,
+    "target_overshoot_strategy": "moderate",
+    "enable_heating_mode": True,
+    "enable_cooling_mode": True,
+    "temperature_aggressiveness": 2,
+    "enable_advanced_temp": False,
+    "comfort_min_temp": 21,
+    "comfort_max_temp": 23,
+    "cooling_target_temp": 22,
+    "heating_target_temp": 22,
+    "ac_minimum_temp": 0,
+    "ac_maximum_temp": 0,
+    "hysteresis_tolerance": 0.3,
+    "presence_persons": [],
+    "presence_devices": [],
+    "proximity_sensor": [],
+    "direction_sensor": [],
+    "home_zone_distance": 5000,
+    "enable_away_mode": True,
+    "away_mode_action": "eco",
+    "enable_pre_conditioning": True,
+    "smart_mode_behavior": "eco",
+    "room_presence_sensors": [],
+    "presence_validation_mode": "any",
+    "adjacent_room_names": "",
+    "presence_timeout_minutes": 15,
+    "presence_confirmation_delay": 0,
+    "bed_comfort_mode": "off",
+    "bed_sensor_manual": "",
+    "bed_absence_grace_period": 5,
+    "bed_eco_near_target_threshold": 0.3,
+    "enable_scheduling": False,
+    "morning_temp": 22,
+    "day_temp": 23,
+    "evening_temp": 23,
+    "night_temp": 24,
+    "enable_weekend_schedule": False,
+    "weekend_morning_temp": 23,
+    "weekend_day_temp": 23,
+    "weekend_night_temp": 24,
+    "enable_outside_temp_compensation": False,
+    "weather_entity": "weather.home",
+    "outdoor_temp_sensor": [],
+    "outside_compensation_factor": 0.2,
+    "max_outside_compensation": 2,
+    "outside_compensation_base_temp": 25,
+    "enable_heat_source_compensation": False,
+    "heat_source_sensors": [],
+    "heat_source_threshold": 50,
+    "heat_source_max_compensation": 2,
+    "heat_source_progress_reduction": 50,
+    "heat_source_fan_boost": 1,
+    "fan_control_mode": "temperature_band",
+    "static_fan_speed": "Level 3",
+    "fan_band_0_1": "Level 1",
+    "fan_band_1_2": "Level 2",
+    "fan_band_2_3": "Level 3",
+    "fan_band_3_4": "Level 4",
+    "fan_band_4_plus": "Level 5",
+    "fan_band_hold_time": 5,
+    "dynamic_starting_fan": "Level 2",
+    "dynamic_max_fan": "Level 5",
+    "dynamic_hold_time": 10,
+    "dynamic_enable_deescalation": True,
+    "enable_outside_temp_fan_boost": True,
+    "enable_heat_source_fan_boost": True,
+    "swing_mode_active": "both",
+    "fan_only_fan_speed": "silence",
+    "comfort_zone_action": "off",
+    "eco_mode_setpoint_offset": 1,
+    "min_runtime_minutes": 15,
+    "min_off_time_minutes": 10,
+    "enforce_off_time_protection": True,
+    "extreme_temp_override": True,
+    "extreme_high_temp": 30,
+    "extreme_low_temp": 15,
+    "enable_dynamic_adaptation": True,
+    "effectiveness_check_minutes": 10,
+    "stall_escalation_time": 15,
+    "minimum_progress_rate": 0.01,
+    "extended_stall_multiplier": 4,
+    "enable_dynamic_target_adjustment": False,
+    "escalation_target_offset": 1.0,
+    "deescalation_approach_threshold": 2.0,
+    "check_interval_minutes": 5,
+    "enable_wrong_direction_escalation": False,
+    "wrong_direction_escalation_per_check": 1,
+    "enable_ac_override_detection": True,
+    "override_behavior": "linked",
+    "override_timeout": 2,
+    "default_control_mode": "Smart",
+    "manual_mode_timeout": "4_hours",
+}
+
+# ClimateEntityFeature.TARGET_TEMPERATURE
+SUPPORT_TARGET_TEMPERATURE = 1
+
+# Matches the blueprint's H10 override_command_grace (seconds)
+OVERRIDE_COMMAND_GRACE = 50
+
+# Everything the Override/Manual dispatch paths and their helper writes read.
+# While automation is paused only these are computed; presence fusion,
+# effectiveness, fan level and setpoint math are skipped entirely.
+PAUSED_MODE_VARIABLES: dict[str, tuple[str, ...]] = {
+    "Override": ("control_mode", "current_temp"),
+    "Manual": ("control_mode", "time_since_change", "current_temp"),
+}
+
+
+class StateSource(Protocol):
+    """Anything that can look up entity states (e.g. ``hass.states``)."""
+
+    def get(self, entity_id: str) -> Any:
+        """Return the state object for entity_id, or None."""
+
+
+@dataclass(frozen=True)
+class EntitySnapshot:
+    """Minimal stand-in for ``homeassistant.core.State`` outside Home Assistant."""
+
+    entity_id: str
+    state: str
+    attributes: Mapping[str, Any] = field(default_factory=dict)
+    last_changed: datetime | None = None
+    last_updated: datetime | None = None
+
+
+@dataclass(frozen=True)
+class Trigger:
+    """The trigger that started a run (mirrors the blueprint trigger ids)."""
+
+    id: str
+    entity_id: str | None = None
+    from_state: Any = None
+    to_state: Any = None
+    # True when to_state was caused by a command this engine issued
+    from_engine: bool = False
+    # True when to_state was caused by a user action in the HA UI
+    from_user: bool = False
+
+
+# When triggers are coalesced, the run takes the trigger id that matters most
+# to the pipeline: an external AC change drives override detection, a mode
+# change the dispatch path, presence the activation; sensor noise the least.
+TRIGGER_PRIORITY = (
+    "climate_state_change",
+    "control_mode_change",
+    "override_cleared_by_user",
+    "bed_sensor_change",
+    "room_presence_change",
+    "presence_change",
+    "temp_change",
+    "periodic_check",
+)
+
+
+def merge_triggers(triggers: list[Trigger]) -> Trigger:
+    """Return the trigger one evaluation should run with for a burst of triggers.
+
+    Climate changes this engine caused are only picked if nothing else
+    happened; among equal candidates user actions win, then the latest one.
+    """
+
+    def rank(item: tuple[int, Trigger]) -> tuple[int, int, int, int]:
+        index, trigger = item
+        try:
+            priority = TRIGGER_PRIORITY.index(trigger.id)
+        except ValueError:
+            priority = len(TRIGGER_PRIORITY)
+        return (trigger.from_engine, priority, not trigger.from_user, -index)
+
+    return min(enumerate(triggers), key=rank)[1]
+
+
+@dataclass
+class Decision:
+    """Outcome of one evaluation: which branch matched and the target state."""
+
+    branch: str
+    reason: str = ""
+    hvac_mode: str | None = None
+    temperature: float | None = None
+    fan_mode: str | None = None
+    swing_mode: str | None = None
+    last_mode: str | None = None
+    control_mode: str | None = None
+
+    @property
+    def commands_climate(self) -> bool:
+        """Return True if this decision targets the climate entities."""
+        return self.hvac_mode is not None
+
+    @property
+    def expected_state(self) -> ExpectedState:
+        """Return the target climate state of this decision."""
+        return ExpectedState(
+            hvac_mode=self.hvac_mode,
+            temperature=None if self.temperature is None else round(self.temperature, 1),
+            fan_mode=self.fan_mode,
+            swing_mode=self.swing_mode,
+        )
+
+
+@dataclass(frozen=True)
+class Command:
+    """A single climate service call produced by the gatekeeper."""
+
+    entity_id: str
+    service: str
+    data: Mapping[str, Any] = field(default_factory=dict)
+
+
+def _float(value: Any, default: float = 0.0) -> float:
+    """Mirror Jinja's ``| float(default)`` filter."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _int(value: Any, default: int = 0) -> int:
+    """Mirror Jinja's ``| int(default)`` filter."""
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return default
+
+
+def _entity_list(value: Any) -> list[str]:
+    """Normalize an entity selector input (None, string or list) to a list."""
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return [item for item in value if item]
+
+
+def _entity(value: Any) -> str | None:
+    """Normalize a single-entity selector input to an entity_id or None."""
+    entities = _entity_list(value)
+    return entities[0] if entities else None
+
+
+def fan_level(value: Any, fallback: int = 3) -> int:
+    """Parse a vendor fan mode string to a 1-5 level (blueprint fan parsing)."""
+    fan = str(value).lower()
+    if "5" in fan or fan == "high":
+        return 5
+    if "4" in fan:
+        return 4
+    if "3" in fan or fan == "medium":
+        return 3
+    if "2" in fan:
+        return 2
+    if "1" in fan or fan in ("low", "quiet", "silence"):
+        return 1
+    return fallback
+
+
+def parse_datetime(value: Any, tzinfo: Any = None) -> datetime | None:
+    """Parse a helper datetime state; naive values are treated as local time."""
+    if value in UNAVAILABLE_STATES or value is None:
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        try:
+            parsed = datetime.fromisoformat(str(value).strip())
+        except ValueError:
+            return None
+    if parsed.tzinfo is None and tzinfo is not None:
+        parsed = parsed.replace(tzinfo=tzinfo)
+    return parsed
+
+
+class RoomConfig:
+    """Resolved blueprint inputs for one room plus the constants derived from them."""
+
+    def __init__(self, inputs: Mapping[str, Any]) -> None:
+        """Resolve inputs against the blueprint defaults."""
+        self.inputs: dict[str, Any] = {**BLUEPRINT_DEFAULTS, **inputs}
+        get = self.inputs.get
+
+        self.room_name: str = get("room_name") or ""
+        self.climate_entities = _entity_list(get("climate_entities"))
+        self.temperature_sensors = _entity_list(get("temperature_sensor"))
+        self.temperature_sensor_is_single = isinstance(get("temperature_sensor"), str)
+        self.room_sensors = _entity_list(get("room_presence_sensors"))
+        self.persons = _entity_list(get("presence_persons"))
+        self.devices = _entity_list(get("presence_devices"))
+        self.heat_source_sensors = _entity_list(get("heat_source_sensors"))
+        self.proximity_sensor = _entity(get("proximity_sensor"))
+        self.direction_sensor = _entity(get("direction_sensor"))
+        self.outdoor_temp_sensor = _entity(get("outdoor_temp_sensor"))
+        self.weather_entity = _entity(get("weather_entity"))
+        self.bed_sensor = _entity(get("bed_sensor_manual"))
+
+        adjacent = get("adjacent_room_names") or ""
+        if isinstance(adjacent, str):
+            adjacent = adjacent.split(",")
+        self.adjacent_rooms = [room.strip() for room in adjacent if str(room).strip()]
+        self.presence_sensors = PresenceSensors(
+            self.room_sensors, self.room_name, self.adjacent_rooms
+        )
+
+        # Static template variables from the blueprint's top-level variables block
+        strategy = get("target_overshoot_strategy") or "moderate"
+        zone_width = _float(get("comfort_zone_width"), 1.5)
+        self.target_overshoot = {
+            "none": 0.0,
+            "minimal": 0.5,
+            "moderate": round(zone_width / 2, 2),
+            "maximum": round(zone_width, 2),
+        }.get(strategy, 0.75)
+
+        aggressiveness = _int(get("temperature_aggressiveness"), 2)
+        self.escalation_time_factor = {1: 1.5, 2: 1.0, 3: 0.8, 4: 0.6, 5: 0.45}.get(
+            aggressiveness, 1.0
+        )
+        self.effective_escalation_offset = _float(get("escalation_target_offset"), 0.5) * {
+            1: 0.5, 2: 1.0, 3: 1.25, 4: 1.5, 5: 2.0
+        }.get(aggressiveness, 1.0)
+
+        self.manual_timeout_hours = {
+            "never": 0,
+            "1_hour": 1,
+            "2_hours": 2,
+            "4_hours": 4,
+            "8_hours": 8,
+            "12_hours": 12,
+            "24_hours": 24,
+        }.get(get("manual_mode_timeout"), 4)
+
+        self.check_interval = _int(get("check_interval_minutes"), 1)
+        self.temp_trigger_deadband = min(
+            _float(get("temp_trigger_deadband"), 0.0), TEMP_TRIGGER_DEADBAND_MAX
+        )
+        self.temp_trigger_min_interval = _float(get("temp_trigger_min_interval"), 0.0)
+        # Minutes; readings older than this are left out of current_temp
+        self.temp_sensor_max_age = _float(get("temp_sensor_max_age"), 0.0)
+        self.temperature_strategy = strategy_for(self.inputs)
+        self.dynamic_starting_level = fan_level(get("dynamic_starting_fan"), 2)
+        self.dynamic_max_level = fan_level(get("dynamic_max_fan"), 5)
+
+    def __getitem__(self, name: str) -> Any:
+        """Return a resolved blueprint input."""
+        return self.inputs.get(name)
+
+    def helper(self, name: str) -> str | None:
+        """Return a helper entity_id input, or None if it is not configured."""
+        value = self.inputs.get(name)
+        if not value or not isinstance(value, str) or value in UNAVAILABLE_STATES:
+            return None
+        return value
+
+    def temperature_aggregator(self) -> TemperatureAggregator:
+        """Return an empty aggregator for the room's temperature sensors."""
+        return TemperatureAggregator(
+            self.temperature_sensors, self.temperature_strategy, self.temp_sensor_max_age * 60
+        )
+
+    def shared_key(self, name: str) -> tuple[Any, ...]:
+        """Return the key under which a SHARED_VARIABLES value can be reused."""
+        return (name, *(_freeze(self.inputs.get(input_name)) for input_name in SHARED_VARIABLES[name]))
+
+    @property
+    def helper_inputs(self) -> dict[str, str]:
+        """Return every configured helper_* input."""
+        return {
+            name: entity_id
+            for name in self.inputs
+            if name.startswith("helper_") and (entity_id := self.helper(name))
+        }
+
+
+# Variables that only depend on home-wide state and the listed inputs. Rooms
+# with the same values for those inputs can share one computation per tick.
+SHARED_VARIABLES: dict[str, tuple[str, ...]] = {
+    "outdoor_temperature": (
+        "enable_outside_temp_compensation",
+        "enable_outside_temp_fan_boost",
+        "outdoor_temp_sensor",
+        "weather_entity",
+    ),
+    "anyone_home": ("presence_persons", "presence_devices"),
+    "approaching_home": ("direction_sensor", "proximity_sensor", "home_zone_distance"),
+    "proximity_zone": ("proximity_sensor", "home_zone_distance"),
+}
+
+
+def _freeze(value: Any) -> Any:
+    """Return a hashable version of an input value."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    return value
+
+
+# Registry of named variables in blueprint evaluation order
+VARIABLES: dict[str, Callable[["Evaluation"], Any]] = {}
+
+
+def variable(func: Callable[["Evaluation"], Any]) -> Callable[["Evaluation"], Any]:
+    """Register a blueprint variable implemented in Python."""
+    VARIABLES[func.__name__] = func
+    return func
+
+
+class _Dependencies:
+    """What one variable read while it was being computed."""
+
+    __slots__ = ("entities", "variables", "trigger", "volatile")
+
+    def __init__(self) -> None:
+        self.entities: dict[str, Any] = {}
+        self.variables: dict[str, Any] = {}
+        self.trigger: tuple[Any, ...] | None = None
+        self.volatile = False
+
+
+@dataclass
+class _CacheEntry:
+    value: Any
+    deps: _Dependencies
+
+
+class VariableCache:
+    """Per-room cache of variable values and the inputs they were derived from.
+
+    An entry is reused on a later run when none of the entity states it read
+    have changed and every variable it read still has the same value. Values
+    that read the clock are always recomputed; their dependents are still
+    reused if the recomputed value comes out the same (early cutoff).
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty cache."""
+        self.entries: dict[str, _CacheEntry] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self) -> None:
+        """Drop every cached value (e.g. after a configuration change)."""
+        self.entries.clear()
+
+
+def _state_version(state: Any) -> Any:
+    """Return a cheap token that changes whenever an entity's state changes."""
+    if state is None:
+        return None
+    last_updated = getattr(state, "last_updated", None)
+    return last_updated if last_updated is not None else state
+
+
+class Evaluation:
+    """One run of the decision pipeline with memoized variables.
+
+    Variables are computed on first access via ``ev["name"]`` and cached for
+    the rest of the run, which gives the same result as the blueprint's
+    top-to-bottom variables step without ordering constraints. With a
+    VariableCache, values whose inputs did not change since the previous run
+    are reused instead of recomputed.
+    """
+
+    def __init__(
+        self,
+        config: RoomConfig,
+        states: StateSource,
+        now: datetime,
+        trigger: Trigger,
+        cache: VariableCache | None = None,
+        shared: dict[tuple[Any, ...], Any] | None = None,
+        history: TemperatureHistory | None = None,
+        gatekeeper: Gatekeeper | None = None,
+        profile: TemplateProfile | None = None,
+        presence: PresenceTracker | None = None,
+        temperature: TemperatureAggregator | None = None,
+    ) -> None:
+        """Initialize the evaluation.
+
+        ``shared`` is a dict that lives for one multi-room tick; values of
+        SHARED_VARIABLES are stored there and reused by the other rooms.
+        ``history`` holds the room's recent periodic readings for the rate.
+        ``gatekeeper`` holds the last commanded state of each climate entity.
+        ``profile`` receives the compute time of every variable (self time).
+        ``presence`` holds running counts of the room's triggered presence
+        sensors; without it they are counted from ``states``.
+        ``temperature`` holds the latest temperature sensor readings; without
+        it they are read from ``states``.
+        """
+        self.config = config
+        self.states = states
+        self._now = now
+        self._trigger = trigger
+        self._trigger_key = (trigger.id, trigger.entity_id, trigger.from_engine, trigger.from_user)
+        self.cache = cache
+        self.shared = shared
+        self._history = history
+        self._gatekeeper = gatekeeper
+        self.values: dict[str, Any] = {}
+        self._frames: list[_Dependencies] = []
+        self._profile = profile
+        self._presence = presence
+        self._temperature = temperature
+        # Time spent in nested variables, per frame, for self-time profiling
+        self._child_seconds: list[float] = []
+
+    @property
+    def now(self) -> datetime:
+        """Return the evaluation time (marks the current variable as volatile)."""
+        if self._frames:
+            self._frames[-1].volatile = True
+        return self._now
+
+    @property
+    def history(self) -> TemperatureHistory | None:
+        """Return the temperature history (changes every tick, so volatile)."""
+        if self._frames and self._history is not None:
+            self._frames[-1].volatile = True
+        return self._history
+
+    @property
+    def gatekeeper(self) -> Gatekeeper | None:
+        """Return the gatekeeper (updated after every command, so volatile)."""
+        if self._frames and self._gatekeeper is not None:
+            self._frames[-1].volatile = True
+        return self._gatekeeper
+
+    @property
+    def presence(self) -> PresenceTracker | None:
+        """Return the presence tracker (updated by events, so volatile)."""
+        if self._frames and self._presence is not None:
+            self._frames[-1].volatile = True
+        return self._presence
+
+    @property
+    def temperature(self) -> TemperatureAggregator | None:
+        """Return the temperature aggregator (updated by events, so volatile)."""
+        if self._frames and self._temperature is not None:
+            self._frames[-1].volatile = True
+        return self._temperature
+
+    @property
+    def trigger(self) -> Trigger:
+        """Return the trigger (the current variable now depends on it)."""
+        if self._frames:
+            self._frames[-1].trigger = self._trigger_key
+        return self._trigger
+
+    def __getitem__(self, name: str) -> Any:
+        """Return a variable, computing it on first access."""
+        value = self._value(name)
+        if self._frames:
+            self._frames[-1].variables[name] = value
+        return value
+
+    def _value(self, name: str) -> Any:
+        """Return a variable without recording it as a dependency."""
+        try:
+            return self.values[name]
+        except KeyError:
+            pass
+        if self.shared is not None and name in SHARED_VARIABLES:
+            key = self.config.shared_key(name)
+            try:
+                value = self.values[name] = self.shared[key]
+                return value
+            except KeyError:
+                value = self.shared[key] = self._compute(name)
+                return value
+        return self._compute(name)
+
+    def _compute(self, name: str) -> Any:
+        """Compute a variable, reusing the cross-run cache when still valid."""
+        cache = self.cache
+        if cache is not None:
+            entry = cache.entries.get(name)
+            if entry is not None and self._is_current(entry.deps):
+                cache.hits += 1
+                self.values[name] = entry.value
+                return entry.value
+
+        deps = _Dependencies()
+        self._frames.append(deps)
+        if self._profile is not None:
+            self._child_seconds.append(0.0)
+            start = time.perf_counter()
+        try:
+            value = VARIABLES[name](self)
+        finally:
+            self._frames.pop()
+            if self._profile is not None:
+                elapsed = time.perf_counter() - start
+                self._profile.record(name, elapsed - self._child_seconds.pop())
+                if self._child_seconds:
+                    self._child_seconds[-1] += elapsed
+        self.values[name] = value
+        if cache is not None:
+            cache.misses += 1
+            cache.entries[name] = _CacheEntry(value, deps)
+        return value
+
+    def _is_current(self, deps: _Dependencies) -> bool:
+        """Return True if nothing a cached value read has changed."""
+        if deps.volatile:
+            return False
+        if deps.trigger is not None and deps.trigger != self._trigger_key:
+            return False
+        get = self.states.get
+        for entity_id, version in deps.entities.items():
+            if _state_version(get(entity_id)) != version:
+                return False
+        return all(self._value(name) == value for name, value in deps.variables.items())
+
+    def compute_all(self) -> dict[str, Any]:
+        """Compute every registered variable (eager blueprint semantics)."""
+        for name in VARIABLES:
+            self[name]
+        return self.values
+
+    # ---- state access (equivalents of states(), state_attr(), is_state()) ----
+
+    def state_obj(self, entity_id: str | None) -> Any:
+        """Return the raw state object for an entity."""
+        if not entity_id:
+            return None
+        state = self.states.get(entity_id)
+        if self._frames:
+            self._frames[-1].entities[entity_id] = _state_version(state)
+        return state
+
+    def state(self, entity_id: str | None) -> str:
+        """Return an entity's state string ('unknown' if missing)."""
+        state = self.state_obj(entity_id)
+        return "unknown" if state is None else state.state
+
+    def attr(self, entity_id: str | None, name: str, default: Any = None) -> Any:
+        """Return an entity attribute."""
+        state = self.state_obj(entity_id)
+        if state is None:
+            return default
+        value = state.attributes.get(name)
+        return default if value is None else value
+
+    def capabilities(self) -> Capabilities:
+        """Return the resolved fan/swing/hvac mode choices of the primary unit."""
+        return CAPABILITIES.get(self.primary, self.state_obj(self.primary))
+
+    def helper_state(self, input_name: str) -> str | None:
+        """Return the state of a helper input, or None if not configured."""
+        entity_id = self.config.helper(input_name)
+        if entity_id is None:
+            return None
+        return self.state(entity_id)
+
+    def minutes_since(self, value: Any) -> float | None:
+        """Return minutes between a datetime (or helper datetime state) and now."""
+        parsed = parse_datetime(value, self.now.tzinfo)
+        if parsed is None:
+            return None
+        return (self.now - parsed).total_seconds() / 60
+
+    @property
+    def primary(self) -> str | None:
+        """Return climate_list[0]."""
+        entities = self.config.climate_entities
+        return entities[0] if entities else None
+
+
+# ---------------------------------------------------------------------------
+# Targets and comfort zone
+# ---------------------------------------------------------------------------
+
+
+@variable
+def target_temp(ev: Evaluation) -> float:
+    cfg = ev.config
+    if not cfg["enable_scheduling"]:
+        return _float(cfg["target_temperature"], 22)
+    hour = ev.now.hour
+    if ev.now.weekday() >= 5 and cfg["enable_weekend_schedule"]:
+        if 6 <= hour < 10:
+            return _float(cfg["weekend_morning_temp"])
+        if 10 <= hour < 22:
+            return _float(cfg["weekend_day_temp"])
+        return _float(cfg["weekend_night_temp"])
+    if 6 <= hour < 9:
+        return _float(cfg["morning_temp"])
+    if 9 <= hour < 18:
+        return _float(cfg["day_temp"])
+    if 18 <= hour < 22:
+        return _float(cfg["evening_temp"])
+    return _float(cfg["night_temp"])
+
+
+@variable
+def comfort_min_temp(ev: Evaluation) -> float:
+    cfg = ev.config
+    if cfg["enable_advanced_temp"]:
+        return round(_float(cfg["comfort_min_temp"]), 1)
+    return round(ev["target_temp"] - _float(cfg["comfort_zone_width"]), 1)
+
+
+@variable
+def comfort_max_temp(ev: Evaluation) -> float:
+    cfg = ev.config
+    if cfg["enable_advanced_temp"]:
+        return round(_float(cfg["comfort_max_temp"]), 1)
+    return round(ev["target_temp"] + _float(cfg["comfort_zone_width"]), 1)
+
+
+@variable
+def cooling_target_temp(ev: Evaluation) -> float:
+    cfg = ev.config
+    if cfg["enable_advanced_temp"]:
+        return round(_float(cfg["cooling_target_temp"]), 1)
+    return round(ev["target_temp"], 1)
+
+
+@variable
+def heating_target_temp(ev: Evaluation) -> float:
+    cfg = ev.config
+    if cfg["enable_advanced_temp"]:
+        return round(_float(cfg["heating_target_temp"]), 1)
+    return round(ev["target_temp"], 1)
+
+
+@variable
+def ac_min_resolved(ev: Evaluation) -> float:
+    user_min = _float(ev.config["ac_minimum_temp"])
+    reported = _float(ev.attr(ev.primary, "min_temp"), 16)
+    reported = reported if reported > 0 else 16
+    return round(user_min if user_min > 0 else reported, 1)
+
+
+@variable
+def ac_max_resolved(ev: Evaluation) -> float:
+    user_max = _float(ev.config["ac_maximum_temp"])
+    reported = _float(ev.attr(ev.primary, "max_temp"), 30)
+    reported = reported if reported > 0 else 30
+    return round(user_max if user_max > 0 else reported, 1)
+
+
+# ---------------------------------------------------------------------------
+# Helper-backed state
+# ---------------------------------------------------------------------------
+
+
+@variable
+def last_mode(ev: Evaluation) -> str:
+    raw = ev.helper_state("helper_last_mode")
+    return raw if raw not in (None, *UNAVAILABLE_STATES) else "off"
+
+
+@variable
+def control_mode(ev: Evaluation) -> str:
+    default = ev.config["default_control_mode"]
+    raw = ev.helper_state("helper_control_mode")
+    if raw is None:
+        return default
+    return raw or default
+
+
+@variable
+def override_source(ev: Evaluation) -> str:
+    raw = ev.helper_state("helper_override_source")
+    if raw is None:
+        return "none"
+    return raw.strip()
+
+
+@variable
+def last_transition(ev: Evaluation) -> str:
+    raw = ev.helper_state("helper_last_transition")
+    if raw is None or raw in UNAVAILABLE_STATES:
+        return "none"
+    return raw
+
+
+@variable
+def previous_temp(ev: Evaluation) -> float:
+    raw = ev.helper_state("helper_temp_history")
+    return 0.0 if raw is None else _float(raw)
+
+
+@variable
+def time_since_change(ev: Evaluation) -> float:
+    minutes = ev.minutes_since(ev.helper_state("helper_last_change"))
+    return 999 if minutes is None else minutes
+
+
+@variable
+def time_in_current_mode(ev: Evaluation) -> float:
+    minutes = ev.minutes_since(ev.helper_state("helper_mode_start_time"))
+    return 0.0 if minutes is None else abs(round(minutes, 1))
+
+
+@variable
+def time_since_fan_change(ev: Evaluation) -> float:
+    minutes = ev.minutes_since(ev.helper_state("helper_last_fan_change"))
+    return 60 if minutes is None else round(minutes, 1)
+
+
+# ---------------------------------------------------------------------------
+# Climate entity state
+# ---------------------------------------------------------------------------
+
+
+@variable
+def any_ac_unavailable(ev: Evaluation) -> bool:
+    return any(
+        ev.state(entity_id) in ("unavailable", "unknown")
+        for entity_id in ev.config.climate_entities
+    )
+
+
+@variable
+def actual_ac_state(ev: Evaluation) -> str:
+    for entity_id in ev.config.climate_entities:
+        entity_state = ev.state(entity_id)
+        if entity_state in ("off", "unavailable", "unknown"):
+            continue
+        hvac_action = ev.attr(entity_id, "hvac_action", "off")
+        if hvac_action in ("cooling", "heating", "drying", "fan") or entity_state in ACTIVE_HVAC_MODES:
+            return "on"
+    return "off"
+
+
+@variable
+def effective_off_time(ev: Evaluation) -> float:
+    if (
+        ev["actual_ac_state"] == "off"
+        and ev["last_mode"] not in OFF_LIKE_MODES
+        and ev.primary
+    ):
+        state = ev.state_obj(ev.primary)
+        if state is not None and state.last_changed is not None:
+            return abs(round((ev.now - state.last_changed).total_seconds() / 60, 1))
+    return ev["time_in_current_mode"]
+
+
+@variable
+def current_fan_level_int(ev: Evaluation) -> int:
+    return fan_level(ev.attr(ev.primary, "fan_mode", "3"), 3)
+
+
+# ---------------------------------------------------------------------------
+# Temperature pipeline
+# ---------------------------------------------------------------------------
+
+
+@variable
+def current_temp(ev: Evaluation) -> float:
+    cfg = ev.config
+    if cfg.temperature_sensors:
+        if cfg.temperature_sensor_is_single:
+            return _float(ev.state(cfg.temperature_sensors[0]), 25)
+        aggregator = ev.temperature
+        if aggregator is None:
+            aggregator = cfg.temperature_aggregator()
+            for sensor in cfg.temperature_sensors:
+                aggregator.update(sensor, ev.state_obj(sensor))
+        now = ev.now if cfg.temp_sensor_max_age > 0 else None
+        result = aggregator.result(now, ev.states)
+        return 25.0 if result.value is None else result.value
+    if cfg["use_average_temperature"]:
+        temps = []
+        for entity_id in cfg.climate_entities:
+            raw = ev.attr(entity_id, "current_temperature")
+            if raw is None:
+                continue
+            value = _float(raw, -999)
+            if value > -50:
+                temps.append(value)
+        return round(sum(temps) / len(temps), 1) if temps else 25.0
+    return _float(ev.attr(ev.primary, "current_temperature"), 25)
+
+
+@variable
+def outdoor_temperature(ev: Evaluation) -> float:
+    cfg = ev.config
+    if not (cfg["enable_outside_temp_compensation"] or cfg["enable_outside_temp_fan_boost"]):
+        return 25.0
+    if cfg.outdoor_temp_sensor:
+        return _float(ev.state(cfg.outdoor_temp_sensor), 25)
+    return _float(ev.attr(cfg.weather_entity, "temperature"), 25)
+
+
+@variable
+def outside_temp_compensation_amount(ev: Evaluation) -> float:
+    cfg = ev.config
+    if not cfg["enable_outside_temp_compensation"]:
+        return 0.0
+    delta = ev["outdoor_temperature"] - _float(cfg["outside_compensation_base_temp"], 25)
+    raw = abs(delta * _float(cfg["outside_compensation_factor"]))
+    return round(min(max(0, raw), _float(cfg["max_outside_compensation"])), 1)
+
+
+@variable
+def heat_source_load(ev: Evaluation) -> float:
+    cfg = ev.config
+    if not (cfg["enable_heat_source_compensation"] and cfg.heat_source_sensors):
+        return 0.0
+    total, count = 0.0, 0
+    for sensor in cfg.heat_source_sensors:
+        raw = ev.state(sensor)
+        if raw in ("unavailable", "unknown", "none", ""):
+            continue
+        value = _float(raw)
+        unit = str(ev.attr(sensor, "unit_of_measurement", "")).lower()
+        if unit == "w":
+            value = value / 10
+        elif unit == "kw":
+            value = value * 100
+        value = min(value, 100)
+        if value >= 0:
+            total += value
+            count += 1
+    return round(total / count, 1) if count else 0.0
+
+
+@variable
+def heat_source_active(ev: Evaluation) -> bool:
+    cfg = ev.config
+    return bool(cfg["enable_heat_source_compensation"]) and ev["heat_source_load"] >= _float(
+        cfg["heat_source_threshold"], 50
+    )
+
+
+@variable
+def heat_source_compensation_amount(ev: Evaluation) -> float:
+    if not ev["heat_source_active"]:
+        return 0.0
+    cfg = ev.config
+    threshold = _float(cfg["heat_source_threshold"], 50)
+    max_comp = _float(cfg["heat_source_max_compensation"], 2)
+    scale_range = 100 - threshold
+    if scale_range <= 0:
+        return max_comp
+    return round(min((ev["heat_source_load"] - threshold) / scale_range * max_comp, max_comp), 1)
+
+
+@variable
+def heat_source_escalation_boost(ev: Evaluation) -> int:
+    return _int(ev.config["heat_source_fan_boost"]) if ev["heat_source_active"] else 0
+
+
+@variable
+def effective_min_progress_rate(ev: Evaluation) -> float:
+    base_rate = _float(ev.config["minimum_progress_rate"], 0.03)
+    if ev["heat_source_active"]:
+        reduction = _float(ev.config["heat_source_progress_reduction"], 50) / 100
+        return max(round(base_rate * (1 - reduction), 4), 0.001)
+    return max(base_rate, 0.001)
+
+
+@variable
+def temp_change_rate(ev: Evaluation) -> float:
+    current, previous = ev["current_temp"], ev["previous_temp"]
+    history = ev.history
+    if history is not None:
+        # Least-squares slope over the recent periodic readings
+        window = (len(history) + 1) * max(ev.config.check_interval, 1) * 1.5
+        slope = history.slope(ev.now, current, window)
+        if slope is not None:
+            return round(slope, 3)
+    if previous <= 0 or current == previous:
+        return 0.0
+    if ev.config.helper("helper_temp_history"):
+        window = float(ev.config.check_interval or 1)
+    else:
+        window = ev["time_in_current_mode"] or 1.0
+    if window <= 0:
+        return 0.0
+    return round((current - previous) / window, 3)
+
+
+@variable
+def calculated_trend(ev: Evaluation) -> str:
+    rate = ev["temp_change_rate"]
+    if rate > 0.2:
+        return "rising"
+    if rate < -0.2:
+        return "falling"
+    return "stable"
+
+
+@variable
+def distance_from_target(ev: Evaluation) -> float:
+    target = ev["target_temp"]
+    if ev["last_mode"] == "cooling":
+        target -= ev.config.target_overshoot
+    elif ev["last_mode"] == "heating":
+        target += ev.config.target_overshoot
+    return abs(ev["current_temp"] - target)
+
+
+@variable
+def current_effectiveness(ev: Evaluation) -> float:
+    if ev["time_in_current_mode"] < 2:
+        return 50
+    distance = ev["distance_from_target"]
+    if ev["previous_temp"] == 0 or not ev.config.helper("helper_temp_history"):
+        if distance <= 0.5:
+            return 70
+        if distance <= 1.5:
+            return 60
+        if distance <= 3.0:
+            return 50
+        return 40
+    rate = ev["temp_change_rate"]
+    last = ev["last_mode"]
+    if last == "cooling":
+        expected = -ev["effective_min_progress_rate"]
+        if rate <= expected:
+            return round(min(40 + rate / expected * 55, 95))
+        if expected < rate < 0:
+            return round(40 + rate / expected * 55)
+        return 30 if rate == 0 else 10
+    if last == "heating":
+        expected = ev["effective_min_progress_rate"]
+        if rate >= expected:
+            return round(min(40 + rate / expected * 55, 95))
+        if 0 < rate < expected:
+            return round(40 + rate / expected * 55)
+        return 30 if rate == 0 else 10
+    return 50
+
+
+@variable
+def is_stalling(ev: Evaluation) -> bool:
+    rate, min_progress = ev["temp_change_rate"], ev["effective_min_progress_rate"]
+    return (ev["last_mode"] == "cooling" and rate > -min_progress) or (
+        ev["last_mode"] == "heating" and rate < min_progress
+    )
+
+
+@variable
+def good_progress(ev: Evaluation) -> bool:
+    rate, min_progress = ev["temp_change_rate"], ev["effective_min_progress_rate"]
+    return (ev["last_mode"] == "cooling" and rate < -(min_progress * 1.5)) or (
+        ev["last_mode"] == "heating" and rate > min_progress * 1.5
+    )
+
+
+# ---------------------------------------------------------------------------
+# Escalation
+# ---------------------------------------------------------------------------
+
+
+@variable
+def escalation_level(ev: Evaluation) -> int:
+    cfg = ev.config
+    if not cfg["enable_dynamic_adaptation"]:
+        return 0
+    tf = cfg.escalation_time_factor
+    distance = ev["distance_from_target"]
+
+    distance_floor = 0
+    if distance > 4.0:
+        distance_floor = 4
+    elif distance > 3.0:
+        distance_floor = 3
+    elif distance > 2.0:
+        distance_floor = 2
+    elif distance > 1.0:
+        distance_floor = 1
+
+    if ev.trigger.id != "periodic_check" and distance > _float(cfg["deescalation_approach_threshold"]):
+        # Far from target on an event trigger: hold the current fan level
+        return max(0, ev["current_fan_level_int"] - 1) if ev["current_fan_level_int"] > 1 else 0
+
+    minutes = ev["time_in_current_mode"]
+    effectiveness = ev["current_effectiveness"]
+    trend = ev["calculated_trend"]
+    rate = abs(ev["temp_change_rate"])
+    min_rate = ev["effective_min_progress_rate"]
+    last = ev["last_mode"]
+    stall_time = _float(cfg["stall_escalation_time"])
+    check_mins = _float(cfg["effectiveness_check_minutes"])
+    near = _float(cfg["bed_eco_near_target_threshold"]) if last in BED_MODES else 0.5
+    near_upper = near * 2 if last in BED_MODES else 1.0
+    min_check_time = 5 * tf
+
+    if last in ("off", "eco") or minutes < min_check_time:
+        level = 0
+    elif distance > 5.0:
+        level = 4
+    elif effectiveness <= 10 and minutes >= 10 * tf:
+        level = 4
+    elif last == "cooling" and trend == "rising" and ev["current_temp"] > ev["comfort_max_temp"] + 1.5:
+        level = 4
+    elif last == "heating" and trend == "falling" and ev["current_temp"] < ev["comfort_min_temp"] - 1.5:
+        level = 4
+    elif (
+        minutes >= stall_time * _float(cfg["extended_stall_multiplier"]) * tf
+        and rate < min_rate * 0.5
+        and distance > 2.0
+    ):
+        level = 4
+    elif distance <= near and effectiveness >= 50:
+        level = 0
+    elif near < distance <= near_upper and minutes >= 20 * tf and (trend == "stable" or rate < 0.05):
+        level = 1
+    elif distance > 3.5 and minutes >= 8 * tf:
+        level = 3
+    elif effectiveness <= 15 and minutes >= 12 * tf:
+        level = 3
+    elif distance > 2.5 and trend == "stable" and minutes >= 15 * tf:
+        level = 3
+    elif minutes >= stall_time * tf and rate < min_rate * 0.6 and distance > 1.5:
+        level = 3
+    elif distance > 2.5 and minutes >= 12 * tf:
+        level = 2
+    elif effectiveness <= 20 and minutes >= 15 * tf:
+        level = 2
+    elif distance > 2.0 and minutes >= (check_mins + 5) * tf:
+        level = 2
+    elif minutes >= stall_time * 0.75 * tf and rate < min_rate * 0.4 and distance > 1.0:
+        level = 2
+    elif distance > 1.5 and minutes >= (check_mins + 8) * tf:
+        level = 1
+    elif effectiveness <= 35 and minutes >= (check_mins + 10) * tf:
+        level = 1
+    elif distance > 1.0 and minutes >= 2 * tf:
+        level = 1
+    else:
+        level = 0
+    return max(distance_floor, level)
+
+
+@variable
+def wrong_direction_escalation_add(ev: Evaluation) -> int:
+    cfg = ev.config
+    per_check = _int(cfg["wrong_direction_escalation_per_check"], 1)
+    if not (cfg["enable_wrong_direction_escalation"] and per_check > 0):
+        return 0
+    rate, min_rate = ev["temp_change_rate"], ev["effective_min_progress_rate"]
+    wrong = (ev["last_mode"] == "cooling" and rate >= -min_rate) or (
+        ev["last_mode"] == "heating" and rate <= min_rate
+    )
+    return per_check if wrong else 0
+
+
+def _outdoor_boost(ev: Evaluation) -> int:
+    """Shared outdoor delta boost used by escalation and fan level."""
+    cfg = ev.config
+    if not cfg["enable_outside_temp_fan_boost"]:
+        return 0
+    delta = ev["outdoor_temperature"] - _float(cfg["outside_compensation_base_temp"], 25)
+    if ev["last_mode"] == "cooling" and delta > 0:
+        return 2 if delta >= 10 else 1 if delta >= 5 else 0
+    if ev["last_mode"] == "heating" and delta < 0:
+        return 2 if delta <= -10 else 1 if delta <= -5 else 0
+    return 0
+
+
+@variable
+def outside_temp_escalation_boost(ev: Evaluation) -> int:
+    return _outdoor_boost(ev)
+
+
+@variable
+def final_escalation_level(ev: Evaluation) -> int:
+    total = (
+        ev["escalation_level"]
+        + ev["wrong_direction_escalation_add"]
+        + ev["outside_temp_escalation_boost"]
+        + ev["heat_source_escalation_boost"]
+    )
+    return min(total, 4)
+
+
+# ---------------------------------------------------------------------------
+# Fan level resolution
+# ---------------------------------------------------------------------------
+
+
+@variable
+def calculated_fan_level_int(ev: Evaluation) -> int:
+    cfg = ev.config
+    mode = cfg["fan_control_mode"]
+    distance = ev["distance_from_target"]
+    if mode == "static":
+        return fan_level(cfg["static_fan_speed"], 3)
+
+    current_level = ev["current_fan_level_int"]
+    time_since = ev["time_since_fan_change"]
+
+    if mode == "temperature_band":
+        if distance <= 1.0:
+            band_fan = cfg["fan_band_0_1"]
+        elif distance <= 2.0:
+            band_fan = cfg["fan_band_1_2"]
+        elif distance <= 3.0:
+            band_fan = cfg["fan_band_2_3"]
+        elif distance <= 4.0:
+            band_fan = cfg["fan_band_3_4"]
+        else:
+            band_fan = cfg["fan_band_4_plus"]
+        target_level = fan_level(band_fan, 3)
+        if target_level == current_level:
+            return target_level
+        # Asymmetric debounce: fast escalation, slow de-escalation
+        hold = 0.5 if target_level > current_level else _float(cfg["fan_band_hold_time"], 5)
+        return current_level if time_since < hold else target_level
+
+    if ev["last_mode"] in ("off", "eco", "fan_only"):
+        return cfg.dynamic_starting_level
+    if time_since < _float(cfg["dynamic_hold_time"], 10):
+        return current_level
+    if ev["is_stalling"] and current_level < cfg.dynamic_max_level:
+        return current_level + 1
+    if (
+        cfg["dynamic_enable_deescalation"]
+        and ev["good_progress"]
+        and current_level > cfg.dynamic_starting_level
+        and distance < 2.0
+    ):
+        return current_level - 1
+    return current_level
+
+
+@variable
+def final_fan_level_int(ev: Evaluation) -> int:
+    boost = _outdoor_boost(ev)
+    if ev.config["enable_heat_source_fan_boost"] and ev["heat_source_escalation_boost"] > 0:
+        boost += ev["heat_source_escalation_boost"]
+    return min(ev["calculated_fan_level_int"] + boost, 5)
+
+
+@variable
+def new_fan_mode(ev: Evaluation) -> str:
+    return ev.capabilities().fan_mode(ev["final_fan_level_int"])
+
+
+@variable
+def fan_mode_changed(ev: Evaluation) -> bool:
+    return ev.attr(ev.primary, "fan_mode", "") != ev["new_fan_mode"]
+
+
+@variable
+def selected_fan_only_fan_mode(ev: Evaluation) -> str:
+    return ev.capabilities().fan_only_mode(ev.config["fan_only_fan_speed"] or "silence")
+
+
+@variable
+def validated_swing_mode(ev: Evaluation) -> str:
+    return ev.capabilities().swing_mode(str(ev.config["swing_mode_active"]).lower())
+
+
+def select_hvac_mode(ev: Evaluation, wanted: str) -> str:
+    """Pick the vendor spelling of an hvac mode (selected_hvac_mode)."""
+    return ev.capabilities().hvac_mode(wanted)
+
+
+# ---------------------------------------------------------------------------
+# Setpoint
+# ---------------------------------------------------------------------------
+
+
+@variable
+def adjusted_target(ev: Evaluation) -> float:
+    cfg = ev.config
+    target = ev["target_temp"]
+    base = target
+    last = ev["last_mode"]
+    current = ev["current_temp"]
+    mode_is_cooling = last in COOLING_MODES
+    mode_is_heating = last == "heating"
+    is_cooling = mode_is_cooling or (not mode_is_heating and current > ev["comfort_max_temp"])
+    is_heating = mode_is_heating or (not mode_is_cooling and current < ev["comfort_min_temp"])
+    in_bed_comfort = last in BED_MODES
+
+    if cfg["enable_outside_temp_compensation"] and (is_cooling or is_heating) and not in_bed_comfort:
+        delta = ev["outdoor_temperature"] - _float(cfg["outside_compensation_base_temp"], 25)
+        amount = ev["outside_temp_compensation_amount"]
+        if is_cooling and delta > 0 and current - target > 0:
+            comfort_range = ev["comfort_max_temp"] - target
+            scale = min((current - target) / comfort_range, 1.0) if comfort_range > 0 else 0.0
+            base -= amount * scale
+        elif is_heating and delta < 0 and target - current > 0:
+            comfort_range = target - ev["comfort_min_temp"]
+            scale = min((target - current) / comfort_range, 1.0) if comfort_range > 0 else 0.0
+            base += amount * scale
+
+    level = ev["final_escalation_level"]
+    if cfg["enable_dynamic_target_adjustment"] and level > 0 and (is_cooling or is_heating) and not in_bed_comfort:
+        adjustment = level * cfg.effective_escalation_offset
+        base = base - adjustment if is_cooling else base + adjustment
+
+    if ev["heat_source_active"] and is_cooling:
+        base -= ev["heat_source_compensation_amount"]
+
+    if is_cooling:
+        return round(max(ev["ac_min_resolved"], base), 1)
+    if is_heating:
+        return round(min(base, ev["ac_max_resolved"]), 1)
+    return target
+
+
+@variable
+def cooling_with_hysteresis(ev: Evaluation) -> bool:
+    margin = _float(ev.config["hysteresis_tolerance"]) if ev["last_transition"] == "heating" else 0
+    return ev["current_temp"] > ev["comfort_max_temp"] + margin
+
+
+@variable
+def heating_with_hysteresis(ev: Evaluation) -> bool:
+    margin = _float(ev.config["hysteresis_tolerance"]) if ev["last_transition"] == "cooling" else 0
+    return ev["current_temp"] < ev["comfort_min_temp"] - margin
+
+
+# ---------------------------------------------------------------------------
+# Presence
+# ---------------------------------------------------------------------------
+
+
+@variable
+def anyone_home(ev: Evaluation) -> bool:
+    cfg = ev.config
+    if any(ev.state(person) == "home" for person in cfg.persons):
+        return True
+    return any(ev.state(device) in ("on", "PowerOn") for device in cfg.devices)
+
+
+@variable
+def approaching_home(ev: Evaluation) -> bool:
+    cfg = ev.config
+    if not (cfg.direction_sensor and cfg.proximity_sensor):
+        return False
+    return ev.state(cfg.direction_sensor) == "towards" and _float(
+        ev.state(cfg.proximity_sensor), 10000
+    ) < _float(cfg["home_zone_distance"])
+
+
+@variable
+def proximity_zone(ev: Evaluation) -> str:
+    cfg = ev.config
+    distance = _float(ev.state(cfg.proximity_sensor), 99999) if cfg.proximity_sensor else 99999
+    return "home" if distance < _float(cfg["home_zone_distance"]) else "away"
+
+
+@variable
+def bed_occupied(ev: Evaluation) -> bool:
+    cfg = ev.config
+    return cfg["bed_comfort_mode"] != "off" and bool(cfg.bed_sensor) and ev.state(cfg.bed_sensor) == "on"
+
+
+@variable
+def minutes_since_bed_off(ev: Evaluation) -> float:
+    sensor = ev.config.bed_sensor
+    if not sensor or ev.state(sensor) == "on":
+        return 0
+    state = ev.state_obj(sensor)
+    if state is None or state.last_changed is None:
+        return 999
+    return round((ev.now - state.last_changed).total_seconds() / 60)
+
+
+@variable
+def room_presence_detected(ev: Evaluation) -> bool:
+    cfg = ev.config
+    sensors = cfg.presence_sensors
+    if not sensors.total:
+        return False
+    tracker = ev.presence
+    if tracker is not None:
+        counts: PresenceCounts = tracker.counts
+    else:
+        counts = sensors.count((sensor, ev.state(sensor)) for sensor in sensors.kinds)
+    return presence_mode_result(
+        cfg["presence_validation_mode"],
+        triggered=counts.triggered,
+        total=sensors.total,
+        ble=counts.ble > 0,
+        motion=counts.motion > 0,
+        other=counts.other > 0,
+        ble_count=sensors.ble_count,
+        bed=ev["bed_occupied"],
+    )
+
+
+def presence_mode_result(
+    mode: Any,
+    *,
+    triggered: int,
+    total: int,
+    ble: bool,
+    motion: bool,
+    other: bool,
+    ble_count: int,
+    bed: bool,
+) -> bool:
+    """Apply a presence_validation_mode to the per-sensor results."""
+    mode = str(mode or "any").lower()
+    if mode == "all":
+        return triggered == total
+    if mode == "majority":
+        return triggered > total / 2
+    if mode == "ble_motion":
+        return ble and motion
+    if mode == "ble_bed":
+        return ble and (other or bed)
+    if mode == "ble_smart":
+        return ble and (motion or other or bed)
+    if mode == "ble_smart_bed":
+        return bed or (ble and (motion or other))
+    if mode == "motion_only":
+        return motion
+    if mode == "ble_only":
+        return ble
+    if mode == "bed_only":
+        return other or bed
+    if mode == "ble_plus" and ble_count > 0:
+        return ble and (motion or other or bed)
+    return triggered > 0
+
+
+@variable
+def minutes_since_presence(ev: Evaluation) -> float:
+    if ev["room_presence_detected"]:
+        return 0
+    minutes = ev.minutes_since(ev.helper_state("helper_presence_detected"))
+    return 999 if minutes is None else abs(round(minutes))
+
+
+@variable
+def minutes_with_presence(ev: Evaluation) -> float:
+    if not ev["room_presence_detected"]:
+        return 0
+    minutes = ev.minutes_since(ev.helper_state("helper_presence_detected"))
+    if minutes is None:
+        return 0
+    minutes = round(minutes, 1)
+    validation = ev.helper_state("helper_presence_validation_active")
+    if validation is not None:
+        return max(minutes, 0) if validation == "on" else 0
+    return 0 if minutes > 120 or minutes < 0 else minutes
+
+
+@variable
+def smart_presence_active(ev: Evaluation) -> bool:
+    cfg = ev.config
+    mode = ev["control_mode"]
+    if mode == "Override":
+        effective_mode = ev.helper_state("helper_mode_before_override") or cfg["default_control_mode"]
+    else:
+        effective_mode = mode
+    delay = _float(cfg["presence_confirmation_delay"])
+    timeout = _float(cfg["presence_timeout_minutes"])
+    last = ev["last_mode"]
+    if mode == "Manual":
+        return False
+    if mode == "Pre-conditioning":
+        return True
+    if effective_mode == "Smart":
+        bed = ev["bed_occupied"]
+        if bed and last in BED_MODES:
+            return True
+        if bed and (delay == 0 or ev["minutes_with_presence"] >= delay - 0.17):
+            return True
+        if (
+            cfg.bed_sensor
+            and ev.state(cfg.bed_sensor) != "on"
+            and ev["minutes_since_bed_off"] < _float(cfg["bed_absence_grace_period"])
+            and last not in (*OFF_LIKE_MODES, "window_off")
+        ):
+            return True
+        if ev["room_presence_detected"] and ev["minutes_with_presence"] >= delay - 0.17:
+            return True
+        if not ev["room_presence_detected"] and ev["minutes_since_presence"] < timeout:
+            return _grace_period_applies(ev, delay, timeout)
+        return ev["approaching_home"] and not ev["anyone_home"]
+    if effective_mode == "Auto":
+        return (
+            ev["room_presence_detected"]
+            or ev["minutes_since_presence"] < timeout
+            or ev["proximity_zone"] == "home"
+            or ev["anyone_home"]
+        )
+    return False
+
+
+def _grace_period_applies(ev: Evaluation, delay: float, timeout: float) -> bool:
+    """Exit grace period check from smart_presence_active."""
+    cfg = ev.config
+    room = cfg.room_name.lower()
+    in_room = different_room = 0
+    if room:
+        for sensor in cfg.presence_sensors.ble_area_sensors:
+            raw = ev.state(sensor).lower()
+            if raw == room:
+                in_room += 1
+            elif raw not in UNAVAILABLE_STATES:
+                different_room += 1
+    ac_running = any(
+        ev.state(entity_id) in ("cool", "heat", "heat_cool", "dry")
+        for entity_id in cfg.climate_entities
+    )
+    if in_room == 0 and different_room > 0 and not ac_running:
+        return False
+    if ev.helper_state("helper_presence_validation_active") == "on":
+        return True
+    minutes = ev.minutes_since(ev.helper_state("helper_presence_detected"))
+    if minutes is None:
+        return False
+    return delay == 0 or minutes < timeout
+
+
+@variable
+def extreme_temp_detected(ev: Evaluation) -> str | bool:
+    cfg = ev.config
+    if not cfg["extreme_temp_override"]:
+        return False
+    if ev["current_temp"] > _float(cfg["extreme_high_temp"]):
+        return "hot"
+    if ev["current_temp"] < _float(cfg["extreme_low_temp"]):
+        return "cold"
+    return False
+
+
+# ---------------------------------------------------------------------------
+# Activation
+# ---------------------------------------------------------------------------
+
+
+@variable
+def manual_override_detection(ev: Evaluation) -> bool:
+    cfg = ev.config
+    trigger = ev.trigger
+    if not cfg["enable_ac_override_detection"]:
+        return False
+    if ev["control_mode"] in ("Override", "Manual", "Pre-conditioning"):
+        return False
+    if ev.helper_state("helper_state_machine") == "LOCKED":
+        return False
+    if trigger.id == "override_cleared_by_user":
+        return False
+    gatekeeper = ev.gatekeeper
+    expected = gatekeeper.expected(ev.primary) if gatekeeper and ev.primary else None
+    if expected is not None:
+        expected_hvac = expected.hvac_mode
+    else:
+        expected_hvac = ev.helper_state("helper_expected_hvac")
+    if expected_hvac in (None, *UNAVAILABLE_STATES):
+        return False
+    actual_hvac = ev.state(ev.primary)
+    if trigger.id == "periodic_check":
+        # Physical remote turned the unit off between polls
+        since_command = ev.minutes_since(ev.helper_state("helper_last_change"))
+        since_command = 9999 if since_command is None else since_command * 60
+        return (
+            expected_hvac in ACTIVE_HVAC_MODES
+            and actual_hvac == "off"
+            and OVERRIDE_COMMAND_GRACE < since_command < 300
+        )
+    if trigger.id != "climate_state_change" or trigger.from_engine:
+        return False
+    # Changes not caused by this engine (UI click, remote, voice assistant)
+    return actual_hvac != expected_hvac
+
+
+@variable
+def should_activate(ev: Evaluation) -> bool:
+    return _should_activate(ev)[0]
+
+
+@variable
+def should_activate_reason(ev: Evaluation) -> str:
+    return _should_activate(ev)[1]
+
+
+def _should_activate(ev: Evaluation) -> tuple[bool, str]:
+    """Shared implementation of should_activate / should_activate_reason."""
+    cfg = ev.config
+    mode = ev["control_mode"]
+    last = ev["last_mode"]
+    if mode == "Override":
+        if cfg["override_behavior"] == "independent" and ev["override_source"] == "ac":
+            if ev.helper_state("helper_mode_before_override") == "Smart":
+                return ev["smart_presence_active"], "OVERRIDE_MODE"
+            return ev["anyone_home"] or ev["approaching_home"], "OVERRIDE_MODE"
+        return False, "OVERRIDE_MODE"
+    if ev["manual_override_detection"]:
+        return False, "MANUAL_OVERRIDE_DETECTED"
+    if (
+        last in ("cooling", "heating")
+        and ev["time_in_current_mode"] < _float(cfg["min_runtime_minutes"])
+        and ev["actual_ac_state"] == "on"
+    ):
+        return True, f"RUNTIME_PROTECTION (time={ev['time_in_current_mode']}min)"
+    if (
+        (last == "off" or ev["actual_ac_state"] == "off")
+        and cfg["enforce_off_time_protection"]
+        and ev["effective_off_time"] <= _float(cfg["min_off_time_minutes"])
+        and mode != "Pre-conditioning"
+    ):
+        return False, f"OFFTIME_PROTECTION (effective_off_time={ev['effective_off_time']}min)"
+    if mode == "Manual":
+        active = ev["extreme_temp_detected"] is not False and (
+            ev["room_presence_detected"] or ev["approaching_home"]
+        )
+        return active, "MANUAL_MODE"
+    if mode == "Smart":
+        return ev["smart_presence_active"], "SMART_MODE"
+    active = ev["anyone_home"] or ev["approaching_home"]
+    return active, "AUTO_MODE"
+
+
+# ---------------------------------------------------------------------------
+# Dispatch decision (the blueprint's main choose block)
+# ---------------------------------------------------------------------------
+
+
+def _continue_margin(ev: Evaluation) -> float:
+    return max(_float(ev.config["hysteresis_tolerance"], 0.3) / 2, 0.1)
+
+
+def _active_decision(ev: Evaluation, branch: str, hvac: str, last_mode: str, reason: str) -> Decision:
+    return Decision(
+        branch=branch,
+        reason=reason,
+        hvac_mode=select_hvac_mode(ev, hvac),
+        temperature=ev["adjusted_target"],
+        fan_mode=ev["new_fan_mode"],
+        swing_mode=ev["validated_swing_mode"],
+        last_mode=last_mode,
+    )
+
+
+def _off_decision(branch: str, last_mode: str, reason: str) -> Decision:
+    return Decision(branch=branch, reason=reason, hvac_mode="off", last_mode=last_mode)
+
+
+def decide(ev: Evaluation) -> Decision:
+    """Walk the dispatch branches in blueprint order and return the first match."""
+    cfg = ev.config
+    mode = ev["control_mode"]
+
+    if mode == "Override":
+        hours = _float(cfg["override_timeout"])
+        minutes = ev.minutes_since(ev.helper_state("helper_override_time"))
+        if hours > 0 and minutes is not None and minutes >= hours * 60:
+            before = ev.helper_state("helper_mode_before_override")
+            return_to = before if before in ("Auto", "Smart") else cfg["default_control_mode"]
+            return Decision(
+                "override_timeout", f"Override expired after {hours:g}h", control_mode=return_to
+            )
+        return Decision("override", "Override mode active - respecting user's manual changes")
+
+    if mode == "Manual":
+        hours = cfg.manual_timeout_hours
+        if (
+            hours > 0
+            and cfg["default_control_mode"] != "Manual"
+            and ev["time_since_change"] >= hours * 60
+        ):
+            return Decision("manual_timeout", f"Manual mode expired after {hours}h", control_mode="Smart")
+        return Decision("manual", "Manual mode active - user has complete control")
+
+    if ev["any_ac_unavailable"]:
+        return Decision("unavailable", "Climate entity unavailable")
+
+    if ev["manual_override_detection"]:
+        return Decision("override_detected", "Manual change detected", control_mode="Override")
+
+    should_activate_ = ev["should_activate"]
+    current = ev["current_temp"]
+    target = ev["target_temp"]
+    overshoot = cfg.target_overshoot
+    comfort_min, comfort_max = ev["comfort_min_temp"], ev["comfort_max_temp"]
+    last = ev["last_mode"]
+    cooling_enabled = cfg["enable_cooling_mode"]
+    heating_enabled = cfg["enable_heating_mode"]
+    runtime_min = _float(cfg["min_runtime_minutes"])
+    margin = _continue_margin(ev)
+
+    # Continue cooling towards the overshoot target
+    if (
+        should_activate_
+        and last in COOLING_MODES
+        and current <= comfort_max
+        and target - overshoot < current < comfort_max - margin
+        and cooling_enabled
+    ):
+        return _active_decision(ev, "continue_cooling", "cool", last, "Continuing to overshoot target")
+
+    # AC running with no reason to be on
+    if should_activate_ and ev["actual_ac_state"] == "on" and last not in (
+        "comfort_fan_only", "bed_eco_fan_only", "stability_fan_only", "ceiling_fan_cooling"
+    ):
+        should_cool = ev["cooling_with_hysteresis"] and cooling_enabled
+        should_heat = ev["heating_with_hysteresis"] and heating_enabled
+        in_continue = last in ("cooling", "heating", *BED_MODES[:2]) and target - overshoot < current <= comfort_max
+        in_bed = cfg["bed_comfort_mode"] != "off" and ev["bed_occupied"]
+        if not (should_cool or should_heat or in_continue or in_bed):
+            if cfg["comfort_zone_action"] == "fan_only":
+                return Decision(
+                    "sanity_fan_only",
+                    "AC running but no activation conditions met",
+                    hvac_mode=select_hvac_mode(ev, "fan_only"),
+                    temperature=target,
+                    fan_mode=ev["selected_fan_only_fan_mode"],
+                    last_mode="comfort_fan_only",
+                )
+            return _off_decision("sanity_off", "off", "AC running but no activation conditions met")
+
+    # Start cooling
+    cooling_protected = last in (
+        "cooling", "cooling_low", "cooling_medium", "cooling_high", *BED_MODES,
+        "comfort_fan_only", "stability_fan_only",
+    )
+    if (
+        should_activate_
+        and not (cfg["enable_pre_conditioning"] and ev["approaching_home"] and not ev["anyone_home"])
+        and current > comfort_max
+        and cooling_enabled
+        and (not cooling_protected or ev["time_in_current_mode"] >= runtime_min)
+    ):
+        return _active_decision(ev, "cooling", "cool", "cooling", f"{current}°C above {comfort_max}°C")
+
+    # Continue heating towards the overshoot target
+    if (
+        should_activate_
+        and last == "heating"
+        and current >= comfort_min
+        and comfort_min + margin < current < target + overshoot
+        and heating_enabled
+    ):
+        return _active_decision(ev, "continue_heating", "heat", last, "Continuing to overshoot target")
+
+    # Start heating
+    heating_protected = last in (
+        "heating", "heating_low", "heating_medium", "heating_high", *BED_MODES,
+        "comfort_fan_only", "stability_fan_only",
+    )
+    if (
+        should_activate_
+        and current < comfort_min
+        and heating_enabled
+        and (not heating_protected or ev["time_in_current_mode"] >= runtime_min)
+    ):
+        return _active_decision(ev, "heating", "heat", "heating", f"{current}°C below {comfort_min}°C")
+
+    # Comfort zone reached
+    if should_activate_ and (last in ("cooling", "heating", *BED_MODES[:2]) or ev["actual_ac_state"] == "on"):
+        overshoot_reached = True
+        if overshoot > 0 and last == "cooling":
+            overshoot_reached = current <= target - overshoot
+        elif overshoot > 0 and last == "heating":
+            overshoot_reached = current >= target + overshoot
+        if (
+            comfort_min <= current <= comfort_max
+            and overshoot_reached
+            and ev["time_since_change"] > runtime_min
+            and not ev["bed_occupied"]
+        ):
+            action = cfg["comfort_zone_action"]
+            if action == "fan_only":
+                return Decision(
+                    "comfort_fan_only",
+                    f"Comfort zone reached at {current}°C",
+                    hvac_mode=select_hvac_mode(ev, "fan_only"),
+                    temperature=target,
+                    fan_mode=ev["selected_fan_only_fan_mode"],
+                    last_mode="comfort_fan_only",
+                )
+            if action == "eco":
+                return _eco_decision(ev, "comfort_eco", "eco", f"Comfort zone reached at {current}°C")
+            return _off_decision("comfort_off", "off", f"Comfort zone reached at {current}°C")
+
+    # Smart mode: room empty but someone is home
+    if (
+        mode == "Smart"
+        and not ev["bed_occupied"]
+        and not ev["room_presence_detected"]
+        and ev["minutes_since_presence"] >= _float(cfg["presence_timeout_minutes"])
+        and (ev["proximity_zone"] == "home" or ev["anyone_home"])
+        and (
+            last in ("ceiling_fan_cooling", *OFF_LIKE_MODES)
+            or ev["time_in_current_mode"] >= runtime_min
+        )
+    ):
+        return _off_decision("smart_off", "smart_off", f"Room empty for {ev['minutes_since_presence']} min")
+
+    # Nobody home
+    if cfg["enable_away_mode"] and not should_activate_ and ev["time_since_change"] >= runtime_min:
+        if cfg["away_mode_action"] == "eco":
+            return _eco_decision(ev, "away_eco", "eco", ev["should_activate_reason"])
+        return _off_decision("away_off", "off", ev["should_activate_reason"])
+
+    return Decision("idle", ev["should_activate_reason"])
+
+
+def _eco_decision(ev: Evaluation, branch: str, last_mode: str, reason: str) -> Decision:
+    """ECO setpoint: cooling target + offset when hot, heating target - offset otherwise."""
+    offset = _float(ev.config["eco_mode_setpoint_offset"])
+    hot = ev["current_temp"] > ev["comfort_max_temp"]
+    return Decision(
+        branch=branch,
+        reason=reason,
+        hvac_mode=select_hvac_mode(ev, "cool" if hot else "heat"),
+        temperature=(ev["cooling_target_temp"] + offset) if hot else (ev["heating_target_temp"] - offset),
+        fan_mode=ev["new_fan_mode"],
+        swing_mode=ev["validated_swing_mode"],
+        last_mode=last_mode,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Gatekeeper: turn a decision into the minimal set of climate commands
+# ---------------------------------------------------------------------------
+
+
+def plan_commands(
+    ev: Evaluation, decision: Decision, gatekeeper: Gatekeeper | None = None
+) -> list[Command]:
+    """Compare the decision's target state with each climate entity's state.
+
+    Fields are compared one by one; an entity that was sent this exact target
+    moments ago is skipped while the command is still in flight.
+    """
+    if not decision.commands_climate:
+        return []
+    target = decision.expected_state
+    commands: list[Command] = []
+    for entity_id in ev.config.climate_entities:
+        if gatekeeper is not None and gatekeeper.in_flight(entity_id, target, ev.now):
+            continue
+        actual = ExpectedState.from_state(ev.state_obj(entity_id))
+        if target.hvac_mode == "off":
+            if actual.hvac_mode != "off":
+                commands.append(Command(entity_id, "turn_off"))
+            continue
+        changed = target.diff(actual)
+        supports_target = _int(ev.attr(entity_id, "supported_features", 0)) & SUPPORT_TARGET_TEMPERATURE
+        if supports_target and ("hvac_mode" in changed or "temperature" in changed):
+            # One call sets both; climate.set_temperature accepts hvac_mode
+            data: dict[str, Any] = {"hvac_mode": target.hvac_mode}
+            if decision.temperature is not None:
+                data["temperature"] = decision.temperature
+            commands.append(Command(entity_id, "set_temperature", data))
+        elif "hvac_mode" in changed:
+            commands.append(Command(entity_id, "set_hvac_mode", {"hvac_mode": target.hvac_mode}))
+        if "fan_mode" in changed:
+            commands.append(Command(entity_id, "set_fan_mode", {"fan_mode": target.fan_mode}))
+        if "swing_mode" in changed and ev.attr(entity_id, "swing_modes"):
+            commands.append(Command(entity_id, "set_swing_mode", {"swing_mode": target.swing_mode}))
+    return commands
+
+
+def helper_updates(ev: Evaluation, decision: Decision) -> dict[str, Any]:
+    """Return the helper writes for a run, keyed by blueprint helper input name."""
+    cfg = ev.config
+    updates: dict[str, Any] = {}
+    # Effectiveness/trend are recomputed when control resumes, so paused runs
+    # only keep temp_history fresh for the next rate calculation
+    if cfg["enable_dynamic_adaptation"] and ev["control_mode"] not in PAUSED_MODE_VARIABLES:
+        updates["helper_effectiveness_score"] = ev["current_effectiveness"]
+        updates["helper_trend_direction"] = ev["calculated_trend"]
+    if ev.trigger.id == "periodic_check":
+        updates["helper_temp_history"] = ev["current_temp"]
+
+    if decision.control_mode == "Override":
+        updates["helper_mode_before_override"] = ev["control_mode"]
+        updates["helper_override_active"] = True
+        updates["helper_override_time"] = ev.now
+        updates["helper_override_source"] = "ac"
+    if decision.branch == "override_timeout":
+        # Accept what the user left the AC at, so resuming isn't read as a new override
+        updates["helper_last_change"] = ev.now
+        updates["helper_override_active"] = False
+        updates["helper_override_source"] = "none"
+        if ev.primary is not None:
+            updates["helper_expected_temp"] = _float(ev.attr(ev.primary, "temperature"), 22)
+            updates["helper_expected_hvac"] = ev.state(ev.primary)
+            updates["helper_expected_fan"] = ev.attr(ev.primary, "fan_mode") or "unknown"
+    if decision.control_mode:
+        updates["helper_control_mode"] = decision.control_mode
+
+    if decision.last_mode is not None:
+        updates["helper_last_mode"] = decision.last_mode
+        updates["helper_last_change"] = ev.now
+        if decision.last_mode != ev["last_mode"]:
+            updates["helper_mode_start_time"] = ev.now
+            if decision.last_mode in ("cooling", "heating"):
+                updates["helper_last_transition"] = decision.last_mode
+                updates["helper_temp_history"] = ev["current_temp"]
+    if decision.hvac_mode is not None:
+        updates["helper_expected_hvac"] = decision.hvac_mode
+        if decision.temperature is not None:
+            updates["helper_expected_temp"] = decision.temperature
+        if decision.fan_mode:
+            updates["helper_expected_fan"] = decision.fan_mode
+        if decision.swing_mode:
+            updates["helper_expected_swing"] = decision.swing_mode
+        target = decision.expected_state
+        updates["helper_last_command"] = target.snapshot()
+        updates["helper_state_checksum"] = target.checksum(
+            ev.attr(ev.primary, "fan_modes", []), ev.attr(ev.primary, "swing_modes", [])
+        )
+        if decision.fan_mode and ev["fan_mode_changed"]:
+            updates["helper_last_fan_change"] = ev.now
+    return {name: value for name, value in updates.items() if cfg.helper(name)}
+
+
+def evaluate(
+    config: RoomConfig,
+    states: StateSource,
+    now: datetime,
+    trigger: Trigger,
+    cache: VariableCache | None = None,
+    lazy: bool = False,
+    shared: dict[tuple[Any, ...], Any] | None = None,
+    history: TemperatureHistory | None = None,
+    gatekeeper: Gatekeeper | None = None,
+    profile: TemplateProfile | None = None,
+    presence: PresenceTracker | None = None,
+    temperature: TemperatureAggregator | None = None,
+) -> tuple[Evaluation, Decision]:
+    """Run the full pipeline for one trigger.
+
+    By default every variable is computed, like the blueprint's variables
+    step. With ``lazy=True`` only what the matched dispatch path reads is
+    computed: in Override/Manual that is PAUSED_MODE_VARIABLES, otherwise
+    variables are computed on first use by decide() and the gatekeeper.
+    """
+    ev = Evaluation(
+        config,
+        states,
+        now,
+        trigger,
+        cache,
+        shared,
+        history,
+        gatekeeper,
+        profile,
+        presence,
+        temperature,
+    )
+    if lazy:
+        for name in PAUSED_MODE_VARIABLES.get(ev["control_mode"], ()):
+            ev[name]
+    else:
+        ev.compute_all()
+    return ev, decide(ev)
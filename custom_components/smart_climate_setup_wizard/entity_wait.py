@@ -0,0 +1,64 @@
+"""Waiting for entities created by the wizard.
+
+After the wizard writes a helpers package or an automation it reloads the
+matching integrations and has to wait until the new entities exist.
+async_wait_for_entities returns as soon as every expected entity has a
+state, driven by state_changed and entity registry events, instead of
+sleeping for a fixed time and polling.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable
+import logging
+
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.entity_registry import EVENT_ENTITY_REGISTRY_UPDATED
+from homeassistant.helpers.event import async_track_state_change_event
+
+_LOGGER = logging.getLogger(__name__)
+
+# Package helpers can take a while on slow hardware (input_select with
+# many options); the old fixed sleeps added up to this much
+HELPER_WAIT_TIMEOUT = 28
+AUTOMATION_WAIT_TIMEOUT = 10
+
+
+async def async_reload_domains(hass: HomeAssistant, domains: Iterable[str]) -> None:
+    """Reload independent integrations concurrently."""
+    await asyncio.gather(
+        *(hass.services.async_call(domain, "reload", blocking=True) for domain in domains)
+    )
+
+
+async def async_wait_for_entities(
+    hass: HomeAssistant, entity_ids: Iterable[str], timeout: float
+) -> set[str]:
+    """Wait until every entity has a state; return the ones still missing."""
+    missing = {entity_id for entity_id in entity_ids if hass.states.get(entity_id) is None}
+    if not missing:
+        return missing
+
+    done: asyncio.Future[None] = hass.loop.create_future()
+
+    @callback
+    def _async_check(event: Event) -> None:
+        entity_id = event.data.get("entity_id")
+        if entity_id in missing and hass.states.get(entity_id) is not None:
+            missing.discard(entity_id)
+            if not missing and not done.done():
+                done.set_result(None)
+
+    unsubs = [
+        async_track_state_change_event(hass, list(missing), _async_check),
+        hass.bus.async_listen(EVENT_ENTITY_REGISTRY_UPDATED, _async_check),
+    ]
+    try:
+        async with asyncio.timeout(timeout):
+            await done
+    except TimeoutError:
+        _LOGGER.debug("Timed out after %ss waiting for %s", timeout, sorted(missing))
+    finally:
+        for unsub in unsubs:
+            unsub()
+    return missing
@@ -0,0 +1,270 @@
+"""Structured per-room event log.
+
+The blueprint's periodic ``[EVENT]`` line formats about twenty values into a
+long string for ``system_log.write`` on every run, which fills the system
+log and cannot be queried. Rooms set up by the wizard instead fire a
+``smart_climate_event`` with the raw values, and native-engine rooms record
+their decisions directly. Both end up here as EventRecords in a bounded ring
+buffer per room, optionally appended to a JSONL file, and are only turned
+into text when someone reads them (the ``get_events`` action).
+"""
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+import json
+import logging
+import os
+from typing import Any, Callable, Iterable, Mapping
+
+from homeassistant.const import EVENT_HOMEASSISTANT_FINAL_WRITE
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
+
+_LOGGER = logging.getLogger(__name__)
+
+EVENT_SMART_CLIMATE = "smart_climate_event"
+# Records kept in memory per room (a day of 5-minute checks, with room to spare)
+EVENT_LOG_SIZE = 500
+EVENT_LOG_DIR = "smart_climate_events"
+# Appends are batched; the file is rotated once when it grows past this
+JSONL_FLUSH_DELAY = 30
+JSONL_MAX_BYTES = 1_000_000
+
+# Modes in which the periodic status is only logged when the mode changed
+IDLE_MODES = frozenset(
+    {"off", "smart_off", "away_off", "auto_off_off", "stability_off", "window_off"}
+)
+ACTIVE_MODES = frozenset({"cooling", "heating", "bed_comfort_eco", "bed_comfort_quiet"})
+
+
+def _title(mode: Any) -> str:
+    return str(mode).replace("_", " ").title()
+
+
+@dataclass(frozen=True)
+class EventRecord:
+    """One logged event; ``data`` holds the raw values, never formatted text."""
+
+    time: datetime
+    room: str
+    kind: str
+    trigger: str | None = None
+    data: Mapping[str, Any] = field(default_factory=dict)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the record as JSON-compatible values."""
+        return {
+            "time": self.time.isoformat(),
+            "room": self.room,
+            "kind": self.kind,
+            "trigger": self.trigger,
+            "data": dict(self.data),
+        }
+
+    @classmethod
+    def from_dict(cls, value: Mapping[str, Any]) -> EventRecord | None:
+        """Rebuild a record written by as_dict (None if it is malformed)."""
+        time = dt_util.parse_datetime(str(value.get("time", "")))
+        if time is None or not value.get("room") or not value.get("kind"):
+            return None
+        return cls(time, value["room"], value["kind"], value.get("trigger"), value.get("data") or {})
+
+    def format(self) -> str:
+        """Return the record as the blueprint's ``[EVENT]`` line."""
+        data = self.data
+        mode = data.get("mode", "unknown")
+        changed = bool(data.get("changed"))
+        active = data.get("active", mode in ACTIVE_MODES)
+        parts = [
+            f"[EVENT] {self.room}{' ★' if changed else ''}",
+            f"{_title(mode)} ({data.get('minutes_in_mode', 0)}min)"
+            + (f", was {_title(data.get('previous_mode'))}" if changed else ""),
+        ]
+
+        room = f"Room {data.get('current_temp')}°C, {data.get('rate', 0)}°C/min"
+        if data.get("outside") is not None:
+            room += f", outside {data['outside']}°C"
+        parts.append(room)
+
+        target = f"Target {data.get('target_temp')}°C"
+        if active:
+            target += f", {data.get('distance', 0)}°C away"
+            adjusted = data.get("adjusted_target")
+            if adjusted is not None and adjusted != data.get("target_temp"):
+                target += f" (esc L{data.get('escalation_level', 0)} → {adjusted}°C)"
+            elif data.get("deescalation_level"):
+                target += f" (de-esc L{data['deescalation_level']})"
+        parts.append(target)
+
+        ac = f"AC: {data.get('hvac', 'unknown')}"
+        if data.get("setpoint") is not None:
+            ac += f" @ {data['setpoint']}°C"
+        ac += f", Fan {data.get('fan', 'N/A')}"
+        if active and data.get("effectiveness") is not None:
+            ac += f", {data['effectiveness']}% eff"
+            if data.get("stalling"):
+                ac += ", STALLING"
+        parts.append(ac)
+
+        control = str(data.get("control_mode", ""))
+        if control == "Smart":
+            control += ", present" if data.get("presence") else ", no presence"
+            if data.get("should_activate") is False:
+                control += ", INACTIVE"
+        if data.get("bed"):
+            control += ", in bed"
+        parts.append(control)
+
+        if data.get("ceiling_fan") is not None:
+            parts.append(f"Ceiling fan {data['ceiling_fan']}")
+        if data.get("override"):
+            parts.append("⚠️ OVERRIDE DETECTED")
+        if data.get("branch"):
+            parts.append(f"{data['branch']}: {data.get('reason', '')}".rstrip(": "))
+        parts.append(f"trigger={self.trigger}")
+        return " | ".join(parts)
+
+
+def should_log_status(mode: str | None, previous_mode: str | None) -> bool:
+    """Return True if a periodic status is worth logging (blueprint rule)."""
+    return mode not in IDLE_MODES or mode != previous_mode
+
+
+def _append_lines(path: str, lines: list[str]) -> None:
+    """Append lines to a JSONL file, rotating it once it gets too large."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        if os.path.getsize(path) > JSONL_MAX_BYTES:
+            os.replace(path, f"{path}.1")
+    except FileNotFoundError:
+        pass
+    with open(path, "a", encoding="utf-8") as file:
+        file.writelines(lines)
+
+
+def _read_tail(path: str, limit: int) -> list[dict[str, Any]]:
+    """Return the last ``limit`` parseable records of a JSONL file."""
+    lines: deque[str] = deque(maxlen=limit)
+    try:
+        with open(path, encoding="utf-8") as file:
+            lines.extend(file)
+    except FileNotFoundError:
+        return []
+    records = []
+    for line in lines:
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue
+    return records
+
+
+class EventLog:
+    """Ring buffer of one room's events, optionally persisted as JSONL."""
+
+    def __init__(
+        self, hass: HomeAssistant, room_name: str, key: str, persist: bool = False
+    ) -> None:
+        """Initialize the log; ``key`` names the JSONL file."""
+        self.hass = hass
+        self.room_name = room_name
+        self.path = hass.config.path(EVENT_LOG_DIR, f"{key}.jsonl") if persist else None
+        self._records: deque[EventRecord] = deque(maxlen=EVENT_LOG_SIZE)
+        self._pending: list[str] = []
+        self._unsub_flush: Callable[[], None] | None = None
+        self._unsub_listen: Callable[[], None] | None = None
+        self._unsub_final_write: Callable[[], None] | None = None
+
+    def __len__(self) -> int:
+        """Return the number of records in memory."""
+        return len(self._records)
+
+    async def async_start(self) -> None:
+        """Load the persisted tail and listen for the room's blueprint events."""
+        if self.path is not None:
+            for value in await self.hass.async_add_executor_job(
+                _read_tail, self.path, EVENT_LOG_SIZE
+            ):
+                if (record := EventRecord.from_dict(value)) is not None:
+                    self._records.append(record)
+            # Entries are not unloaded on shutdown; write the batch out anyway
+            self._unsub_final_write = self.hass.bus.async_listen_once(
+                EVENT_HOMEASSISTANT_FINAL_WRITE, self._async_final_write
+            )
+        self._unsub_listen = self.hass.bus.async_listen(
+            EVENT_SMART_CLIMATE, self._async_event, event_filter=self._is_own_event
+        )
+
+    async def async_stop(self) -> None:
+        """Stop listening and write out pending records."""
+        if self._unsub_listen is not None:
+            self._unsub_listen()
+            self._unsub_listen = None
+        if self._unsub_final_write is not None:
+            self._unsub_final_write()
+            self._unsub_final_write = None
+        await self._async_flush()
+
+    async def _async_final_write(self, _event: Event) -> None:
+        self._unsub_final_write = None
+        await self._async_flush()
+
+    @callback
+    def _is_own_event(self, event_data: Any) -> bool:
+        return event_data.get("room") == self.room_name
+
+    @callback
+    def _async_event(self, event: Event) -> None:
+        data = dict(event.data)
+        data.pop("room", None)
+        kind = data.pop("kind", None) or "status"
+        trigger = data.pop("trigger", None)
+        self.async_add(EventRecord(event.time_fired, self.room_name, kind, trigger, data))
+
+    @callback
+    def async_add(self, record: EventRecord) -> None:
+        """Add a record; persisting it, if enabled, is batched."""
+        self._records.append(record)
+        if self.path is None:
+            return
+        self._pending.append(json.dumps(record.as_dict(), default=str) + "\n")
+        if self._unsub_flush is None:
+            self._unsub_flush = async_call_later(
+                self.hass, JSONL_FLUSH_DELAY, self._async_scheduled_flush
+            )
+
+    async def _async_scheduled_flush(self, _now: datetime) -> None:
+        self._unsub_flush = None
+        await self._async_flush()
+
+    async def _async_flush(self) -> None:
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+        if not self._pending or self.path is None:
+            return
+        lines, self._pending = self._pending, []
+        try:
+            await self.hass.async_add_executor_job(_append_lines, self.path, lines)
+        except OSError as err:
+            _LOGGER.warning("Could not write %s: %s", self.path, err)
+
+    def query(
+        self,
+        *,
+        since: datetime | None = None,
+        kinds: Iterable[str] | None = None,
+        limit: int | None = None,
+    ) -> list[EventRecord]:
+        """Return matching records, oldest first, at most the ``limit`` newest."""
+        wanted = set(kinds) if kinds else None
+        records = [
+            record
+            for record in self._records
+            if (since is None or record.time >= since)
+            and (wanted is None or record.kind in wanted)
+        ]
+        return records[-limit:] if limit else records
@@ -0,0 +1,144 @@
+"""Structured expected-state tracking for the command gatekeeper.
+
+The blueprint keeps the last command as a ``hvac=..,temp=..,fan=..,swing=..``
+string, re-parses it on every run, and compares states through a numeric
+checksum (``temp*1000 + len(fan) + len(swing) + hvac_code``) in which e.g.
+``high``/``auto`` or ``Vertical``/``Horizontal`` collide. The native engine
+instead keeps one ExpectedState record per climate entity and compares it
+field by field.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import Any, Sequence
+
+HVAC_CODES = {
+    "off": 0,
+    "cool": 1,
+    "heat": 2,
+    "auto": 3,
+    "dry": 4,
+    "fan_only": 5,
+    "heat_cool": 6,
+}
+
+# A command is considered in flight (not yet reflected in the entity state)
+# for this long; matches the blueprint's override_command_grace
+COMMAND_SETTLE_SECONDS = 50
+
+
+def _temperature(value: Any) -> float | None:
+    try:
+        return round(float(value), 1)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(frozen=True)
+class ExpectedState:
+    """Target (or observed) state of one climate entity.
+
+    Fields left as None are "don't care" when diffing.
+    """
+
+    hvac_mode: str | None = None
+    temperature: float | None = None
+    fan_mode: str | None = None
+    swing_mode: str | None = None
+
+    @classmethod
+    def from_state(cls, state: Any) -> ExpectedState:
+        """Build the observed state of a climate entity."""
+        if state is None:
+            return cls()
+        attributes = state.attributes
+        return cls(
+            hvac_mode=state.state,
+            temperature=_temperature(attributes.get("temperature")),
+            fan_mode=attributes.get("fan_mode"),
+            swing_mode=attributes.get("swing_mode"),
+        )
+
+    @classmethod
+    def from_snapshot(cls, snapshot: str | None) -> ExpectedState | None:
+        """Parse a blueprint ``helper_last_command`` snapshot string."""
+        if not snapshot or "=" not in snapshot:
+            return None
+        values: dict[str, str] = {}
+        for part in snapshot.split(","):
+            key, _, value = part.partition("=")
+            values[key.strip()] = value.strip()
+
+        def field_value(key: str) -> str | None:
+            value = values.get(key)
+            return None if value in (None, "", "none", "None", "unknown") else value
+
+        return cls(
+            hvac_mode=field_value("hvac"),
+            temperature=_temperature(values.get("temp")),
+            fan_mode=field_value("fan"),
+            swing_mode=field_value("swing"),
+        )
+
+    def snapshot(self) -> str:
+        """Return the blueprint-compatible ``helper_last_command`` string."""
+        return (
+            f"hvac={self.hvac_mode},temp={self.temperature},"
+            f"fan={self.fan_mode},swing={self.swing_mode}"
+        )
+
+    def checksum(self, fan_modes: Sequence[str], swing_modes: Sequence[str]) -> int:
+        """Return a numeric fingerprint for the input_number checksum helper.
+
+        Fan and swing modes are encoded by their index in the entity's mode
+        lists instead of their string length, so distinct states of the same
+        entity never share a checksum.
+        """
+
+        def index(value: str | None, options: Sequence[str]) -> int:
+            if value is None:
+                return 0
+            try:
+                return min(list(options).index(value) + 1, 98)
+            except ValueError:
+                return 99
+
+        temperature = int(round((self.temperature or 0) * 10)) % 1000
+        hvac = HVAC_CODES.get(self.hvac_mode or "", 99)
+        fan = index(self.fan_mode, fan_modes)
+        swing = index(self.swing_mode, swing_modes)
+        return ((temperature * 100 + hvac) * 100 + fan) * 100 + swing
+
+    def diff(self, actual: ExpectedState) -> tuple[str, ...]:
+        """Return the names of the fields where actual differs from this target."""
+        return tuple(
+            item.name
+            for item in fields(self)
+            if getattr(self, item.name) is not None
+            and getattr(self, item.name) != getattr(actual, item.name)
+        )
+
+
+class Gatekeeper:
+    """Last commanded state per climate entity."""
+
+    def __init__(self) -> None:
+        """Initialize with no expectations."""
+        self._expected: dict[str, tuple[ExpectedState, datetime | None]] = {}
+
+    def expected(self, entity_id: str) -> ExpectedState | None:
+        """Return the last commanded state of an entity."""
+        record = self._expected.get(entity_id)
+        return None if record is None else record[0]
+
+    def record(self, entity_id: str, state: ExpectedState, when: datetime | None) -> None:
+        """Remember a commanded state (``when`` is None for restored records)."""
+        self._expected[entity_id] = (state, when)
+
+    def in_flight(self, entity_id: str, state: ExpectedState, now: datetime) -> bool:
+        """Return True if this exact state was just commanded and may not be reported yet."""
+        record = self._expected.get(entity_id)
+        if record is None or record[1] is None or record[0] != state:
+            return False
+        return (now - record[1]).total_seconds() < COMMAND_SETTLE_SECONDS
@@ -0,0 +1,85 @@
+"""Per-room temperature history for rate estimation.
+
+The blueprint estimates the rate of change from two points (the
+``temp_history`` helper and the current reading), so one noisy sample can
+flip the trend and trigger stall or wrong-direction escalation. The native
+engine keeps a small ring buffer of periodic readings per room and uses the
+least-squares slope over it instead.
+"""
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime
+from typing import Any, Iterable
+
+# Samples kept per room (6 x 5-minute checks = 30 minute window)
+DEFAULT_HISTORY_SIZE = 6
+# Fewer points than this fall back to the blueprint's two-point rate
+MIN_REGRESSION_SAMPLES = 3
+# Readings closer together than this replace the previous sample
+MIN_SAMPLE_SPACING = 30
+
+
+class TemperatureHistory:
+    """Fixed-size ring buffer of (timestamp, temperature) samples."""
+
+    def __init__(self, size: int = DEFAULT_HISTORY_SIZE) -> None:
+        """Initialize an empty history."""
+        self._samples: deque[tuple[float, float]] = deque(maxlen=max(size, 2))
+
+    def __len__(self) -> int:
+        """Return the number of samples."""
+        return len(self._samples)
+
+    def add(self, when: datetime, temperature: float) -> None:
+        """Record a reading."""
+        timestamp = when.timestamp()
+        if self._samples and timestamp - self._samples[-1][0] < MIN_SAMPLE_SPACING:
+            self._samples.pop()
+        self._samples.append((timestamp, float(temperature)))
+
+    def slope(
+        self, now: datetime, current: float, max_age_minutes: float
+    ) -> float | None:
+        """Return the least-squares slope in degrees per minute.
+
+        The current reading is included as the newest point. Samples older
+        than ``max_age_minutes`` are ignored (e.g. from before the AC was
+        off for hours). Returns None when there are too few points.
+        """
+        now_ts = now.timestamp()
+        cutoff = now_ts - max_age_minutes * 60
+        points = [
+            (timestamp, temperature)
+            for timestamp, temperature in self._samples
+            if cutoff <= timestamp < now_ts - MIN_SAMPLE_SPACING
+        ]
+        points.append((now_ts, float(current)))
+        count = len(points)
+        if count < MIN_REGRESSION_SAMPLES:
+            return None
+
+        # Minutes relative to now keeps the sums small and well conditioned
+        xs = [(timestamp - now_ts) / 60 for timestamp, _ in points]
+        ys = [temperature for _, temperature in points]
+        mean_x = sum(xs) / count
+        mean_y = sum(ys) / count
+        sxx = sum((x - mean_x) ** 2 for x in xs)
+        if sxx == 0:
+            return None
+        sxy = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+        return sxy / sxx
+
+    def as_list(self) -> list[list[float]]:
+        """Return the samples in a JSON-serializable form."""
+        return [[timestamp, temperature] for timestamp, temperature in self._samples]
+
+    def load(self, samples: Iterable[Any]) -> None:
+        """Replace the samples with previously saved ones."""
+        self._samples.clear()
+        for sample in samples:
+            try:
+                timestamp, temperature = float(sample[0]), float(sample[1])
+            except (TypeError, ValueError, IndexError):
+                continue
+            self._samples.append((timestamp, temperature))
@@ -0,0 +1,193 @@
+"""Per-room runtime metrics.
+
+RoomMetrics keeps plain in-memory counters and two small bounded deques;
+recording is a few integer updates so it can sit on the hot path of every
+run. Percentiles and hourly rates are only computed when the diagnostic
+sensors poll.
+
+Native-engine rooms record into it from the controller. For blueprint
+rooms, AutomationMonitor derives the same numbers from the room's
+automation: ``automation_triggered`` events (runs), the automation's
+``current`` attribute (run end, and runs killed by ``mode: restart``) and
+``call_service`` events carrying the run's context (climate commands and
+helper writes).
+"""
+from __future__ import annotations
+
+from collections import deque
+import time
+from typing import Any, Callable
+
+from homeassistant.const import ATTR_ENTITY_ID, EVENT_CALL_SERVICE
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.event import async_track_state_change_event
+
+from .blueprint_inputs import automation_unique_id
+
+# Run durations kept for the percentiles
+DURATION_SAMPLES = 200
+RATE_WINDOW = 3600
+# automation.EVENT_AUTOMATION_TRIGGERED; not imported to keep the automation
+# integration out of this module's imports
+EVENT_AUTOMATION_TRIGGERED = "automation_triggered"
+HELPER_DOMAINS = frozenset(
+    {"input_text", "input_number", "input_datetime", "input_select", "input_boolean"}
+)
+
+
+class RoomMetrics:
+    """Run, command and helper-write counters for one room."""
+
+    def __init__(self) -> None:
+        """Initialize all counters at zero."""
+        self.runs = 0
+        self.cancelled_runs = 0
+        # Native engine: triggers merged into another trigger's run
+        self.coalesced_triggers = 0
+        # Native engine: temperature updates skipped by deadband/min interval
+        self.gated_triggers = 0
+        self.climate_commands = 0
+        self.suppressed_commands = 0
+        self.helper_writes = 0
+        self._durations: deque[float] = deque(maxlen=DURATION_SAMPLES)
+        self._run_times: deque[float] = deque()
+
+    def record_run(self, duration: float | None = None) -> None:
+        """Count a run; ``duration`` in seconds when it is known."""
+        self.runs += 1
+        now = time.monotonic()
+        self._run_times.append(now)
+        self._prune(now)
+        if duration is not None:
+            self._durations.append(duration)
+
+    def record_duration(self, duration: float) -> None:
+        """Add the duration of a run that was already counted."""
+        self._durations.append(duration)
+
+    def runs_per_hour(self) -> int:
+        """Return the number of runs in the last hour."""
+        self._prune(time.monotonic())
+        return len(self._run_times)
+
+    def _prune(self, now: float) -> None:
+        cutoff = now - RATE_WINDOW
+        while self._run_times and self._run_times[0] < cutoff:
+            self._run_times.popleft()
+
+    def duration_percentile(self, percentile: float) -> float | None:
+        """Return a run duration percentile in milliseconds."""
+        if not self._durations:
+            return None
+        ordered = sorted(self._durations)
+        index = min(len(ordered) - 1, int(len(ordered) * percentile / 100))
+        return round(ordered[index] * 1000, 1)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return every metric (for diagnostics)."""
+        return {
+            "runs": self.runs,
+            "runs_per_hour": self.runs_per_hour(),
+            "run_duration_p50_ms": self.duration_percentile(50),
+            "run_duration_p95_ms": self.duration_percentile(95),
+            "cancelled_runs": self.cancelled_runs,
+            "coalesced_triggers": self.coalesced_triggers,
+            "gated_triggers": self.gated_triggers,
+            "climate_commands": self.climate_commands,
+            "suppressed_commands": self.suppressed_commands,
+            "helper_writes": self.helper_writes,
+        }
+
+
+class AutomationMonitor:
+    """Feed RoomMetrics from a room's blueprint (or compiled) automation."""
+
+    def __init__(self, hass: HomeAssistant, room_name: str, metrics: RoomMetrics) -> None:
+        """Initialize the monitor."""
+        self.hass = hass
+        self.room_name = room_name
+        self.metrics = metrics
+        self.entity_id: str | None = None
+        self._run_started: float | None = None
+        # mode: restart means at most one live run, but its service calls can
+        # still arrive just after the next trigger
+        self._run_contexts: deque[str] = deque(maxlen=4)
+        self._unsubs: list[Callable[[], None]] = []
+
+    @callback
+    def async_start(self) -> None:
+        """Start listening; does nothing if the automation does not exist."""
+        self.entity_id = er.async_get(self.hass).async_get_entity_id(
+            "automation", "automation", automation_unique_id(self.room_name)
+        )
+        if self.entity_id is None:
+            return
+        self._unsubs.append(
+            self.hass.bus.async_listen(
+                EVENT_AUTOMATION_TRIGGERED,
+                self._async_triggered,
+                event_filter=self._is_own_trigger,
+            )
+        )
+        self._unsubs.append(
+            self.hass.bus.async_listen(
+                EVENT_CALL_SERVICE,
+                self._async_service_called,
+                event_filter=self._is_counted_call,
+            )
+        )
+        self._unsubs.append(
+            async_track_state_change_event(
+                self.hass, [self.entity_id], self._async_automation_changed
+            )
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop listening."""
+        while self._unsubs:
+            self._unsubs.pop()()
+
+    @callback
+    def _is_own_trigger(self, event_data: Any) -> bool:
+        return event_data.get(ATTR_ENTITY_ID) == self.entity_id
+
+    @callback
+    def _is_counted_call(self, event_data: Any) -> bool:
+        domain = event_data.get("domain")
+        return domain == "climate" or domain in HELPER_DOMAINS
+
+    def _running(self) -> int:
+        state = self.hass.states.get(self.entity_id)
+        return 0 if state is None else int(state.attributes.get("current") or 0)
+
+    @callback
+    def _async_triggered(self, event: Event) -> None:
+        metrics = self.metrics
+        # The event fires before the new run starts, so a live run here is
+        # the one mode: restart is about to stop
+        if self._run_started is not None and self._running() > 0:
+            metrics.cancelled_runs += 1
+        metrics.record_run()
+        self._run_started = time.monotonic()
+        self._run_contexts.append(event.context.id)
+
+    @callback
+    def _async_service_called(self, event: Event) -> None:
+        if event.context.id not in self._run_contexts:
+            return
+        domain = event.data.get("domain")
+        if domain == "climate":
+            self.metrics.climate_commands += 1
+        elif domain in HELPER_DOMAINS:
+            self.metrics.helper_writes += 1
+
+    @callback
+    def _async_automation_changed(self, event: Event) -> None:
+        new_state = event.data.get("new_state")
+        if new_state is None or self._run_started is None:
+            return
+        if not new_state.attributes.get("current"):
+            self.metrics.record_duration(time.monotonic() - self._run_started)
+            self._run_started = None
@@ -0,0 +1,112 @@
+"""Room presence fusion with precomputed sensor classification.
+
+The blueprint's room_presence_detected loops over every room sensor on every
+run: it classifies each one by entity id prefix, lowercases BLE area states
+and compares them against the adjacent room list. PresenceSensors does the
+classification and builds the set of matching area names once per
+configuration; PresenceTracker keeps per-kind counts of triggered sensors
+that the controller updates from state change events, so the fused result is
+read in constant time.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+BLE = "ble"
+MOTION = "motion"
+OTHER = "other"
+
+MOTION_ON_STATES = frozenset({"on", "detected", "occupied"})
+OTHER_ON_STATES = frozenset({"home", "present", "detected", "occupied"})
+
+
+@dataclass(frozen=True)
+class PresenceCounts:
+    """Triggered sensors per kind, as read by presence_validation_mode."""
+
+    triggered: int = 0
+    ble: int = 0
+    motion: int = 0
+    other: int = 0
+
+
+class PresenceSensors:
+    """Classification of a room's presence sensors, built once per config."""
+
+    def __init__(self, sensors: Iterable[str], room_name: str, adjacent_rooms: Iterable[str]) -> None:
+        """Classify the sensors and resolve the area names counted as present."""
+        room = room_name.lower()
+        self.kinds: dict[str, str] = {}
+        for sensor in sensors:
+            if sensor.startswith("sensor.") and room:
+                self.kinds[sensor] = BLE
+            elif sensor.startswith("binary_sensor."):
+                self.kinds[sensor] = MOTION
+            else:
+                self.kinds[sensor] = OTHER
+        self.total = len(self.kinds)
+        self.ble_count = sum(1 for kind in self.kinds.values() if kind == BLE)
+        self.areas = frozenset([room, *(name.lower() for name in adjacent_rooms)])
+        # BLE area sensors used by the exit grace period
+        self.ble_area_sensors = tuple(
+            sensor for sensor in self.kinds if sensor.startswith("sensor.") and "_ble_area" in sensor
+        )
+
+    def is_triggered(self, entity_id: str, state: str) -> bool:
+        """Return True if a sensor state counts as presence."""
+        kind = self.kinds.get(entity_id)
+        if kind == BLE:
+            return state.lower() in self.areas
+        if kind == MOTION:
+            return state in MOTION_ON_STATES
+        if kind == OTHER:
+            return state == "on" or state.lower() in OTHER_ON_STATES
+        return False
+
+    def count(self, states: Iterable[tuple[str, str]]) -> PresenceCounts:
+        """Count triggered sensors from ``(entity_id, state)`` pairs."""
+        per_kind = {BLE: 0, MOTION: 0, OTHER: 0}
+        for entity_id, state in states:
+            if self.is_triggered(entity_id, state):
+                per_kind[self.kinds[entity_id]] += 1
+        return PresenceCounts(
+            sum(per_kind.values()), per_kind[BLE], per_kind[MOTION], per_kind[OTHER]
+        )
+
+
+class PresenceTracker:
+    """Running counts of triggered presence sensors."""
+
+    def __init__(self, sensors: PresenceSensors) -> None:
+        """Initialize with every sensor untriggered."""
+        self.sensors = sensors
+        self._triggered: dict[str, bool] = dict.fromkeys(sensors.kinds, False)
+        self._per_kind = {BLE: 0, MOTION: 0, OTHER: 0}
+        self.counts = PresenceCounts()
+
+    def __contains__(self, entity_id: str) -> bool:
+        """Return True if the entity is one of the room's presence sensors."""
+        return entity_id in self._triggered
+
+    def sync(self, states: Any) -> None:
+        """Recount from a state source (``get(entity_id)`` returning states)."""
+        for entity_id in self._triggered:
+            state = states.get(entity_id)
+            self.update(entity_id, None if state is None else state.state)
+
+    def update(self, entity_id: str, state: str | None) -> bool:
+        """Apply a sensor's new state; return True if the counts changed."""
+        previous = self._triggered.get(entity_id)
+        if previous is None:
+            return False
+        triggered = self.sensors.is_triggered(entity_id, "unknown" if state is None else state)
+        if triggered == previous:
+            return False
+        self._triggered[entity_id] = triggered
+        per_kind = self._per_kind
+        per_kind[self.sensors.kinds[entity_id]] += 1 if triggered else -1
+        self.counts = PresenceCounts(
+            sum(per_kind.values()), per_kind[BLE], per_kind[MOTION], per_kind[OTHER]
+        )
+        return True
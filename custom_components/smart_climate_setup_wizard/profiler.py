@@ -0,0 +1,114 @@
+"""Render-time profiling for blueprint templates and engine variables.
+
+A TemplateProfile accumulates wall time and render count per name. The
+native engine records one entry per variable it computes (self time,
+excluding the variables it reads). For the blueprint, template_sites()
+lists every template in an automation body in document order, so a
+caller can render each one, with whatever template engine it has, and
+record the time under a readable name:
+
+* ``var:<name>``: a variable (top-level or in a ``variables:`` step)
+* ``cond:<path>``: a template condition (``value_template``)
+* ``log:<path>``: a ``system_log.write`` / ``logbook.log`` message body
+* ``tpl:<path>``: any other templated field (service data, targets, ...)
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Iterator
+
+_TEMPLATE_MARKERS = ("{{", "{%")
+_LOG_SERVICES = ("system_log.write", "logbook.log")
+
+
+@dataclass
+class _Entry:
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+
+class TemplateProfile:
+    """Wall time and render count per template or variable name."""
+
+    def __init__(self) -> None:
+        """Initialize an empty profile."""
+        self._entries: dict[str, _Entry] = {}
+
+    def __len__(self) -> int:
+        """Return the number of profiled names."""
+        return len(self._entries)
+
+    def record(self, name: str, seconds: float) -> None:
+        """Add one render of ``name`` that took ``seconds``."""
+        entry = self._entries.get(name)
+        if entry is None:
+            entry = self._entries[name] = _Entry()
+        entry.count += 1
+        entry.total += seconds
+        if seconds > entry.max:
+            entry.max = seconds
+
+    def clear(self) -> None:
+        """Forget every recorded render."""
+        self._entries.clear()
+
+    def report(self, limit: int | None = None) -> list[dict[str, Any]]:
+        """Return entries sorted by total time, hottest first."""
+        ordered = sorted(self._entries.items(), key=lambda item: item[1].total, reverse=True)
+        return [
+            {
+                "name": name,
+                "count": entry.count,
+                "total_ms": round(entry.total * 1000, 3),
+                "mean_ms": round(entry.total * 1000 / entry.count, 3),
+                "max_ms": round(entry.max * 1000, 3),
+            }
+            for name, entry in ordered[:limit]
+        ]
+
+
+def is_template(value: Any) -> bool:
+    """Return True if a value is a string containing template markup."""
+    return isinstance(value, str) and any(marker in value for marker in _TEMPLATE_MARKERS)
+
+
+def template_sites(body: dict[str, Any]) -> Iterator[tuple[str, Any, str | None]]:
+    """Yield ``(profile name, template, variable name)`` for an automation body.
+
+    Sites are yielded in document order. ``variable name`` is set for
+    variables so the caller can add their value to the context used for
+    the templates that follow; variables are yielded even when their value
+    is not a template. Variables inside branches are yielded too, as if
+    every branch ran.
+    """
+    for name, value in (body.get("variables") or {}).items():
+        yield f"var:{name}", value, name
+    yield from _walk(body.get("condition"), "condition", None)
+    yield from _walk(body.get("action"), "action", None)
+
+
+def _walk(value: Any, path: str, service: str | None) -> Iterator[tuple[str, Any, str | None]]:
+    if isinstance(value, list):
+        for index, item in enumerate(value):
+            yield from _walk(item, f"{path}[{index}]", service)
+        return
+    if not isinstance(value, dict):
+        if is_template(value):
+            yield f"tpl:{path}", value, None
+        return
+
+    step_service = value.get("service") or value.get("action")
+    if not isinstance(step_service, str):
+        step_service = service
+    for key, item in value.items():
+        child = f"{path}.{key}"
+        if key == "variables" and isinstance(item, dict):
+            for name, template in item.items():
+                yield f"var:{name}", template, name
+        elif key == "value_template" and is_template(item):
+            yield f"cond:{path}", item, None
+        elif key == "message" and step_service in _LOG_SERVICES and is_template(item):
+            yield f"log:{path}", item, None
+        else:
+            yield from _walk(item, child, step_service)
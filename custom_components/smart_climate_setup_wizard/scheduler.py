@@ -0,0 +1,107 @@
+"""Staggered periodic ticks for native-engine rooms.
+
+The blueprint wakes every room every minute (``time_pattern minutes: /1``)
+and throws most of those runs away in ``should_proceed``. All rooms fire at
+second :00, so a large install sees a burst of work at the top of every
+minute. The scheduler instead gives each room one timer at its own
+``check_interval_minutes``, offset by a stable per-room stagger, and lets a
+room be woken early (its tick runs now and its timer restarts).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+import hashlib
+import logging
+from typing import Awaitable, Callable
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.util import dt as dt_util
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def stagger_offset(key: str, period_seconds: int) -> int:
+    """Return a stable offset in [0, period_seconds) for a room.
+
+    Derived from a hash of the key so the same room keeps its slot across
+    restarts and between the native engine and compiled automations.
+    """
+    if period_seconds <= 1:
+        return 0
+    digest = hashlib.sha1(key.encode("utf-8")).digest()
+    return int.from_bytes(digest[:4], "big") % period_seconds
+
+
+@dataclass
+class _ScheduledRoom:
+    interval: timedelta
+    action: Callable[[], Awaitable[None]]
+    cancel: CALLBACK_TYPE | None = field(default=None, repr=False)
+
+
+class TickScheduler:
+    """Run each registered room's periodic check on its own staggered timer."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the scheduler."""
+        self.hass = hass
+        self._rooms: dict[str, _ScheduledRoom] = {}
+
+    @callback
+    def async_register(
+        self,
+        key: str,
+        interval: timedelta,
+        action: Callable[[], Awaitable[None]],
+    ) -> CALLBACK_TYPE:
+        """Schedule a room and return a callback that unregisters it."""
+        self.async_unregister(key)
+        room = self._rooms[key] = _ScheduledRoom(interval, action)
+
+        # First tick lands on the room's slot within its interval
+        period = int(interval.total_seconds())
+        now = dt_util.utcnow()
+        epoch_seconds = int(now.timestamp())
+        offset = stagger_offset(key, period)
+        delay = (offset - epoch_seconds) % period if period > 0 else 0
+        self._schedule(key, room, now + timedelta(seconds=delay or period))
+
+        _LOGGER.debug("Scheduled %s every %s (offset %ss)", key, interval, offset)
+
+        @callback
+        def unregister() -> None:
+            self.async_unregister(key)
+
+        return unregister
+
+    @callback
+    def async_unregister(self, key: str) -> None:
+        """Stop a room's timer."""
+        room = self._rooms.pop(key, None)
+        if room is not None and room.cancel is not None:
+            room.cancel()
+
+    @callback
+    def async_wake(self, key: str) -> None:
+        """Run a room's tick now and restart its timer from this point."""
+        room = self._rooms.get(key)
+        if room is None:
+            return
+        if room.cancel is not None:
+            room.cancel()
+        self._schedule(key, room, dt_util.utcnow() + room.interval)
+        self.hass.async_create_task(room.action())
+
+    @callback
+    def _schedule(self, key: str, room: _ScheduledRoom, when: datetime) -> None:
+        @callback
+        def fire(now: datetime) -> None:
+            if self._rooms.get(key) is not room:
+                return
+            # Reschedule from the planned time so ticks don't drift
+            self._schedule(key, room, when + room.interval)
+            self.hass.async_create_task(room.action())
+
+        room.cancel = async_track_point_in_utc_time(self.hass, fire, when)
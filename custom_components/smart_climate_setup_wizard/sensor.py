@@ -0,0 +1,117 @@
+"""Diagnostic sensors with per-room runtime metrics."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any
+
+from homeassistant.components.sensor import (
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN
+from .metrics import RoomMetrics
+
+# Counters are plain attributes, so polling them is essentially free
+SCAN_INTERVAL = timedelta(seconds=60)
+
+
+@dataclass(frozen=True, kw_only=True)
+class MetricSensorDescription(SensorEntityDescription):
+    """Describes a room metric sensor."""
+
+    value_fn: Callable[[RoomMetrics], Any]
+
+
+SENSORS: tuple[MetricSensorDescription, ...] = (
+    MetricSensorDescription(
+        key="run_duration_p50",
+        name="Run Duration p50",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda metrics: metrics.duration_percentile(50),
+    ),
+    MetricSensorDescription(
+        key="run_duration_p95",
+        name="Run Duration p95",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda metrics: metrics.duration_percentile(95),
+    ),
+    MetricSensorDescription(
+        key="runs_per_hour",
+        name="Runs per Hour",
+        native_unit_of_measurement="runs/h",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda metrics: metrics.runs_per_hour(),
+    ),
+    MetricSensorDescription(
+        key="climate_commands",
+        name="Climate Commands",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics: metrics.climate_commands,
+    ),
+    MetricSensorDescription(
+        key="suppressed_commands",
+        name="Suppressed Commands",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics: metrics.suppressed_commands,
+    ),
+    MetricSensorDescription(
+        key="helper_writes",
+        name="Helper Writes",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics: metrics.helper_writes,
+    ),
+    MetricSensorDescription(
+        key="cancelled_runs",
+        name="Cancelled Runs",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics: metrics.cancelled_runs,
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the metric sensors for a room."""
+    metrics: RoomMetrics = hass.data[DOMAIN]["metrics"][entry.entry_id]
+    room_name = entry.data.get("room_name", entry.title)
+    async_add_entities(
+        RoomMetricSensor(entry, room_name, metrics, description) for description in SENSORS
+    )
+
+
+class RoomMetricSensor(SensorEntity):
+    """One runtime metric of a room."""
+
+    entity_description: MetricSensorDescription
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(
+        self,
+        entry: ConfigEntry,
+        room_name: str,
+        metrics: RoomMetrics,
+        description: MetricSensorDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        self.entity_description = description
+        self._metrics = metrics
+        self._attr_name = f"{room_name} Climate {description.name}"
+        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+
+    @property
+    def native_value(self) -> Any:
+        """Return the current value."""
+        return self.entity_description.value_fn(self._metrics)
@@ -0,0 +1,178 @@
+"""In-memory room state with write-behind persistence.
+
+The blueprint keeps its bookkeeping (last mode, last change, expected
+climate state, last command, checksum, ...) in input_* helpers and writes
+several of them on most runs; every write is a state_changed event, a
+recorder row and a frontend push. In storage mode the native engine keeps
+those values in a RoomState instead and saves them to ``.storage`` with a
+delayed write. Values the user sets or looks at, and anything the generated
+scripts, cards and turn-off automation read or write (control mode, last
+mode, override switch, time, source and timeout, expected ceiling fan,
+effectiveness), stay on their helpers.
+
+RoomState also acts as a state source for the engine: it answers with a
+snapshot for the helper entities it holds and defers to Home Assistant for
+everything else, so the engine reads both the same way.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .engine import EntitySnapshot, StateSource
+
+STORAGE_VERSION = 1
+# Batch writes; the values are re-derived within one check interval anyway
+SAVE_DELAY = 30
+
+# Helper inputs only the engine reads or writes
+INTERNAL_HELPERS = frozenset(
+    {
+        "helper_last_change",
+        "helper_temp_history",
+        "helper_trend_direction",
+        "helper_mode_start_time",
+        "helper_temp_stable_since",
+        "helper_last_transition",
+        "helper_expected_temp",
+        "helper_expected_fan",
+        "helper_expected_swing",
+        "helper_expected_hvac",
+        "helper_state_machine",
+        "helper_state_start",
+        "helper_last_command",
+        "helper_state_checksum",
+        "helper_last_fan_change",
+    }
+)
+
+
+def helper_state_value(entity_id: str, value: Any) -> str:
+    """Format a value the way the helper entity would report it as its state."""
+    domain = entity_id.split(".", 1)[0]
+    if domain == "input_boolean":
+        return "on" if value else "off"
+    if isinstance(value, datetime):
+        return dt_util.as_local(value).strftime("%Y-%m-%d %H:%M:%S")
+    if domain == "input_number":
+        return str(float(value))
+    return str(value)
+
+
+class RoomState:
+    """Internal helper values of one room, keyed by helper entity_id."""
+
+    def __init__(
+        self, hass: HomeAssistant, key: str, helpers: dict[str, str]
+    ) -> None:
+        """Initialize from the room's helper_* inputs."""
+        self.hass = hass
+        self.entity_ids = {
+            name: entity_id for name, entity_id in helpers.items() if name in INTERNAL_HELPERS
+        }
+        self._states: dict[str, EntitySnapshot] = {}
+        self._store: Store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.state.{key}")
+        self.writes = 0
+
+    async def async_load(self) -> None:
+        """Load saved values, or the helper's state where that is newer.
+
+        A helper can be written while storage mode is off (helpers mode, the
+        blueprint, a script), so a saved value is only used if it is newer
+        than the helper's own state.
+        """
+        stored = await self._store.async_load()
+        values: dict[str, Any] = (stored or {}).get("values", {})
+        for entity_id in self.entity_ids.values():
+            data = values.get(entity_id)
+            saved_at = dt_util.parse_datetime(data.get("last_updated") or "") if data else None
+            state = self.hass.states.get(entity_id)
+            if state is not None and (
+                data is None or saved_at is None or state.last_updated >= saved_at
+            ):
+                self._states[entity_id] = EntitySnapshot(
+                    entity_id, state.state, last_updated=state.last_updated
+                )
+            elif data is not None:
+                self._states[entity_id] = EntitySnapshot(
+                    entity_id, data["state"], last_updated=saved_at
+                )
+
+    def get(self, entity_id: str) -> Any:
+        """Return the state of an internal helper, or None."""
+        return self._states.get(entity_id)
+
+    def overlay(self, states: StateSource) -> StateSource:
+        """Return a state source that prefers these values over ``states``."""
+        return _Overlay(self, states)
+
+    def update(self, updates: dict[str, Any]) -> dict[str, Any]:
+        """Store the internal values of a helper update; return the rest.
+
+        ``updates`` is keyed by helper input name, as returned by
+        ``engine.helper_updates``.
+        """
+        now = dt_util.utcnow()
+        remaining: dict[str, Any] = {}
+        changed = False
+        for input_name, value in updates.items():
+            entity_id = self.entity_ids.get(input_name)
+            if entity_id is None:
+                remaining[input_name] = value
+                continue
+            state = helper_state_value(entity_id, value)
+            # Like a real helper, writing the value it already has is a no-op
+            current = self._states.get(entity_id)
+            if current is not None and current.state == state:
+                continue
+            self._states[entity_id] = EntitySnapshot(entity_id, state, last_updated=now)
+            self.writes += 1
+            changed = True
+        if changed:
+            self._store.async_delay_save(self._data, SAVE_DELAY)
+        return remaining
+
+    def values(self) -> dict[str, str]:
+        """Return the stored values keyed by helper input name."""
+        return {
+            input_name: self._states[entity_id].state
+            for input_name, entity_id in self.entity_ids.items()
+            if entity_id in self._states
+            and self._states[entity_id].state not in ("unknown", "unavailable")
+        }
+
+    async def async_save(self) -> None:
+        """Write the values now (on shutdown)."""
+        await self._store.async_save(self._data())
+
+    async def async_remove(self) -> None:
+        """Delete the saved values once they have been handed to the helpers."""
+        await self._store.async_remove()
+
+    def _data(self) -> dict[str, Any]:
+        return {
+            "values": {
+                entity_id: {
+                    "state": state.state,
+                    "last_updated": state.last_updated.isoformat() if state.last_updated else None,
+                }
+                for entity_id, state in self._states.items()
+            }
+        }
+
+
+class _Overlay:
+    """State source that checks a RoomState before Home Assistant."""
+
+    def __init__(self, room_state: RoomState, states: StateSource) -> None:
+        self._room_state = room_state
+        self._states = states
+
+    def get(self, entity_id: str) -> Any:
+        state = self._room_state.get(entity_id)
+        return state if state is not None else self._states.get(entity_id)
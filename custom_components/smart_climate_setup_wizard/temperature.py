@@ -0,0 +1,165 @@
+"""Multi-sensor room temperature with staleness detection.
+
+The blueprint's current_temp rebuilds the list of sensor readings on every
+run and trusts whatever value a sensor last reported, even if the sensor
+died hours ago. TemperatureAggregator keeps the latest valid reading of each
+sensor with the time it was last reported, updated from state change
+events, and caches the aggregate until a reading changes or expires.
+Readings older than ``max_age`` are left out, and the result names the
+sensor that drives it (for the warmest/coldest strategies).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Iterable
+
+AVERAGE = "average"
+WARMEST = "warmest"
+COLDEST = "coldest"
+
+# Same availability rules as the blueprint template
+_UNAVAILABLE = ("unknown", "unavailable", "")
+_MIN_VALID = -50
+
+
+def strategy_for(inputs: Any) -> str:
+    """Resolve multi_sensor_strategy ('auto' included) to a fixed strategy."""
+    strategy = inputs["multi_sensor_strategy"]
+    cooling, heating = inputs["enable_cooling_mode"], inputs["enable_heating_mode"]
+    if strategy == "average" or (strategy == "auto" and inputs["use_average_temperature"]):
+        return AVERAGE
+    if strategy == "warmest" or (strategy != "coldest" and cooling and not heating):
+        return WARMEST
+    if strategy == "coldest" or (heating and not cooling):
+        return COLDEST
+    return AVERAGE
+
+
+def reported_at(state: Any) -> datetime | None:
+    """Return when a state was last reported (last_updated before HA 2024.3)."""
+    return getattr(state, "last_reported", None) or getattr(state, "last_updated", None)
+
+
+def parse_reading(raw: str | None) -> float | None:
+    """Return a sensor state as a reading, or None if it is not usable."""
+    if raw is None or raw in _UNAVAILABLE:
+        return None
+    try:
+        value = float(raw)
+    except ValueError:
+        return None
+    return value if value > _MIN_VALID else None
+
+
+@dataclass(frozen=True)
+class AggregateResult:
+    """The room temperature and where it came from."""
+
+    value: float | None
+    driver: str | None
+    used: tuple[str, ...]
+    stale: tuple[str, ...]
+
+
+class TemperatureAggregator:
+    """Latest readings of a room's temperature sensors and their aggregate."""
+
+    def __init__(self, sensors: Iterable[str], strategy: str, max_age: float = 0) -> None:
+        """Initialize the aggregator; ``max_age`` in seconds, 0 to never expire."""
+        self.sensors = tuple(dict.fromkeys(sensors))
+        self.strategy = strategy
+        self.max_age = timedelta(seconds=max_age) if max_age > 0 else None
+        self._readings: dict[str, tuple[float, datetime | None]] = {}
+        self._result: AggregateResult | None = None
+        # The cached result is valid until the oldest used reading expires
+        self._valid_until: datetime | None = None
+
+    def __contains__(self, entity_id: str) -> bool:
+        """Return True if the entity is one of the room's temperature sensors."""
+        return entity_id in self.sensors
+
+    def sync(self, states: Any) -> None:
+        """Reload every sensor from a state source."""
+        for entity_id in self.sensors:
+            self.update(entity_id, states.get(entity_id))
+
+    def update(self, entity_id: str, state: Any) -> None:
+        """Apply a sensor's new state object (None if it was removed)."""
+        value = parse_reading(None if state is None else state.state)
+        if value is None:
+            if self._readings.pop(entity_id, None) is not None:
+                self._result = None
+            return
+        self._readings[entity_id] = (value, reported_at(state))
+        self._result = None
+
+    def result(self, now: datetime | None, states: Any = None) -> AggregateResult:
+        """Return the aggregate of the fresh readings.
+
+        Without ``now`` no reading expires. Sensors that report an unchanged
+        value do not fire state change events, so a reading that looks
+        expired is refreshed from ``states`` before it is dropped.
+        """
+        if self._result is not None and (
+            self._valid_until is None or now is None or now < self._valid_until
+        ):
+            return self._result
+
+        used: list[tuple[str, float]] = []
+        stale: list[str] = []
+        valid_until: datetime | None = None
+        for entity_id in self.sensors:
+            reading = self._readings.get(entity_id)
+            if reading is None:
+                continue
+            value, reported = reading
+            if self.max_age is not None and reported is not None and now is not None:
+                if now - reported >= self.max_age and states is not None:
+                    self.update(entity_id, states.get(entity_id))
+                    reading = self._readings.get(entity_id)
+                    if reading is None:
+                        continue
+                    value, reported = reading
+                expires = reported + self.max_age
+                if now >= expires:
+                    stale.append(entity_id)
+                    continue
+                if valid_until is None or expires < valid_until:
+                    valid_until = expires
+            used.append((entity_id, value))
+
+        self._result = self._aggregate(used, stale)
+        self._valid_until = valid_until
+        return self._result
+
+    def _aggregate(self, used: list[tuple[str, float]], stale: list[str]) -> AggregateResult:
+        names = tuple(entity_id for entity_id, _ in used)
+        if not used:
+            return AggregateResult(None, None, names, tuple(stale))
+        if self.strategy == WARMEST:
+            driver, value = max(used, key=lambda item: item[1])
+            return AggregateResult(round(value, 1), driver, names, tuple(stale))
+        if self.strategy == COLDEST:
+            driver, value = min(used, key=lambda item: item[1])
+            return AggregateResult(round(value, 1), driver, names, tuple(stale))
+        average = sum(value for _, value in used) / len(used)
+        driver = names[0] if len(names) == 1 else None
+        return AggregateResult(round(average, 1), driver, names, tuple(stale))
+
+    def as_dict(self, now: datetime, states: Any = None) -> dict[str, Any]:
+        """Return the readings and the aggregate (for diagnostics)."""
+        result = self.result(now, states)
+        return {
+            "strategy": self.strategy,
+            "value": result.value,
+            "driver": result.driver,
+            "stale": list(result.stale),
+            "readings": {
+                entity_id: {
+                    "value": value,
+                    "age_s": None if reported is None else round((now - reported).total_seconds()),
+                }
+                for entity_id, (value, reported) in self._readings.items()
+            },
+        }
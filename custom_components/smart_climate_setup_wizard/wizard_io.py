@@ -0,0 +1,137 @@
+"""Blocking work of the setup wizard, kept off the event loop.
+
+Everything the config flow does on disk, and every YAML parse (the
+downloaded blueprint alone is 16k lines), goes through async_run, which
+runs it in the executor. LoopLagMonitor measures how late the event loop
+wakes up while a setup runs; the result is logged and shown in the
+diagnostics, so blocking work that creeps back onto the loop is visible.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+import logging
+import os
+import time
+from typing import Any, Callable, TypeVar
+
+from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+# The loop is sampled this often while a setup runs
+LAG_SAMPLE_INTERVAL = 0.05
+# Anything blocking the loop for longer than this is worth a warning
+LAG_WARN_THRESHOLD = 0.25
+
+
+async def async_run(hass: HomeAssistant, func: Callable[..., _T], *args: Any) -> _T:
+    """Run blocking file or parse work in the executor."""
+    start = time.perf_counter()
+    try:
+        return await hass.async_add_executor_job(func, *args)
+    finally:
+        _LOGGER.debug(
+            "%s took %.1f ms in the executor",
+            getattr(func, "__name__", func),
+            (time.perf_counter() - start) * 1000,
+        )
+
+
+async def async_path_exists(hass: HomeAssistant, path: str) -> bool:
+    """Return True if a file or directory exists."""
+    return await async_run(hass, os.path.exists, path)
+
+
+@dataclass
+class LoopLag:
+    """How much the event loop lagged while a setup ran."""
+
+    label: str
+    samples: int = 0
+    max_lag: float = 0.0
+    total_lag: float = 0.0
+    duration: float = 0.0
+
+    def add(self, lag: float) -> None:
+        """Record one sample."""
+        self.samples += 1
+        self.total_lag += lag
+        self.max_lag = max(self.max_lag, lag)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the measurement in milliseconds."""
+        return {
+            "label": self.label,
+            "duration_ms": round(self.duration * 1000, 1),
+            "samples": self.samples,
+            "max_lag_ms": round(self.max_lag * 1000, 1),
+            "mean_lag_ms": round(self.total_lag / self.samples * 1000, 1) if self.samples else 0.0,
+        }
+
+
+# Results of the most recent setups, for the diagnostics
+RECENT_LAG: deque[LoopLag] = deque(maxlen=10)
+
+
+def lag_stats() -> list[dict[str, Any]]:
+    """Return the loop lag of the most recent setups, newest last."""
+    return [lag.as_dict() for lag in RECENT_LAG]
+
+
+class LoopLagMonitor:
+    """Sample event loop lag for the duration of an ``async with`` block."""
+
+    def __init__(
+        self, hass: HomeAssistant, label: str, interval: float = LAG_SAMPLE_INTERVAL
+    ) -> None:
+        """Initialize the monitor."""
+        self.hass = hass
+        self.interval = interval
+        self.result = LoopLag(label)
+        self._task: asyncio.Task[None] | None = None
+        self._start = 0.0
+        self._expected = 0.0
+
+    async def __aenter__(self) -> LoopLag:
+        """Start sampling."""
+        self._start = time.perf_counter()
+        self._expected = self.hass.loop.time() + self.interval
+        self._task = self.hass.loop.create_task(self._sample())
+        return self.result
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        """Stop sampling and report the result."""
+        # A block that ended right after blocking the loop has an overdue
+        # sample that the sampler never got to take
+        overdue = self.hass.loop.time() - self._expected
+        if self._task is not None and overdue > 0:
+            self.result.add(overdue)
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        result = self.result
+        result.duration = time.perf_counter() - self._start
+        RECENT_LAG.append(result)
+        level = logging.WARNING if result.max_lag > LAG_WARN_THRESHOLD else logging.DEBUG
+        _LOGGER.log(
+            level,
+            "%s took %.1f s; event loop lag max %.0f ms, mean %.0f ms",
+            result.label,
+            result.duration,
+            result.max_lag * 1000,
+            result.as_dict()["mean_lag_ms"],
+        )
+
+    async def _sample(self) -> None:
+        loop = self.hass.loop
+        while True:
+            self._expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.result.add(max(0.0, loop.time() - self._expected))
@@ -0,0 +1,64 @@
+"""Helper writes that skip values the helper already has.
+
+Many of the blueprint's ``set_value``/``set_datetime`` calls rewrite the
+value the helper already holds (expected fan/hvac, trend direction, the
+override timeout on every run, ...). Home Assistant still turns each of
+those calls into a service call and, for most helpers, a state write. The
+HelperWriter compares every value with the helper's current state first,
+sends only real changes and counts what it skipped.
+"""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import Context, HomeAssistant
+
+from .store import helper_state_value
+
+
+def _same_value(entity_id: str, current: str, value: Any) -> bool:
+    """Return True if writing value would leave the helper state unchanged."""
+    if entity_id.startswith("input_number."):
+        try:
+            return float(current) == float(value)
+        except (TypeError, ValueError):
+            return False
+    return current == helper_state_value(entity_id, value)
+
+
+class HelperWriter:
+    """Write input_* helpers through their services, skipping no-op writes."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the writer."""
+        self.hass = hass
+        self.written = 0
+        self.skipped = 0
+
+    async def async_write(self, values: dict[str, Any], context: Context) -> None:
+        """Write values keyed by helper entity_id."""
+        for entity_id, value in values.items():
+            state = self.hass.states.get(entity_id)
+            if state is not None and _same_value(entity_id, state.state, value):
+                self.skipped += 1
+                continue
+            domain = entity_id.split(".", 1)[0]
+            if domain == "input_boolean":
+                service, data = ("turn_on" if value else "turn_off"), {}
+            elif domain == "input_datetime":
+                service, data = "set_datetime", {"datetime": helper_state_value(entity_id, value)}
+            elif domain == "input_select":
+                service, data = "select_option", {"option": value}
+            elif domain == "input_number":
+                service, data = "set_value", {"value": value}
+            else:
+                service, data = "set_value", {"value": str(value)}
+            await self.hass.services.async_call(
+                domain,
+                service,
+                {ATTR_ENTITY_ID: entity_id, **data},
+                blocking=True,
+                context=context,
+            )
+            self.written += 1
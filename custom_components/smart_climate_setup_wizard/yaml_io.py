@@ -0,0 +1,109 @@
+"""YAML reading and writing for the wizard.
+
+The pure-Python PyYAML loader needs seconds for the blueprint on a
+Raspberry Pi. When PyYAML was built with libyaml (as in Home Assistant's
+images) the C loader and dumper are used instead, with the same safe
+semantics; otherwise this falls back to the pure-Python classes. Every parse
+and dump is timed, and the totals are included in the diagnostics.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+import logging
+import time
+from typing import IO, Any
+
+import yaml
+
+try:
+    from yaml import CSafeDumper as SafeDumper, CSafeLoader as SafeLoader
+
+    HAS_LIBYAML = True
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeDumper, SafeLoader  # type: ignore[assignment]
+
+    HAS_LIBYAML = False
+
+_LOGGER = logging.getLogger(__name__)
+
+YAMLError = yaml.YAMLError
+
+
+@dataclass
+class OperationStats:
+    """How often an operation ran and how long it took."""
+
+    count: int = 0
+    total: float = 0.0
+    last: float = 0.0
+    slowest: float = 0.0
+
+    def add(self, seconds: float) -> None:
+        """Record one run."""
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        self.slowest = max(self.slowest, seconds)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the stats in milliseconds."""
+        return {
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 1),
+            "last_ms": round(self.last * 1000, 1),
+            "slowest_ms": round(self.slowest * 1000, 1),
+        }
+
+
+STATS = {"parse": OperationStats(), "dump": OperationStats()}
+
+
+def stats() -> dict[str, Any]:
+    """Return the parse and dump times so far (for diagnostics)."""
+    return {
+        "libyaml": HAS_LIBYAML,
+        **{operation: value.as_dict() for operation, value in STATS.items()},
+    }
+
+
+def _record(operation: str, label: str, start: float) -> None:
+    seconds = time.perf_counter() - start
+    STATS[operation].add(seconds)
+    _LOGGER.debug(
+        "YAML %s of %s took %.1f ms (%s)",
+        operation,
+        label,
+        seconds * 1000,
+        "libyaml" if HAS_LIBYAML else "pure Python",
+    )
+
+
+def load(stream: str | IO[str], loader: type = SafeLoader, label: str = "string") -> Any:
+    """Parse YAML safely; ``loader`` must derive from this module's SafeLoader."""
+    start = time.perf_counter()
+    try:
+        return yaml.load(stream, Loader=loader)  # noqa: S506
+    finally:
+        _record("parse", label, start)
+
+
+def load_file(path: str, loader: type = SafeLoader) -> Any:
+    """Parse a YAML file (blocking)."""
+    with open(path, encoding="utf-8") as file:
+        return load(file, loader, path)
+
+
+def dump(data: Any, stream: IO[str] | None = None, label: str = "string") -> str | None:
+    """Serialize data as block-style YAML, keeping key order and unicode."""
+    start = time.perf_counter()
+    try:
+        return yaml.dump(
+            data,
+            stream,
+            Dumper=SafeDumper,
+            default_flow_style=False,
+            allow_unicode=True,
+            sort_keys=False,
+        )
+    finally:
+        _record("dump", label, start)
@@ -0,0 +1,18 @@
+"""Test setup: import the integration's pure modules without Home Assistant.
+
+The integration's __init__ needs Home Assistant; the modules tested here
+(engine, automation_store, ...) do not. Like tools/replay_benchmark.py, the
+package is registered without running its __init__.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+from types import ModuleType
+
+PACKAGE = "smart_climate_setup_wizard"
+INTEGRATION_DIR = Path(__file__).resolve().parent.parent / "custom_components" / PACKAGE
+
+_package = ModuleType(PACKAGE)
+_package.__path__ = [str(INTEGRATION_DIR)]
+sys.modules.setdefault(PACKAGE, _package)
@@ -0,0 +1,117 @@
+"""Tests for editing automations.yaml by key."""
+from __future__ import annotations
+
+import pytest
+
+from smart_climate_setup_wizard import automation_store, yaml_io
+from smart_climate_setup_wizard.automation_store import (
+    UnsupportedLayout,
+    remove_automations,
+    split_blocks,
+    upsert_automations,
+)
+
+OTHER = """\
+- id: other
+  alias: Other
+  triggers: []
+  actions: []
+"""
+
+
+def _write(tmp_path, text: str):
+    path = tmp_path / "automations.yaml"
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def _ids(path) -> list[str]:
+    return [automation["id"] for automation in yaml_io.load(path.read_text(encoding="utf-8")) or []]
+
+
+def _automation(automation_id: str, **extra) -> dict:
+    return {"id": automation_id, "alias": automation_id.title(), "triggers": [], "actions": [], **extra}
+
+
+def test_header_comment_and_empty_list(tmp_path):
+    path = _write(tmp_path, "# Managed by the UI\n[]\n")
+
+    upsert_automations(str(path), [_automation("room")])
+
+    text = path.read_text(encoding="utf-8")
+    assert text.startswith("# Managed by the UI\n")
+    assert "\n[]\n" not in text
+    assert _ids(path) == ["room"]
+
+
+def test_block_starting_with_alias(tmp_path):
+    path = _write(tmp_path, "- alias: Room\n  id: room\n  triggers: []\n  actions: []\n" + OTHER)
+
+    header, blocks = split_blocks(path.read_text(encoding="utf-8"))
+    assert header == []
+    assert [automation_id for automation_id, _ in blocks] == ["room", "other"]
+
+    upsert_automations(str(path), [_automation("room", description="new")])
+    assert _ids(path) == ["room", "other"]
+    assert yaml_io.load(path.read_text(encoding="utf-8"))[0]["description"] == "new"
+
+
+@pytest.mark.parametrize("quoted", ["'room'", '"room"'])
+def test_quoted_ids(tmp_path, quoted):
+    path = _write(tmp_path, f"- id: {quoted}\n  alias: Room\n" + OTHER)
+
+    assert remove_automations(str(path), ["room"]) == 1
+    assert _ids(path) == ["other"]
+
+
+def test_removing_last_block_leaves_empty_list(tmp_path):
+    path = _write(tmp_path, "# header\n- id: room\n  alias: Room\n")
+
+    assert remove_automations(str(path), ["room"]) == 1
+    assert path.read_text(encoding="utf-8") == "[]\n"
+    assert _ids(path) == []
+
+
+def test_leading_comment_goes_with_its_block(tmp_path):
+    path = _write(tmp_path, OTHER + "# Room automation, do not edit\n- id: room\n  alias: Room\n")
+
+    assert remove_automations(str(path), ["room"]) == 1
+    assert path.read_text(encoding="utf-8") == OTHER
+
+    path = _write(tmp_path, "# about other\n" + OTHER + "\n# about room\n- id: room\n  alias: Room\n")
+    assert remove_automations(str(path), ["other"]) == 1
+    assert path.read_text(encoding="utf-8") == "# about room\n- id: room\n  alias: Room\n"
+
+
+def test_unsupported_layout_falls_back_to_rewrite(tmp_path, caplog):
+    path = _write(tmp_path, "automations:\n- id: room\n  alias: Room\n")
+    with pytest.raises(UnsupportedLayout):
+        split_blocks(path.read_text(encoding="utf-8"))
+
+    # A flow-style list cannot be split into blocks
+    path = _write(tmp_path, '[{"id": "other", "alias": "Other"}, {"id": "room", "alias": "Old"}]\n')
+
+    upsert_automations(str(path), [_automation("room")])
+
+    assert "Rewriting" in caplog.text
+    automations = yaml_io.load(path.read_text(encoding="utf-8"))
+    assert [a["id"] for a in automations] == ["other", "room"]
+    assert automations[1]["alias"] == "Room"
+
+
+def test_description_containing_block_start(tmp_path):
+    path = _write(tmp_path, OTHER)
+    automation = _automation("room", description="first line\n- id: other\nlast line")
+
+    upsert_automations(str(path), [automation])
+    upsert_automations(str(path), [automation])
+
+    _, blocks = split_blocks(path.read_text(encoding="utf-8"))
+    assert [automation_id for automation_id, _ in blocks] == ["other", "room"]
+    assert yaml_io.load(path.read_text(encoding="utf-8"))[1]["description"] == automation["description"]
+    assert remove_automations(str(path), ["room"]) == 1
+    assert path.read_text(encoding="utf-8") == OTHER
+
+
+def test_dump_is_a_top_level_list():
+    assert automation_store.dump_automations([_automation("room")]).startswith("- id: room\n")
@@ -0,0 +1,138 @@
+"""Capabilities must resolve modes exactly like the per-run chains it replaced."""
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from smart_climate_setup_wizard.capabilities import Capabilities, CapabilityCache
+
+# The engine's resolution before the capability cache, kept as the reference
+
+
+def _old_new_fan_mode(fans: list[str], level: int) -> str:
+    aliases = {
+        1: ("Silence", "silence", "Quiet", "quiet", "low", "Low"),
+        2: ("medium-low",),
+        3: ("medium", "Medium"),
+        4: ("medium-high",),
+        5: ("high", "High"),
+    }
+    for candidate in (f"Level {level}", str(level), *aliases.get(level, ())):
+        if candidate in fans:
+            return candidate
+    for candidate in ("Auto", "auto"):
+        if candidate in fans:
+            return candidate
+    return fans[0] if fans else "Auto"
+
+
+def _old_fan_only_mode(fans: list[str], choice: str) -> str:
+    preferences = {
+        "silence": ("silence", "Silence", "quiet", "Quiet", "1", "Level 1"),
+        "quiet": ("quiet", "Quiet", "silence", "Silence", "1", "Level 1"),
+        "1": ("1", "Level 1", "silence", "Silence", "quiet", "Quiet"),
+        "2": ("2", "Level 2"),
+        "3": ("3", "Level 3"),
+        "4": ("4", "Level 4"),
+        "5": ("5", "Level 5"),
+    }
+    for candidate in preferences.get(choice, ()):
+        if candidate in fans:
+            return candidate
+    if fans:
+        return fans[0]
+    return choice if choice in preferences else "silence"
+
+
+def _old_swing_mode(swing_modes: list[str], desired: str) -> str:
+    if desired in swing_modes:
+        return desired
+    mapped = {
+        "vertical": ("Vertical",),
+        "horizontal": ("Horizontal",),
+        "both": ("3D", "Both"),
+        "off": ("Off",),
+    }
+    for candidate in mapped.get(desired, ()):
+        if candidate in swing_modes:
+            return candidate
+    for candidate in ("off", "Off"):
+        if candidate in swing_modes:
+            return candidate
+    return swing_modes[0] if swing_modes else "Off"
+
+
+def _old_hvac_mode(modes: list[str], wanted: str) -> str:
+    for candidate in (wanted, wanted.capitalize()):
+        if candidate in modes:
+            return candidate
+    return modes[0] if modes else wanted
+
+
+FAN_MODE_LISTS = [
+    [],
+    ["auto", "low", "medium", "high"],
+    ["Auto", "Silence", "Level 1", "Level 2", "Level 3", "Level 4", "Level 5"],
+    ["auto", "quiet", "1", "2", "3", "4", "5"],
+    ["Quiet", "Low", "medium-low", "Medium", "medium-high", "High"],
+    ["turbo", "eco"],
+    ["silence", "Auto", "3"],
+]
+SWING_MODE_LISTS = [
+    [],
+    ["off", "vertical", "horizontal", "both"],
+    ["Off", "Vertical", "Horizontal", "3D"],
+    ["Both", "Vertical"],
+    ["swing", "fixed"],
+]
+HVAC_MODE_LISTS = [
+    [],
+    ["off", "cool", "heat", "auto", "dry", "fan_only", "heat_cool"],
+    ["Off", "Cool", "Heat", "Dry"],
+    ["fan_only", "cool"],
+]
+FAN_ONLY_CHOICES = ["silence", "quiet", "1", "2", "3", "4", "5", "turbo", ""]
+SWING_CHOICES = ["vertical", "horizontal", "both", "off", "swing", "3d"]
+HVAC_CHOICES = ["off", "cool", "heat", "auto", "dry", "fan_only", "heat_cool", "eco"]
+
+
+@pytest.mark.parametrize("fans", FAN_MODE_LISTS)
+def test_fan_modes_match_the_old_resolution(fans):
+    capabilities = Capabilities.build(fans, [], [])
+
+    for level in range(0, 7):
+        assert capabilities.fan_mode(level) == _old_new_fan_mode(fans, level), level
+    for choice in FAN_ONLY_CHOICES:
+        assert capabilities.fan_only_mode(choice) == _old_fan_only_mode(fans, choice), choice
+
+
+@pytest.mark.parametrize("swings", SWING_MODE_LISTS)
+def test_swing_modes_match_the_old_resolution(swings):
+    capabilities = Capabilities.build([], swings, [])
+
+    for desired in SWING_CHOICES:
+        assert capabilities.swing_mode(desired) == _old_swing_mode(swings, desired), desired
+
+
+@pytest.mark.parametrize("hvacs", HVAC_MODE_LISTS)
+def test_hvac_modes_match_the_old_resolution(hvacs):
+    capabilities = Capabilities.build([], [], hvacs)
+
+    for wanted in HVAC_CHOICES:
+        assert capabilities.hvac_mode(wanted) == _old_hvac_mode(hvacs, wanted), wanted
+
+
+def test_cache_rebuilds_only_when_the_mode_lists_change():
+    cache = CapabilityCache()
+
+    def state(fan_modes: list[str]) -> SimpleNamespace:
+        return SimpleNamespace(attributes={"fan_modes": fan_modes, "hvac_modes": ["off", "cool"]})
+
+    first = cache.get("climate.office", state(["auto", "high"]))
+    assert cache.get("climate.office", state(["auto", "high"])) is first
+    assert cache.builds == 1
+
+    changed = cache.get("climate.office", state(["auto", "Level 5"]))
+    assert changed.fan_mode(5) == "Level 5"
+    assert cache.builds == 2
@@ -0,0 +1,256 @@
+"""Tests for compiling the blueprint into a plain automation."""
+from __future__ import annotations
+
+from pathlib import Path
+
+from smart_climate_setup_wizard import blueprint_inputs, compiler
+from smart_climate_setup_wizard.compiler import Input, compile_automation
+
+BLUEPRINT = Path(__file__).resolve().parent.parent / "ultimate_climate_control.yaml"
+
+
+def _blueprint(variables: dict, action: list | None = None, **extra) -> dict:
+    # Like the real blueprint, templates see inputs through variables
+    variables = {
+        "fan": Input("fan"),
+        "check_interval": Input("check_interval_minutes"),
+        **variables,
+    }
+    return {
+        "blueprint": {
+            "input": {
+                "fan": {"default": None, "selector": {"entity": {}}},
+                "check_interval_minutes": {"default": 1, "selector": {"number": {}}},
+                "target": {"default": 23, "selector": {"number": {}}},
+            }
+        },
+        "trigger": [],
+        "variables": variables,
+        "action": action or [],
+        **extra,
+    }
+
+
+def _option(condition: str, tag: str) -> dict:
+    return {
+        "conditions": [{"condition": "template", "value_template": condition}],
+        "sequence": [{"event": tag}],
+    }
+
+
+def _events(actions: list) -> list[str]:
+    return [action["event"] for action in actions if "event" in action]
+
+
+def test_input_only_variables_become_literals():
+    body, stats = compile_automation(
+        _blueprint(
+            {
+                "target_temp": Input("target"),
+                "overshoot": "{{ target_temp | float + 0.5 }}",
+                "fan_configured": "{{ fan is not none and fan != '' }}",
+                "label": "{{ 'T' ~ target_temp }}",
+            }
+        ),
+        {"target": 21, "fan": None},
+    )
+
+    variables = body["variables"]
+    assert variables["target_temp"] == 21
+    assert variables["overshoot"] == 21.5
+    assert variables["fan_configured"] is False
+    assert variables["label"] == "T21"
+    assert stats.folded == ["overshoot", "fan_configured", "label"]
+
+
+def test_state_clock_and_trigger_dependent_variables_stay_templates():
+    dynamic = {
+        "current": "{{ states('sensor.office') | float(0) }}",
+        "hour": "{{ now().hour }}",
+        "trigger_id": "{{ trigger.id }}",
+        # Depends on a variable that could not be folded
+        "warmer": "{{ current + 1 }}",
+    }
+
+    body, stats = compile_automation(_blueprint(dict(dynamic)), {})
+
+    assert {name: body["variables"][name] for name in dynamic} == dynamic
+    assert stats.folded == []
+
+
+def test_false_conjunct_drops_the_option():
+    action = [
+        {
+            "choose": [
+                _option("{{ fan_configured and is_state('fan.office', 'on') }}", "fan"),
+                _option("{{ is_state('climate.office', 'cool') }}", "cool"),
+            ]
+        }
+    ]
+
+    body, stats = compile_automation(
+        _blueprint({"fan_configured": "{{ fan is not none }}"}, action), {"fan": None}
+    )
+
+    options = body["action"][0]["choose"]
+    assert [_events(option["sequence"]) for option in options] == [["cool"]]
+    assert stats.pruned == 1
+
+
+def test_dynamic_conjuncts_keep_the_option():
+    action = [{"choose": [_option("{{ fan_configured and is_state('fan.office', 'on') }}", "fan")]}]
+
+    body, stats = compile_automation(
+        _blueprint({"fan_configured": "{{ fan is not none }}"}, action), {"fan": "fan.office"}
+    )
+
+    assert len(body["action"][0]["choose"]) == 1
+    assert stats.pruned == 0
+
+
+def test_or_needs_every_item_false():
+    def or_option(second: str) -> dict:
+        return {
+            "conditions": [
+                {
+                    "condition": "or",
+                    "conditions": [
+                        {"condition": "template", "value_template": "{{ fan_configured }}"},
+                        {"condition": "template", "value_template": second},
+                    ],
+                }
+            ],
+            "sequence": [{"event": second}],
+        }
+
+    action = [
+        {
+            "choose": [
+                or_option("{{ is_state('climate.office', 'cool') }}"),
+                or_option("{{ target_temp > 30 }}"),
+            ]
+        }
+    ]
+
+    body, stats = compile_automation(
+        _blueprint({"fan_configured": "{{ fan is not none }}", "target_temp": Input("target")}, action),
+        {"fan": None, "target": 21},
+    )
+
+    options = body["action"][0]["choose"]
+    assert [_events(option["sequence"]) for option in options] == [
+        ["{{ is_state('climate.office', 'cool') }}"]
+    ]
+    assert stats.pruned == 1
+
+
+def test_shadowed_names_are_never_used_for_pruning():
+    action = [
+        {"variables": {"fan_configured": "{{ is_state('input_boolean.fan', 'on') }}"}},
+        {"choose": [_option("{{ fan_configured }}", "fan")]},
+    ]
+
+    body, stats = compile_automation(
+        _blueprint({"fan_configured": "{{ fan is not none }}"}, action), {"fan": None}
+    )
+
+    assert _events(body["action"][1]["choose"][0]["sequence"]) == ["fan"]
+    assert stats.pruned == 0
+
+
+def test_trigger_variables_are_shadowed_too():
+    action = [{"choose": [_option("{{ deadband > 0 }}", "gated")]}]
+
+    body, stats = compile_automation(
+        _blueprint({"deadband": 0}, action, trigger_variables={"deadband": Input("target")}),
+        {},
+    )
+
+    assert len(body["action"][0]["choose"]) == 1
+    assert stats.pruned == 0
+
+
+def test_if_with_else_splices_the_else_actions():
+    action = [
+        {"event": "before"},
+        {
+            "if": [{"condition": "template", "value_template": "{{ fan_configured }}"}],
+            "then": [{"event": "fan"}],
+            "else": [{"event": "no_fan_1"}, {"event": "no_fan_2"}],
+        },
+        {"if": "{{ fan_configured }}", "then": [{"event": "dropped"}]},
+        {"event": "after"},
+    ]
+
+    body, stats = compile_automation(
+        _blueprint({"fan_configured": "{{ fan is not none }}"}, action), {"fan": None}
+    )
+
+    assert _events(body["action"]) == ["before", "no_fan_1", "no_fan_2", "after"]
+    assert stats.pruned == 2
+
+
+def test_choose_without_options_left_splices_the_default():
+    action = [
+        {
+            "choose": [_option("{{ fan_configured }}", "fan")],
+            "default": [{"event": "default"}],
+        }
+    ]
+
+    body, _ = compile_automation(
+        _blueprint({"fan_configured": "{{ fan is not none }}"}, action), {"fan": None}
+    )
+
+    assert _events(body["action"]) == ["default"]
+
+
+def _periodic_trigger() -> dict:
+    return {"platform": "time_pattern", "minutes": "/1", "id": "periodic_check"}
+
+
+def test_periodic_check_fires_on_interval_minutes_at_the_offset():
+    other = {"platform": "time_pattern", "minutes": "/1", "id": "something_else"}
+    blueprint = _blueprint({}, trigger=[_periodic_trigger(), other])
+
+    body, _ = compile_automation(blueprint, {"check_interval_minutes": 5}, periodic_offset=77)
+
+    assert body["trigger"][0] == {
+        "platform": "time_pattern",
+        "minutes": "/5",
+        "seconds": 17,
+        "id": "periodic_check",
+    }
+    assert body["trigger"][1] == other
+
+
+def test_periodic_check_every_minute_keeps_the_minute_pattern():
+    triggers = [_periodic_trigger()]
+
+    compiler._schedule_periodic_check(triggers, 1, 42)
+
+    assert triggers[0]["minutes"] == "/1"
+    assert triggers[0]["seconds"] == 42
+
+
+def test_real_blueprint_keeps_runtime_variables_as_templates():
+    blueprint = compiler.load_blueprint(str(BLUEPRINT))
+    inputs = blueprint_inputs.build_blueprint_inputs(
+        {"room_name": "Office", "climate_entities": ["climate.office"]}
+    )
+
+    body, stats = compile_automation(blueprint, inputs, periodic_offset=13)
+
+    assert stats.folded
+    assert stats.pruned
+    variables = body["variables"]
+    for name in stats.folded:
+        assert not compiler._is_template(variables[name]), name
+    # Anything reading states, the clock or the trigger is untouched
+    for name, value in variables.items():
+        if isinstance(value, str) and any(
+            marker in value for marker in ("states(", "now()", "trigger.")
+        ):
+            assert name not in stats.folded, name
+    periodic = [t for t in body["trigger"] if t.get("id") == "periodic_check"]
+    assert periodic and periodic[0]["seconds"] == 13
@@ -0,0 +1,92 @@
+"""Tests for the native engine's dispatch decision."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from smart_climate_setup_wizard import blueprint_inputs, engine
+from smart_climate_setup_wizard.engine import EntitySnapshot, Trigger
+
+NOW = datetime(2026, 7, 1, 14, 0, tzinfo=timezone.utc)
+CLIMATE = "climate.office"
+
+
+def _room() -> engine.RoomConfig:
+    return engine.RoomConfig(
+        blueprint_inputs.build_blueprint_inputs(
+            {
+                "room_name": "Office",
+                "climate_entities": [CLIMATE],
+                "temperature_sensor": "sensor.office",
+                "enable_control_mode": True,
+                "enable_smart_mode": True,
+                "enable_manual_override": True,
+                "default_control_mode": "Auto",
+            }
+        )
+    )
+
+
+def _override_states(cfg: engine.RoomConfig, override_age: timedelta, before: str) -> dict:
+    states = {
+        CLIMATE: EntitySnapshot(
+            CLIMATE,
+            "heat",
+            {"temperature": 25, "fan_mode": "high", "fan_modes": ["auto", "high"], "hvac_modes": ["off", "cool", "heat"]},
+            NOW,
+            NOW,
+        ),
+        "sensor.office": EntitySnapshot("sensor.office", "23", {}, NOW, NOW),
+    }
+    for entity_id in cfg.helper_inputs.values():
+        states[entity_id] = EntitySnapshot(entity_id, "unknown", {}, NOW, NOW)
+
+    def set_helper(name: str, value: str) -> None:
+        entity_id = cfg.helper(name)
+        states[entity_id] = EntitySnapshot(entity_id, value, {}, NOW, NOW)
+
+    set_helper("helper_control_mode", "Override")
+    set_helper("helper_mode_before_override", before)
+    set_helper("helper_override_active", "on")
+    set_helper("helper_override_source", "ac")
+    set_helper("helper_override_time", (NOW - override_age).strftime("%Y-%m-%d %H:%M:%S"))
+    return states
+
+
+def _decide(cfg: engine.RoomConfig, states: dict) -> tuple[engine.Evaluation, engine.Decision]:
+    return engine.evaluate(cfg, states, NOW, Trigger("periodic_check"))
+
+
+def test_override_stays_paused_before_timeout():
+    cfg = _room()
+    ev, decision = _decide(cfg, _override_states(cfg, timedelta(hours=1), "Smart"))
+
+    assert decision.branch == "override"
+    assert decision.control_mode is None
+    assert engine.plan_commands(ev, decision) == []
+
+
+def test_override_expires_after_timeout():
+    cfg = _room()
+    ev, decision = _decide(cfg, _override_states(cfg, timedelta(hours=2, minutes=1), "Smart"))
+
+    assert decision.branch == "override_timeout"
+    assert decision.control_mode == "Smart"
+    assert engine.plan_commands(ev, decision) == []
+
+    updates = engine.helper_updates(ev, decision)
+    assert updates["helper_control_mode"] == "Smart"
+    assert updates["helper_override_active"] is False
+    assert updates["helper_override_source"] == "none"
+    assert updates["helper_last_change"] == NOW
+    # The AC state the user left becomes the expected state
+    assert updates["helper_expected_hvac"] == "heat"
+    assert updates["helper_expected_temp"] == 25
+    assert updates["helper_expected_fan"] == "high"
+
+
+def test_override_expiry_falls_back_to_default_mode():
+    cfg = _room()
+    _, decision = _decide(cfg, _override_states(cfg, timedelta(hours=3), "Override"))
+
+    assert decision.branch == "override_timeout"
+    assert decision.control_mode == cfg["default_control_mode"]
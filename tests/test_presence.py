@@ -0,0 +1,100 @@
+"""Presence counts must match the per-run loop they replaced."""
+from __future__ import annotations
+
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from smart_climate_setup_wizard.presence import PresenceSensors, PresenceTracker
+
+SENSORS = [
+    "sensor.phone_ble_area",
+    "sensor.watch_ble_area",
+    "sensor.tablet_room",
+    "binary_sensor.office_motion",
+    "binary_sensor.office_mmwave",
+    "device_tracker.laptop",
+    "input_boolean.guest_in_office",
+]
+STATES = [
+    "Office", "office", "OFFICE", "Hallway", "hallway", "Kitchen", "not_home",
+    "on", "off", "detected", "clear", "occupied", "home", "Home", "present",
+    "away", "unknown", "unavailable",
+]
+
+
+def _old_room_presence(
+    sensors: list[str], room_name: str, adjacent_rooms: list[str], state: dict[str, str]
+) -> tuple[int, bool, bool, bool, int]:
+    """room_presence_detected's loop before the precomputed classification."""
+    room = room_name.lower()
+    adjacent = [name.lower() for name in adjacent_rooms]
+    triggered = 0
+    ble = motion = other = False
+    ble_count = 0
+    for sensor in sensors:
+        raw = state.get(sensor, "unknown")
+        lowered = raw.lower()
+        if sensor.startswith("sensor.") and room:
+            ble_count += 1
+            if lowered == room or lowered in adjacent:
+                ble = True
+                triggered += 1
+        elif sensor.startswith("binary_sensor."):
+            if raw in ("on", "detected", "occupied"):
+                motion = True
+                triggered += 1
+        elif raw == "on" or lowered in ("home", "present", "detected", "occupied"):
+            other = True
+            triggered += 1
+    return triggered, ble, motion, other, ble_count
+
+
+def _new_room_presence(sensors: PresenceSensors, counts) -> tuple[int, bool, bool, bool, int]:
+    return counts.triggered, counts.ble > 0, counts.motion > 0, counts.other > 0, sensors.ble_count
+
+
+@pytest.mark.parametrize(
+    ("room_name", "adjacent_rooms"),
+    [("Office", []), ("Office", ["Hallway", "kitchen"]), ("", ["Hallway"])],
+)
+def test_counts_match_the_old_loop(room_name, adjacent_rooms):
+    rng = random.Random(f"{room_name}{adjacent_rooms}")
+    sensors = PresenceSensors(SENSORS, room_name, adjacent_rooms)
+    tracker = PresenceTracker(sensors)
+    state: dict[str, str] = {}
+
+    for _ in range(500):
+        entity_id = rng.choice(SENSORS)
+        state[entity_id] = rng.choice(STATES)
+        tracker.update(entity_id, state[entity_id])
+
+        expected = _old_room_presence(SENSORS, room_name, adjacent_rooms, state)
+        assert _new_room_presence(sensors, tracker.counts) == expected
+        counted = sensors.count((sensor, state.get(sensor, "unknown")) for sensor in sensors.kinds)
+        assert _new_room_presence(sensors, counted) == expected
+    assert sensors.total == len(SENSORS)
+
+
+def test_sync_recounts_from_states():
+    sensors = PresenceSensors(SENSORS, "Office", ["Hallway"])
+    tracker = PresenceTracker(sensors)
+    state = {"sensor.phone_ble_area": "hallway", "binary_sensor.office_motion": "on"}
+
+    tracker.sync({entity_id: SimpleNamespace(state=value) for entity_id, value in state.items()})
+
+    assert _new_room_presence(sensors, tracker.counts) == _old_room_presence(
+        SENSORS, "Office", ["Hallway"], state
+    )
+    # A sensor that disappears counts as unknown
+    assert tracker.update("binary_sensor.office_motion", None)
+    assert tracker.counts.motion == 0
+
+
+def test_ble_area_sensors_match_the_old_filter():
+    sensors = PresenceSensors(SENSORS, "Office", [])
+
+    assert sensors.ble_area_sensors == tuple(
+        sensor for sensor in SENSORS if sensor.startswith("sensor.") and "_ble_area" in sensor
+    )
@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+"""Offline replay benchmark for the climate control decision pipeline.
+
+Replays a recorded trace of entity states and triggers through
+
+* the blueprint: every top-level ``variables`` block (the automation
+  variables and the ``variables:`` steps of the main action sequence) is
+  rendered with Jinja, the same work Home Assistant does on each run, and
+* the native engine (``engine.evaluate`` with the variable cache), whose
+  climate commands and helper writes are applied back to the simulated
+  states so the trace evolves like a live room,
+
+and reports per-trigger latency, variables evaluated and service calls.
+
+No Home Assistant instance or devices are needed; only ``jinja2`` and
+``PyYAML``. Compare blueprint versions by running the same trace against
+two blueprint files::
+
+    python tools/replay_benchmark.py tools/traces/sample_trace.json
+    python tools/replay_benchmark.py TRACE --blueprint old.yaml --json > old.json
+
+Trace format (JSON)::
+
+    {
+      "room": {...wizard configuration, e.g. room_name, climate_entities...},
+      "start": "2026-07-01T14:00:00+10:00",
+      "states": {"climate.office": {"state": "cool", "attributes": {...}}},
+      "events": [
+        {"at": 60, "set": {"sensor.office": {"state": "26.4"}},
+         "trigger": {"id": "temp_change", "entity_id": "sensor.office"}}
+      ]
+    }
+
+``at`` is seconds after ``start``. ``set`` updates states before the
+trigger runs; events without a ``trigger`` only update states.
+"""
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+import importlib
+import json
+from pathlib import Path
+import statistics
+import sys
+import time
+from types import ModuleType, SimpleNamespace
+from typing import Any
+
+ROOT = Path(__file__).resolve().parent.parent
+PACKAGE = "smart_climate_setup_wizard"
+INTEGRATION_DIR = ROOT / "custom_components" / PACKAGE
+DEFAULT_BLUEPRINT = ROOT / "ultimate_climate_control.yaml"
+
+
+def _load_integration() -> tuple[ModuleType, ModuleType, ModuleType, ModuleType]:
+    """Import the integration's pure modules without its Home Assistant __init__."""
+    package = ModuleType(PACKAGE)
+    package.__path__ = [str(INTEGRATION_DIR)]
+    sys.modules.setdefault(PACKAGE, package)
+    return (
+        importlib.import_module(f"{PACKAGE}.engine"),
+        importlib.import_module(f"{PACKAGE}.compiler"),
+        importlib.import_module(f"{PACKAGE}.blueprint_inputs"),
+        importlib.import_module(f"{PACKAGE}.profiler"),
+    )
+
+
+engine, compiler, blueprint_inputs, profiler = _load_integration()
+
+
+# ---------------------------------------------------------------------------
+# Simulated state machine
+# ---------------------------------------------------------------------------
+
+
+class States(dict):
+    """entity_id -> EntitySnapshot, usable as the engine's state source."""
+
+    def set(self, entity_id: str, state: str, attributes: dict[str, Any] | None, now: datetime) -> None:
+        old = self.get(entity_id)
+        if attributes is None:
+            attributes = dict(old.attributes) if old is not None else {}
+        changed = old is None or old.state != state
+        self[entity_id] = engine.EntitySnapshot(
+            entity_id,
+            state,
+            attributes,
+            last_changed=now if changed else old.last_changed,
+            last_updated=now,
+        )
+
+
+def _helper_state(entity_id: str, value: Any) -> str:
+    """Format a helper write the way the helper would report it."""
+    domain = entity_id.split(".", 1)[0]
+    if domain == "input_boolean":
+        return "on" if value else "off"
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if domain == "input_number":
+        return str(float(value))
+    return str(value)
+
+
+def _apply_command(states: States, command: Any, now: datetime) -> None:
+    """Pretend the climate entity followed the command immediately."""
+    current = states.get(command.entity_id)
+    if current is None:
+        return
+    state = current.state
+    attributes = dict(current.attributes)
+    data = command.data
+    if command.service == "turn_off":
+        state = "off"
+    if "hvac_mode" in data:
+        state = data["hvac_mode"]
+    for key in ("temperature", "fan_mode", "swing_mode"):
+        if key in data:
+            attributes[key] = data[key]
+    states.set(command.entity_id, state, attributes, now)
+
+
+# ---------------------------------------------------------------------------
+# Blueprint rendering
+# ---------------------------------------------------------------------------
+
+
+def _to_datetime(value: Any, tz: Any) -> datetime | None:
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=tz)
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, tz)
+    try:
+        parsed = datetime.fromisoformat(str(value).strip())
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=tz)
+
+
+def _template_state(state: Any) -> Any:
+    if state is None:
+        return None
+    return SimpleNamespace(
+        entity_id=state.entity_id,
+        state=state.state,
+        attributes=state.attributes,
+        last_changed=state.last_changed,
+        last_updated=state.last_updated,
+        context=SimpleNamespace(id=None, user_id=None, parent_id=None),
+    )
+
+
+class BlueprintRenderer:
+    """Render the blueprint's top-level variables blocks for one room.
+
+    With ``every_template`` every template in the automation is rendered
+    instead (variables in branches, conditions, log messages, service
+    data), which is what the per-template profile needs.
+    """
+
+    def __init__(
+        self, path: Path, inputs: dict[str, Any], compiled: bool, every_template: bool = False
+    ) -> None:
+        blueprint = compiler.load_blueprint(str(path))
+        if compiled:
+            body, _ = compiler.compile_automation(blueprint, inputs)
+        else:
+            body = compiler.substitute_inputs(blueprint, inputs)
+        if every_template:
+            sites = list(profiler.template_sites(body))
+        else:
+            blocks = [body.get("variables") or {}]
+            blocks += [
+                step["variables"]
+                for step in body.get("action") or []
+                if isinstance(step, dict) and isinstance(step.get("variables"), dict)
+            ]
+            sites = [
+                (f"var:{name}", value, name) for block in blocks for name, value in block.items()
+            ]
+
+        self.env = compiler._environment()  # noqa: SLF001
+        self.env.filters["as_timestamp"] = self._as_timestamp
+        self.env.filters["as_datetime"] = self._as_datetime
+        self.env.filters["as_local"] = lambda value: value
+        self.env.globals.update(
+            states=self._states,
+            state_attr=self._state_attr,
+            is_state=self._is_state,
+            now=lambda: self._now,
+            as_timestamp=self._as_timestamp,
+            as_datetime=self._as_datetime,
+        )
+
+        start = time.perf_counter()
+        self.sites: list[tuple[str, Any, str | None]] = []
+        for label, value, name in sites:
+            if profiler.is_template(value):
+                value = self.env.from_string(value)
+            self.sites.append((label, value, name))
+        self.compile_seconds = time.perf_counter() - start
+        self.variables = sum(1 for _, _, name in self.sites if name is not None)
+        self.templates = sum(1 for _, value, _ in self.sites if not _is_static(value))
+        self._states_source: States = States()
+        self._now = datetime.now()
+
+    def _states(self, entity_id: Any) -> str:
+        state = self._states_source.get(entity_id) if isinstance(entity_id, str) else None
+        return "unknown" if state is None else state.state
+
+    def _state_attr(self, entity_id: Any, name: str) -> Any:
+        state = self._states_source.get(entity_id) if isinstance(entity_id, str) else None
+        return None if state is None else state.attributes.get(name)
+
+    def _is_state(self, entity_id: Any, value: Any) -> bool:
+        current = self._states(entity_id)
+        if isinstance(value, str):
+            return current == value
+        return current in value
+
+    def _as_timestamp(self, value: Any, default: Any = None) -> Any:
+        parsed = _to_datetime(value, self._now.tzinfo)
+        return default if parsed is None else parsed.timestamp()
+
+    def _as_datetime(self, value: Any, default: Any = None) -> Any:
+        parsed = _to_datetime(value, self._now.tzinfo)
+        return default if parsed is None else parsed
+
+    def render(
+        self,
+        states: States,
+        now: datetime,
+        trigger: dict[str, Any],
+        profile: Any = None,
+    ) -> tuple[int, int]:
+        """Render every site in order; return (rendered, errors)."""
+        self._states_source = states
+        self._now = now
+        context: dict[str, Any] = {"trigger": trigger}
+        rendered = errors = 0
+        for label, value, name in self.sites:
+            if _is_static(value):
+                if name is not None:
+                    context[name] = value
+                continue
+            rendered += 1
+            start = time.perf_counter()
+            try:
+                result = compiler._parse_result(value.render(context))  # noqa: SLF001
+            except Exception:  # noqa: BLE001
+                # Home Assistant would abort the run; keep going to time the rest
+                errors += 1
+                result = None
+            if profile is not None:
+                profile.record(label, time.perf_counter() - start)
+            if name is not None:
+                context[name] = result
+        return rendered, errors
+
+
+def _is_static(value: Any) -> bool:
+    return not hasattr(value, "render")
+
+
+# ---------------------------------------------------------------------------
+# Replay
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class TriggerStats:
+    """Measurements for one trigger id."""
+
+    runs: int = 0
+    blueprint_ms: list[float] = field(default_factory=list)
+    blueprint_rendered: int = 0
+    blueprint_errors: int = 0
+    native_ms: list[float] = field(default_factory=list)
+    native_computed: int = 0
+    native_commands: int = 0
+    native_helper_writes: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        def summary(samples: list[float]) -> dict[str, float]:
+            if not samples:
+                return {}
+            ordered = sorted(samples)
+            return {
+                "mean_ms": round(statistics.fmean(ordered), 3),
+                "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+                "max_ms": round(ordered[-1], 3),
+            }
+
+        return {
+            "runs": self.runs,
+            "blueprint": {
+                **summary(self.blueprint_ms),
+                "variables_per_run": round(self.blueprint_rendered / max(self.runs, 1), 1),
+                "render_errors": self.blueprint_errors,
+            },
+            "native": {
+                **summary(self.native_ms),
+                "variables_per_run": round(self.native_computed / max(self.runs, 1), 1),
+                "climate_calls": self.native_commands,
+                "helper_writes": self.native_helper_writes,
+            },
+        }
+
+
+def replay(
+    trace: dict[str, Any],
+    blueprint: Path,
+    compiled: bool,
+    repeat: int,
+    profile_limit: int | None = None,
+) -> dict[str, Any]:
+    """Replay a trace and return the report.
+
+    With ``profile_limit`` the report also lists the hottest blueprint
+    templates and engine variables.
+    """
+    inputs = blueprint_inputs.build_blueprint_inputs(trace["room"])
+    config = engine.RoomConfig(inputs)
+    profiling = profile_limit is not None
+    renderer = BlueprintRenderer(blueprint, inputs, compiled, every_template=profiling)
+    blueprint_profile = profiler.TemplateProfile() if profiling else None
+    native_profile = profiler.TemplateProfile() if profiling else None
+    start = datetime.fromisoformat(trace["start"])
+
+    stats: dict[str, TriggerStats] = {}
+    for _ in range(repeat):
+        states = States()
+        for entity_id, data in trace.get("states", {}).items():
+            states.set(entity_id, str(data["state"]), data.get("attributes", {}), start)
+        cache = engine.VariableCache()
+        history = engine.TemperatureHistory()
+
+        for event in trace["events"]:
+            now = start + timedelta(seconds=event.get("at", 0))
+            for entity_id, data in (event.get("set") or {}).items():
+                states.set(entity_id, str(data["state"]), data.get("attributes"), now)
+            if "trigger" not in event:
+                continue
+
+            spec = event["trigger"]
+            entity_id = spec.get("entity_id")
+            to_state = states.get(entity_id) if entity_id else None
+            item = stats.setdefault(spec["id"], TriggerStats())
+            item.runs += 1
+
+            template_trigger = {
+                "id": spec["id"],
+                "entity_id": entity_id,
+                "to_state": _template_state(to_state),
+                "from_state": None,
+            }
+            begin = time.perf_counter()
+            rendered, errors = renderer.render(states, now, template_trigger, blueprint_profile)
+            item.blueprint_ms.append((time.perf_counter() - begin) * 1000)
+            item.blueprint_rendered += rendered
+            item.blueprint_errors += errors
+
+            trigger = engine.Trigger(spec["id"], entity_id=entity_id, to_state=to_state)
+            misses = cache.misses
+            begin = time.perf_counter()
+            ev, decision = engine.evaluate(
+                config,
+                states,
+                now,
+                trigger,
+                cache,
+                lazy=True,
+                history=history,
+                profile=native_profile,
+            )
+            commands = engine.plan_commands(ev, decision)
+            updates = engine.helper_updates(ev, decision)
+            item.native_ms.append((time.perf_counter() - begin) * 1000)
+            item.native_computed += cache.misses - misses
+            item.native_commands += len(commands)
+            item.native_helper_writes += len(updates)
+
+            for command in commands:
+                _apply_command(states, command, now)
+            for input_name, value in updates.items():
+                helper = config.helper(input_name)
+                states.set(helper, _helper_state(helper, value), None, now)
+            if spec["id"] == "periodic_check":
+                history.add(now, ev["current_temp"])
+
+    report = {
+        "blueprint": str(blueprint),
+        "compiled": compiled,
+        "blueprint_variables": renderer.variables,
+        "blueprint_templates": renderer.templates,
+        "blueprint_compile_ms": round(renderer.compile_seconds * 1000, 1),
+        "triggers": {name: item.as_dict() for name, item in sorted(stats.items())},
+    }
+    if profiling:
+        report["profile"] = {
+            "blueprint": blueprint_profile.report(profile_limit),
+            "native": native_profile.report(profile_limit),
+        }
+    return report
+
+
+def _print_report(report: dict[str, Any]) -> None:
+    print(f"Blueprint: {report['blueprint']}{' (compiled)' if report['compiled'] else ''}")
+    print(
+        f"  {report['blueprint_variables']} variables, {report['blueprint_templates']} templates, "
+        f"template compile {report['blueprint_compile_ms']} ms"
+    )
+    header = (
+        f"{'trigger':<24}{'runs':>6}  {'bp mean':>9}{'bp p95':>9}{'bp vars':>9}{'errors':>8}"
+        f"  {'py mean':>9}{'py p95':>9}{'py vars':>9}{'climate':>9}{'helpers':>9}"
+    )
+    print(header)
+    print("-" * len(header))
+    for name, item in report["triggers"].items():
+        bp, native = item["blueprint"], item["native"]
+        print(
+            f"{name:<24}{item['runs']:>6}  {bp.get('mean_ms', 0):>9.2f}{bp.get('p95_ms', 0):>9.2f}"
+            f"{bp['variables_per_run']:>9}{bp['render_errors']:>8}"
+            f"  {native.get('mean_ms', 0):>9.2f}{native.get('p95_ms', 0):>9.2f}"
+            f"{native['variables_per_run']:>9}{native['climate_calls']:>9}{native['helper_writes']:>9}"
+        )
+    print("Times in ms per run; 'vars' = variables rendered (blueprint) / computed (native).")
+
+    for source, entries in report.get("profile", {}).items():
+        print(f"\nHottest {source} {'templates' if source == 'blueprint' else 'variables'}:")
+        print(f"{'name':<64}{'count':>7}{'total ms':>11}{'mean ms':>10}{'max ms':>10}")
+        for entry in entries:
+            print(
+                f"{entry['name'][:63]:<64}{entry['count']:>7}{entry['total_ms']:>11.2f}"
+                f"{entry['mean_ms']:>10.3f}{entry['max_ms']:>10.3f}"
+            )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("trace", type=Path, help="trace JSON file")
+    parser.add_argument("--blueprint", type=Path, default=DEFAULT_BLUEPRINT)
+    parser.add_argument(
+        "--compiled", action="store_true", help="render the compiled automation instead"
+    )
+    parser.add_argument("--repeat", type=int, default=1, help="replay the trace N times")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument(
+        "--profile",
+        type=int,
+        nargs="?",
+        const=25,
+        metavar="N",
+        help=(
+            "render every blueprint template (branch variables, conditions, log "
+            "messages) and list the N hottest templates and engine variables"
+        ),
+    )
+    args = parser.parse_args()
+
+    trace = json.loads(args.trace.read_text(encoding="utf-8"))
+    report = replay(trace, args.blueprint, args.compiled, max(args.repeat, 1), args.profile)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())